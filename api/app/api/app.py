@@ -1,10 +1,38 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from http import HTTPStatus
+from typing import AsyncIterator
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
 from app.api.routers import admin, groups, rooms, teachers
+from app.clients.lks import get_lks_client
+from app.core.schedule_manager import schedule_manager
+from app.domain.errors import SyncNotResumableError
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    async with get_lks_client().open_session():
+        # кеш прогревается в фоне: первый запрос к расписанию не должен ждать
+        # ЛКС, а старт приложения - прогрева
+        warm_up = asyncio.create_task(schedule_manager().warm_up())
+        try:
+            yield
+        finally:
+            warm_up.cancel()
+            with suppress(asyncio.CancelledError):
+                await warm_up
+
+
+async def sync_not_resumable_handler(_: Request, exc: Exception) -> JSONResponse:
+    return JSONResponse(status_code=HTTPStatus.CONFLICT, content={"detail": str(exc)})
 
 
 def create_app() -> FastAPI:
     app = FastAPI(
+        lifespan=lifespan,
         title="BMSTU Schedule API",
         description="API для работы с данными МГТУ им. Н.Э. Баумана",
         version="0.1.0",
@@ -20,4 +48,6 @@ def create_app() -> FastAPI:
     app.include_router(rooms.router)
     app.include_router(admin.router)
 
+    app.add_exception_handler(SyncNotResumableError, sync_not_resumable_handler)
+
     return app
@@ -1,10 +1,18 @@
 import subprocess
+from http import HTTPStatus
+from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, Path
 from loguru import logger
 
-from app.api.schemas.admin import PostMigrationsUpgradeAPIResponse, SyncAPIResponse
+from app.api.schemas.admin import (
+    PostMigrationsUpgradeAPIResponse,
+    SyncAPIResponse,
+    SyncInfoAPIResponse,
+    SyncQueuedAPIResponse,
+)
 from app.db.database import SessionMakerDep
+from app.domain.sync_kind import SyncKind
 from app.services.sync_svc import SyncSvcDep
 
 router = APIRouter()
@@ -14,14 +22,77 @@ router = APIRouter()
     "/admin/sync",
     tags=["admin"],
     summary="Sync data from LKS",
-    response_model=SyncAPIResponse,
+    description=(
+        "Ставит синхронизацию в очередь. Выполняет её процесс "
+        "`python -m app.worker`, статус доступен по возвращённому id."
+    ),
+    response_model=SyncQueuedAPIResponse,
 )
 async def sync_data(
     sessionmaker: SessionMakerDep,
     sync_svc: SyncSvcDep,
-    bt: BackgroundTasks,
+) -> SyncQueuedAPIResponse:
+    sync_id = await sync_svc.add_synchronization_task(sessionmaker)
+    return SyncQueuedAPIResponse(data=sync_id)
+
+
+@router.post(
+    "/admin/sync/diff",
+    tags=["admin"],
+    summary="Preview sync changes",
+    description=(
+        "Ставит в очередь пробный прогон: воркер скачает данные из ЛКС и "
+        "посчитает по каждой таблице, сколько записей синхронизация добавила "
+        "бы, изменила и удалила. Расписание в БД не меняется, отчёт доступен "
+        "по возвращённому id."
+    ),
+    response_model=SyncQueuedAPIResponse,
+)
+async def sync_diff(
+    sessionmaker: SessionMakerDep,
+    sync_svc: SyncSvcDep,
+) -> SyncQueuedAPIResponse:
+    sync_id = await sync_svc.add_synchronization_task(sessionmaker, SyncKind.DIFF)
+    return SyncQueuedAPIResponse(data=sync_id)
+
+
+@router.get(
+    "/admin/sync/{sync_id}",
+    tags=["admin"],
+    summary="Get sync status and report",
+    description=(
+        "Возвращает статус и прогресс синхронизации, а после её завершения "
+        "отчёт: время этапов, задержки ответов ЛКС и число изменённых строк."
+    ),
+    response_model=SyncInfoAPIResponse,
+)
+async def get_sync(
+    sessionmaker: SessionMakerDep,
+    sync_svc: SyncSvcDep,
+    sync_id: Annotated[int, Path(description="ID of the synchronization")],
+) -> SyncInfoAPIResponse:
+    sync_info = await sync_svc.get_synchronization(sessionmaker, sync_id)
+    return SyncInfoAPIResponse(data=sync_info)
+
+
+@router.post(
+    "/admin/sync/{sync_id}/resume",
+    tags=["admin"],
+    summary="Resume interrupted sync",
+    description=(
+        "Ставит в очередь упавшую или брошенную воркером синхронизацию, "
+        "она продолжится с последней сохранённой группы. Если после неё "
+        "опубликована или выполняется более новая синхронизация, возвращает 409."
+    ),
+    response_model=SyncAPIResponse,
+    responses={HTTPStatus.CONFLICT.value: {"description": "Sync is not resumable"}},
+)
+async def resume_sync(
+    sessionmaker: SessionMakerDep,
+    sync_svc: SyncSvcDep,
+    sync_id: Annotated[int, Path(description="ID of the synchronization")],
 ) -> SyncAPIResponse:
-    await sync_svc.add_synchronization_task(sessionmaker, bt)
+    await sync_svc.resume_synchronization_task(sessionmaker, sync_id)
     return SyncAPIResponse()
 
 
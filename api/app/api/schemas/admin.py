@@ -1,10 +1,80 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
 from app.api.schemas.response import APIResponse
+from app.domain.sync_diff import SyncDiff
 
 
 class SyncAPIResponse(APIResponse):
     data: None = None
 
 
+class SyncQueuedAPIResponse(APIResponse):
+    data: int = Field(description="ID of the queued synchronization")
+    detail: str = "Synchronization queued"
+
+
 class PostMigrationsUpgradeAPIResponse(APIResponse):
     data: str
     detail: str = "Migration upgrade successful."
+
+
+class EntityDiffSchema(BaseModel):
+    inserts: int
+    updates: int
+    deletes: int
+
+
+class SyncDiffSchema(BaseModel):
+    entities: dict[str, EntityDiffSchema]
+    failed_groups: int
+
+    @classmethod
+    def from_diff(cls, sync_diff: SyncDiff) -> "SyncDiffSchema":
+        return cls(
+            entities={
+                entity: EntityDiffSchema(
+                    inserts=len(diff.inserts),
+                    updates=len(diff.updates),
+                    deletes=len(diff.deletes),
+                )
+                for entity, diff in sync_diff.entities.items()
+            },
+            failed_groups=sync_diff.failed_groups,
+        )
+
+
+class SyncInfo(BaseModel):
+    id: int = Field(description="Synchronization ID")
+    kind: str = Field(description="Synchronization or dry-run diff", examples=["sync"])
+    status: str = Field(description="Synchronization status", examples=["success"])
+    stage: Optional[str] = Field(None, description="Current or last stage")
+    groups_total: Optional[int] = Field(None, description="Groups to sync")
+    groups_done: int = Field(description="Groups already synced")
+    created_at: datetime = Field(description="Start time")
+    finished_at: Optional[datetime] = Field(None, description="Finish time")
+    heartbeat_at: Optional[datetime] = Field(
+        None,
+        description="Last time the worker reported progress",
+    )
+    published_at: Optional[datetime] = Field(
+        None,
+        description="Time the synced schedules became visible to readers",
+    )
+    report: Optional[dict[str, Any]] = Field(
+        None,
+        description=(
+            "Stage durations, LKS fetch latency percentiles, rows inserted, "
+            "updated and deleted per table and group outcomes. For a dry-run "
+            "diff: rows the sync would insert, update and delete per table"
+        ),
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SyncInfoAPIResponse(APIResponse):
+    data: SyncInfo
+    detail: str = "Synchronization information retrieved successfully"
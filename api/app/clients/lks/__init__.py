@@ -1,4 +1,4 @@
-from app.clients.lks.client import LksClient, get_lks_client
+from app.clients.lks.client import LksClient, ReplayLksClient, get_lks_client
 from app.clients.lks.models import (
     Audience,
     CurrentSchedule,
@@ -17,6 +17,7 @@ __all__ = [
     "Discipline",
     "Group",
     "LksClient",
+    "ReplayLksClient",
     "Schedule",
     "SchedulePair",
     "StructureNode",
@@ -0,0 +1,69 @@
+import asyncio
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+
+class ResponseArchiveWriter:
+    """Пишет тела ответов ЛКС в zip-архив, записи названы по адресу запроса.
+
+    Сжатие и запись идут в отдельном потоке: `put` только ставит ответ в
+    очередь фоновой задачи и не блокирует цикл событий. Архив собирается во
+    временном файле и подменяет старый только в `close`, поэтому прерванная
+    запись не портит предыдущий архив.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.__path = path
+        self.__tmp_path = path.with_suffix(f"{path.suffix}.tmp")
+        self.__urls: set[str] = set()
+        self.__queue: asyncio.Queue[Optional[tuple[str, bytes]]] = asyncio.Queue()
+        self.__task = asyncio.create_task(self.__write_all())
+
+    def put(self, url: str, body: bytes) -> None:
+        # при повторных запросах по одному адресу остаётся первый ответ,
+        # после ошибки записи ответы не копятся в очереди
+        if url in self.__urls or self.__task.done():
+            return
+        self.__urls.add(url)
+        self.__queue.put_nowait((url, body))
+
+    async def close(self) -> None:
+        self.__queue.put_nowait(None)
+        try:
+            await self.__task
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Failed to record LKS responses to {self.__path}: {e}")
+            return
+        logger.info(f"Recorded {len(self.__urls)} LKS responses to {self.__path}")
+
+    async def __write_all(self) -> None:
+        archive = await asyncio.to_thread(self.__open)
+        try:
+            while (item := await self.__queue.get()) is not None:
+                await asyncio.to_thread(archive.writestr, *item)
+        finally:
+            await asyncio.to_thread(archive.close)
+        await asyncio.to_thread(self.__tmp_path.replace, self.__path)
+
+    def __open(self) -> zipfile.ZipFile:
+        self.__path.parent.mkdir(parents=True, exist_ok=True)
+        return zipfile.ZipFile(
+            self.__tmp_path,
+            mode="w",
+            compression=zipfile.ZIP_DEFLATED,
+        )
+
+
+class ResponseArchive:
+    """Архив, записанный `ResponseArchiveWriter`, целиком в памяти."""
+
+    def __init__(self, path: Path) -> None:
+        with zipfile.ZipFile(path) as archive:
+            self.__bodies = {name: archive.read(name) for name in archive.namelist()}
+        logger.info(f"Loaded {len(self.__bodies)} LKS responses from {path}")
+
+    def get(self, url: str) -> Optional[bytes]:
+        return self.__bodies.get(url)
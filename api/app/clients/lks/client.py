@@ -1,9 +1,26 @@
+import asyncio
+import random
+from contextlib import asynccontextmanager
 from functools import lru_cache
-from typing import Any
+from http import HTTPStatus
+from pathlib import Path
+from typing import AsyncIterator, Optional
 from uuid import UUID
 
 import aiohttp
+from aiohttp import hdrs
+from loguru import logger
+from multidict import CIMultiDictProxy
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
 
+from app.clients.lks.archive import ResponseArchive, ResponseArchiveWriter
+from app.clients.lks.limiter import AimdLimiter
 from app.clients.lks.models import (
     CurrentSchedule,
     CurrentScheduleResponseBody,
@@ -12,44 +29,249 @@ from app.clients.lks.models import (
     StructureNode,
     StructureResponseBody,
 )
+from app.clients.lks.response_cache import CachedResponse, ResponseCache
 from app.settings import LksSettings, lks_settings
 
 
 class LksClient:
     def __init__(self, settings: LksSettings) -> None:
-        self.__base_url = settings.base_api_url
-        self.__use_ssl = settings.use_ssl
+        # параметры соединений и повторов читаются из настроек по месту
+        self.__settings = settings
+
+        self.__limiter = AimdLimiter(
+            initial_limit=settings.concurrency_initial,
+            min_limit=settings.concurrency_min,
+            max_limit=settings.concurrency_max,
+            latency_target_sec=settings.latency_target_sec,
+        )
 
-    def __get_session(self) -> aiohttp.ClientSession:
-        connector = aiohttp.TCPConnector(ssl=self.__use_ssl)
+        self.__session: Optional[aiohttp.ClientSession] = None
+        self.__session_users = 0
+
+        cache_dir = settings.response_cache_dir
+        self.__response_cache = ResponseCache(
+            directory=Path(cache_dir) if cache_dir else None,
+            memory_size=settings.response_cache_memory_size,
+        )
+
+        record_path = settings.record_archive_path
+        self.__record_path = Path(record_path) if record_path else None
+        self.__recorder: Optional[ResponseArchiveWriter] = None
+
+    def __create_session(self) -> aiohttp.ClientSession:
+        settings = self.__settings
+        connector = aiohttp.TCPConnector(
+            ssl=settings.use_ssl,
+            limit_per_host=settings.connection_limit_per_host,
+            keepalive_timeout=settings.keepalive_timeout_sec,
+            ttl_dns_cache=settings.dns_cache_ttl_sec,
+        )
         return aiohttp.ClientSession(
-            base_url=self.__base_url,
+            base_url=settings.base_api_url,
             connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.request_timeout_sec),
             raise_for_status=True,
         )
 
-    async def _get(self, url: str) -> dict[str, Any]:
-        async with self.__get_session() as session, session.get(url) as response:
-            return await response.json()
+    @asynccontextmanager
+    async def open_session(self) -> AsyncIterator["LksClient"]:
+        """Держит одну долгоживущую сессию, пока открыт хотя бы один контекст.
+
+        Контексты можно вкладывать (lifespan приложения и синхронизация),
+        сессия закрывается при выходе из последнего. Если задан
+        `record_archive_path`, ответы за время жизни сессии записываются
+        в архив.
+        """
+        if self.__session is None:
+            self.__session = self.__create_session()
+            if self.__record_path is not None:
+                self.__recorder = ResponseArchiveWriter(self.__record_path)
+        self.__session_users += 1
+        try:
+            yield self
+        finally:
+            self.__session_users -= 1
+            if self.__session_users == 0:
+                await self.__close_session()
+
+    async def __close_session(self) -> None:
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+        if self.__recorder is not None:
+            await self.__recorder.close()
+            self.__recorder = None
+
+    @asynccontextmanager
+    async def __client_session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        if self.__session is not None:
+            yield self.__session
+            return
+
+        async with self.__create_session() as session:
+            yield session
+
+    async def _get(self, url: str) -> bytes:
+        body = await self.__fetch(url)
+        if self.__recorder is not None:
+            self.__recorder.put(url, body)
+        return body
+
+    async def __fetch(self, url: str) -> bytes:
+        cached = await self.__response_cache.get(url)
+        headers = cached.conditional_headers() if cached is not None else {}
+
+        try:
+            status, body, response_headers = await self.__request_with_retries(
+                url,
+                headers,
+            )
+        except Exception as e:
+            if cached is None or not _is_retryable(e):
+                raise
+            logger.warning(f"LKS is unreachable, using cached response for {url}: {e}")
+            return cached.body
+
+        if status == HTTPStatus.NOT_MODIFIED and cached is not None:
+            return cached.body
+
+        await self.__response_cache.put(
+            url,
+            CachedResponse(
+                body=body,
+                etag=response_headers.get(hdrs.ETAG),
+                last_modified=response_headers.get(hdrs.LAST_MODIFIED),
+            ),
+        )
+        return body
+
+    async def __request_with_retries(
+        self,
+        url: str,
+        headers: dict[str, str],
+    ) -> tuple[int, bytes, CIMultiDictProxy[str]]:
+        async for attempt in self.__retrying():
+            with attempt:
+                return await self.__request(url, headers)
+        # с reraise=True после последней попытки tenacity пробрасывает ошибку
+        msg = "LKS request retries ended without a result"
+        raise RuntimeError(msg)
+
+    async def __request(
+        self,
+        url: str,
+        headers: dict[str, str],
+    ) -> tuple[int, bytes, CIMultiDictProxy[str]]:
+        async with self.__limiter.slot() as started_at:
+            try:
+                async with (
+                    self.__client_session() as session,
+                    session.get(url, headers=headers) as response,
+                ):
+                    body = await response.read()
+            except Exception as e:
+                if _is_retryable(e):
+                    self.__limiter.on_failure(started_at)
+                raise
+            self.__limiter.on_success(started_at)
+        return response.status, body, response.headers
+
+    def __retrying(self) -> AsyncRetrying:
+        return AsyncRetrying(
+            stop=stop_after_attempt(self.__settings.retry_attempts),
+            wait=wait_random_exponential(
+                multiplier=self.__settings.retry_wait_sec,
+                max=self.__settings.retry_max_wait_sec,
+            ),
+            retry=retry_if_exception(_is_retryable),
+            before_sleep=self.__log_retry,
+            reraise=True,
+        )
+
+    def __log_retry(self, state: RetryCallState) -> None:
+        error = state.outcome.exception() if state.outcome else None
+        logger.warning(
+            f"LKS request failed (attempt {state.attempt_number}, "
+            f"concurrency limit {self.__limiter.limit}): {error}",
+        )
 
     async def get_structure(self) -> StructureNode:
         data = await self._get("structure")
-        response = StructureResponseBody.model_validate(data)
+        response = StructureResponseBody.model_validate_json(data)
         return response.data
 
     async def get_schedule(self, group_id: UUID) -> Schedule:
-        data = await self._get(f"schedules/groups/{group_id}/public")
-        response = ScheduleResponseBody.model_validate(data)
+        data = await self.get_schedule_raw(group_id)
+        return self.parse_schedule(data)
+
+    async def get_schedule_raw(self, group_id: UUID) -> bytes:
+        return await self._get(f"schedules/groups/{group_id}/public")
+
+    @staticmethod
+    def parse_schedule(data: bytes) -> Schedule:
+        response = ScheduleResponseBody.model_validate_json(data)
         return response.data
 
     async def get_current_schedule(self) -> CurrentSchedule:
         data = await self._get("schedules/current")
-        response = CurrentScheduleResponseBody.model_validate(data)
+        response = CurrentScheduleResponseBody.model_validate_json(data)
         return response.data
 
 
+def _is_retryable(error: BaseException) -> bool:
+    # перегрузку ЛКС видно по таймаутам, обрывам соединения и 5xx/429,
+    # остальные ошибки повторять бесполезно
+    if isinstance(error, aiohttp.ClientResponseError):
+        return (
+            error.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+            or error.status == HTTPStatus.TOO_MANY_REQUESTS
+        )
+    return isinstance(
+        error,
+        (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, TimeoutError),
+    )
+
+
+class ReplayLksClient(LksClient):
+    """Отдаёт ответы из архива, записанного `LksClient`, без обращений к сети.
+
+    Перед каждым ответом выдерживается искусственная задержка `latency_sec`
+    плюс случайная добавка до `latency_jitter_sec`, чтобы профилировать
+    синхронизацию на повторяемых данных в условиях, близких к боевым.
+    """
+
+    def __init__(
+        self,
+        settings: LksSettings,
+        archive_path: Path,
+        latency_sec: float = 0,
+        latency_jitter_sec: float = 0,
+    ) -> None:
+        super().__init__(settings=settings)
+        self.__archive = ResponseArchive(archive_path)
+        self.__latency = latency_sec
+        self.__latency_jitter = latency_jitter_sec
+
+    async def _get(self, url: str) -> bytes:
+        delay = self.__latency + random.uniform(0, self.__latency_jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        body = self.__archive.get(url)
+        if body is None:
+            msg = f"No recorded LKS response for {url}"
+            raise LookupError(msg)
+        return body
+
+
 @lru_cache(maxsize=1)
 def get_lks_client() -> LksClient:
     settings = lks_settings()
 
+    if settings.replay_archive_path:
+        return ReplayLksClient(
+            settings=settings,
+            archive_path=Path(settings.replay_archive_path),
+            latency_sec=settings.replay_latency_sec,
+            latency_jitter_sec=settings.replay_latency_jitter_sec,
+        )
     return LksClient(settings=settings)
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class AimdLimiter:
+    """Ограничивает число одновременных запросов к ЛКС и подстраивает лимит.
+
+    Пока ответы быстрые, лимит растёт примерно на `increase_step` за каждые
+    `limit` успешных запросов. Медленный ответ мягко уменьшает лимит, ошибка
+    или таймаут сокращают лимит в `1 / decrease_factor` раз. Лимит уменьшается
+    не чаще раза на волну запросов: ответы на запросы, начатые до последнего
+    сокращения, лимит уже не двигают.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target_sec: float,
+        increase_step: float = 1,
+        decrease_factor: float = 0.5,
+        slow_decrease_factor: float = 0.9,
+    ) -> None:
+        self.__min_limit = min_limit
+        self.__max_limit = max_limit
+        self.__latency_target = latency_target_sec
+        self.__increase_step = increase_step
+        self.__decrease_factor = decrease_factor
+        self.__slow_decrease_factor = slow_decrease_factor
+
+        self.__limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.__in_flight = 0
+        self.__last_decrease_at = float("-inf")
+        self.__condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self.__limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self.__in_flight
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Ждёт свободного места под запрос и отдаёт момент начала запроса."""
+        async with self.__condition:
+            await self.__condition.wait_for(lambda: self.__in_flight < self.limit)
+            self.__in_flight += 1
+        try:
+            yield time.monotonic()
+        finally:
+            async with self.__condition:
+                self.__in_flight -= 1
+                self.__condition.notify_all()
+
+    def on_success(self, started_at: float) -> None:
+        latency = time.monotonic() - started_at
+        if latency > self.__latency_target:
+            self.__decrease(started_at, self.__slow_decrease_factor)
+            return
+        self.__set_limit(self.__limit + self.__increase_step / self.__limit)
+
+    def on_failure(self, started_at: float) -> None:
+        self.__decrease(started_at, self.__decrease_factor)
+
+    def __decrease(self, started_at: float, factor: float) -> None:
+        if started_at <= self.__last_decrease_at:
+            return
+        self.__last_decrease_at = time.monotonic()
+        self.__set_limit(self.__limit * factor)
+
+    def __set_limit(self, limit: float) -> None:
+        # ждущие перепроверят лимит, когда освободится ближайший слот
+        self.__limit = min(max(limit, self.__min_limit), self.__max_limit)
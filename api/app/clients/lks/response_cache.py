@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from aiohttp import hdrs
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag is not None:
+            headers[hdrs.IF_NONE_MATCH] = self.etag
+        if self.last_modified is not None:
+            headers[hdrs.IF_MODIFIED_SINCE] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Тела ответов ЛКС и их валидаторы для условных запросов по адресу запроса.
+
+    При заданной директории ответы сохраняются на диск и переживают
+    перезапуск процесса. Если `memory_size` больше нуля, последние ответы
+    дополнительно хранятся в памяти.
+    """
+
+    def __init__(self, directory: Optional[Path], memory_size: int) -> None:
+        self.__directory = directory
+        self.__memory_size = memory_size
+        self.__memory: OrderedDict[str, CachedResponse] = OrderedDict()
+
+        if self.__directory is not None:
+            self.__directory.mkdir(parents=True, exist_ok=True)
+
+    async def get(self, url: str) -> Optional[CachedResponse]:
+        cached = self.__memory.get(url)
+        if cached is not None:
+            self.__memory.move_to_end(url)
+            return cached
+
+        if self.__directory is None:
+            return None
+
+        cached = await asyncio.to_thread(self.__read, url)
+        if cached is not None:
+            self.__remember(url, cached)
+        return cached
+
+    async def put(self, url: str, response: CachedResponse) -> None:
+        self.__remember(url, response)
+        if self.__directory is not None:
+            await asyncio.to_thread(self.__write, url, response)
+
+    def __remember(self, url: str, response: CachedResponse) -> None:
+        if self.__memory_size <= 0:
+            return
+        self.__memory[url] = response
+        self.__memory.move_to_end(url)
+        while len(self.__memory) > self.__memory_size:
+            self.__memory.popitem(last=False)
+
+    def __paths(self, url: str) -> tuple[Path, Path]:
+        assert self.__directory is not None
+        name = hashlib.sha256(url.encode()).hexdigest()
+        return self.__directory / f"{name}.body", self.__directory / f"{name}.json"
+
+    def __read(self, url: str) -> Optional[CachedResponse]:
+        body_path, meta_path = self.__paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return CachedResponse(
+            body=body,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
+    def __write(self, url: str, response: CachedResponse) -> None:
+        body_path, meta_path = self.__paths(url)
+        meta = {
+            "url": url,
+            "etag": response.etag,
+            "last_modified": response.last_modified,
+        }
+        try:
+            # сначала тело, затем метаданные: без них запись не считается
+            # валидной, поэтому оборванная запись не подменит старый ответ
+            meta_path.unlink(missing_ok=True)
+            _write_atomic(body_path, response.body)
+            _write_atomic(meta_path, json.dumps(meta).encode())
+        except OSError as e:
+            logger.warning(f"Failed to cache LKS response for {url}: {e}")
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_suffix(f"{path.suffix}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from loguru import logger
+
+from app.clients import lks
+
+
+class _Entry(NamedTuple):
+    value: lks.CurrentSchedule
+    # время получения по часам системы, переживает перезапуск процесса
+    fetched_at: float
+
+
+class CurrentScheduleCache:
+    """Ответ ЛКС про текущий семестр, отдаваемый без ожидания сети.
+
+    Устаревшее значение возвращается сразу, обновление же уходит в фоновую
+    задачу: одновременно идёт не больше одного запроса к ЛКС. Если задан
+    `path`, значение сохраняется на диск и читается при холодном старте.
+    Запрос ждёт ЛКС только тогда, когда значения нет ни в памяти, ни на
+    диске.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[lks.CurrentSchedule]],
+        ttl_sec: float,
+        retry_sec: float,
+        path: Optional[Path] = None,
+    ) -> None:
+        self.__fetch = fetch
+        self.__ttl = ttl_sec
+        self.__retry = retry_sec
+        self.__path = path
+
+        self.__entry: Optional[_Entry] = None
+        self.__loaded = False
+        self.__refresh_task: Optional[asyncio.Task[_Entry]] = None
+        self.__retry_after = 0.0
+
+    async def get(self) -> lks.CurrentSchedule:
+        entry = await self.__cached_entry()
+        if entry is None:
+            entry = await asyncio.shield(self.__start_refresh())
+        elif self.__is_stale(entry):
+            self.__refresh_in_background()
+        return entry.value
+
+    async def warm_up(self) -> None:
+        """Заполняет кеш при старте приложения, ошибки ЛКС только логируются."""
+        entry = await self.__cached_entry()
+        if entry is not None:
+            if self.__is_stale(entry):
+                self.__refresh_in_background()
+            return
+        try:
+            await asyncio.shield(self.__start_refresh())
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Failed to warm up current schedule: {e}")
+
+    async def __cached_entry(self) -> Optional[_Entry]:
+        if self.__entry is None and not self.__loaded:
+            self.__loaded = True
+            if self.__path is not None:
+                self.__entry = await asyncio.to_thread(self.__read, self.__path)
+        return self.__entry
+
+    def __is_stale(self, entry: _Entry) -> bool:
+        return time.time() - entry.fetched_at >= self.__ttl
+
+    def __start_refresh(self) -> asyncio.Task[_Entry]:
+        if self.__refresh_task is None or self.__refresh_task.done():
+            self.__refresh_task = asyncio.create_task(self.__refresh())
+            self.__refresh_task.add_done_callback(self.__on_refresh_done)
+        return self.__refresh_task
+
+    def __refresh_in_background(self) -> None:
+        # после неудачи ЛКС не дёргается на каждом запросе
+        if time.monotonic() >= self.__retry_after:
+            self.__start_refresh()
+
+    async def __refresh(self) -> _Entry:
+        entry = _Entry(value=await self.__fetch(), fetched_at=time.time())
+        self.__entry = entry
+        if self.__path is not None:
+            await asyncio.to_thread(self.__write, self.__path, entry)
+        return entry
+
+    def __on_refresh_done(self, task: asyncio.Task[_Entry]) -> None:
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.__retry_after = time.monotonic() + self.__retry
+            logger.warning(f"Failed to refresh current schedule: {error}")
+
+    @staticmethod
+    def __read(path: Path) -> Optional[_Entry]:
+        try:
+            data = json.loads(path.read_text())
+            return _Entry(
+                value=lks.CurrentSchedule.model_validate(data["value"]),
+                fetched_at=float(data["fetched_at"]),
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring broken current schedule cache {path}: {e}")
+            return None
+
+    @staticmethod
+    def __write(path: Path, entry: _Entry) -> None:
+        data = {
+            "value": entry.value.model_dump(mode="json", by_alias=True),
+            "fetched_at": entry.fetched_at,
+        }
+        tmp_path = path.with_suffix(f"{path.suffix}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(data))
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to persist current schedule to {path}: {e}")
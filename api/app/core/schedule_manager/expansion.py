@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, NamedTuple, Optional, Sequence
+
+from app import domain, models
+from app.core.schedule_manager.occurrence import (
+    Occurrence,
+    PairTemplate,
+    PairTemplates,
+)
+
+# начало недели диапазона и её чётность
+RangeWeek = tuple[datetime, domain.Week]
+
+
+class WeeklyTemplate(NamedTuple):
+    """Пара расписания как повторяющееся событие недели."""
+
+    weekday: int
+    week: domain.Week
+    pair_index: int
+
+
+def weekly_templates(
+    schedule_pairs: Sequence[models.SchedulePair],
+) -> list[WeeklyTemplate]:
+    return [
+        WeeklyTemplate(
+            weekday=_WEEKDAYS[domain.DayOfWeek(pair.day)],
+            week=domain.Week(pair.week),
+            pair_index=pair_index,
+        )
+        for pair_index, pair in enumerate(schedule_pairs)
+    ]
+
+
+def expand_weekly(
+    schedule_pairs: Sequence[models.SchedulePair],
+    first_day: datetime,
+    dt_from: datetime,
+    dt_to: datetime,
+    week_of: Callable[[datetime], domain.Week],
+    templates: Optional[PairTemplates] = None,
+) -> list[Occurrence]:
+    """Занятия пар в диапазоне, найденные без обхода каждого дня.
+
+    Чётность считается один раз на неделю диапазона, затем каждый шаблон
+    перебирает только недели. Результат равен выводу
+    `ScheduleManager.create_concrete_pairs_for_day_and_week`, вызванного для
+    каждого дня от `first_day` (полночь по Москве) до `dt_to`: занятия
+    упорядочены по дню, внутри дня - по порядку пар на входе.
+    """
+    templates = templates if templates is not None else PairTemplates()
+    weeks = _range_weeks(first_day, dt_to, week_of)
+
+    occurrences: list[tuple[int, int, Occurrence]] = []
+    for template in weekly_templates(schedule_pairs):
+        pair_template = templates[schedule_pairs[template.pair_index]]
+        occurrences.extend(
+            (day_offset, template.pair_index, occurrence)
+            for day_offset, occurrence in _weekly_occurrences(
+                template,
+                pair_template,
+                weeks,
+                first_day,
+                (dt_from, dt_to),
+            )
+        )
+
+    occurrences.sort(key=lambda occurrence: occurrence[:2])
+    return [occurrence for _, _, occurrence in occurrences]
+
+
+def _range_weeks(
+    first_day: datetime,
+    dt_to: datetime,
+    week_of: Callable[[datetime], domain.Week],
+) -> list[RangeWeek]:
+    weeks = []
+    week_start = first_day - timedelta(days=first_day.weekday())
+    while week_start <= dt_to:
+        # внутри недели чётность не меняется, а первая неделя диапазона может
+        # начинаться раньше first_day
+        weeks.append((week_start, week_of(max(week_start, first_day))))
+        week_start += timedelta(weeks=1)
+    return weeks
+
+
+def _weekly_occurrences(
+    template: WeeklyTemplate,
+    pair_template: PairTemplate,
+    weeks: list[RangeWeek],
+    first_day: datetime,
+    dt_range: tuple[datetime, datetime],
+) -> Iterator[tuple[int, Occurrence]]:
+    """Занятия одной пары по неделям диапазона и их смещение в днях от `first_day`."""
+    dt_from, dt_to = dt_range
+    for week_start, parity in weeks:
+        day = week_start + timedelta(days=template.weekday)
+        if not template.week.match(parity) or day < first_day or day > dt_to:
+            continue
+        occurrence = pair_template.on(day)
+        if occurrence.is_in_range(dt_from, dt_to):
+            yield (day - first_day).days, occurrence
+
+
+_WEEKDAYS = {day: weekday for weekday, day in enumerate(domain.DayOfWeek)}
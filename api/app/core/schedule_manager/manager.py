@@ -1,22 +1,45 @@
-from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone
 from functools import lru_cache
-from typing import Annotated, Sequence
+from pathlib import Path
+from typing import Annotated, Callable, Iterable, Optional, Sequence
 
-from aiocache import cached
 from fastapi import Depends
 
 from app import domain, models
 from app.api import schemas
 from app.clients import lks
-from app.core.schedule_manager.helpers import create_concrete_pair
-from app.settings import schedule_manager_settings
+from app.core.schedule_manager.current_schedule_cache import CurrentScheduleCache
+from app.core.schedule_manager.expansion import expand_weekly
+from app.core.schedule_manager.occurrence import Occurrence, PairTemplates
+from app.settings import ScheduleManagerSettings, schedule_manager_settings
 
 MOSCOW_TZ = timezone(timedelta(hours=3))
 
+PairIndex = dict[
+    tuple[domain.DayOfWeek, domain.Week],
+    list[models.SchedulePair],
+]
+
 
 class ScheduleManager:
-    def __init__(self, lks_client: lks.LksClient) -> None:
+    def __init__(
+        self,
+        lks_client: lks.LksClient,
+        settings: Optional[ScheduleManagerSettings] = None,
+    ) -> None:
         self.lks_client = lks_client
+        self.settings = settings or schedule_manager_settings()
+        cache_path = self.settings.current_schedule_cache_path
+        self.__current_schedule = CurrentScheduleCache(
+            fetch=lks_client.get_current_schedule,
+            ttl_sec=self.settings.current_schedule_cache_ttl_sec,
+            retry_sec=self.settings.current_schedule_retry_sec,
+            path=Path(cache_path) if cache_path else None,
+        )
+        self.__calendar: Optional[
+            tuple[lks.CurrentSchedule, domain.AcademicCalendar]
+        ] = None
 
     @staticmethod
     def _to_moscow_timezone(dt: datetime) -> datetime:
@@ -38,42 +61,106 @@ class ScheduleManager:
         dt_to: datetime,
     ) -> list[schemas.SchedulePairRead]:
         moscow_dt_from = self._to_moscow_timezone(dt_from)
-        moscow_dt_to = self._to_moscow_timezone(dt_to)
 
-        concrete_pairs = []
-        current_date = self._normalize_to_moscow_midnight(moscow_dt_from)
+        # календарь и индекс пар строятся один раз на запрос, каждый день
+        # обходит только свои пары
+        calendar = await self.academic_calendar()
+
+        def week_of(day: datetime) -> domain.Week:
+            # дни вне семестра отсечены ниже, для них чётность не нужна
+            return calendar.week(day.date()) or domain.Week.ALL
+
+        first_day, moscow_dt_to = self._clip_to_semester(
+            calendar,
+            moscow_dt_from,
+            self._to_moscow_timezone(dt_to),
+        )
+        # общие части пары строятся один раз, занятия - лёгкие объекты,
+        # схема ответа собирается из них без повторной валидации
+        templates = PairTemplates()
+        days = (moscow_dt_to - first_day).days + 1
+        if days >= self.settings.batch_expansion_min_days:
+            occurrences = expand_weekly(
+                schedule_pairs,
+                first_day,
+                moscow_dt_from,
+                moscow_dt_to,
+                week_of,
+                templates,
+            )
+        else:
+            occurrences = self._expand_daily(
+                self.index_pairs(schedule_pairs),
+                templates,
+                week_of,
+                first_day,
+                (moscow_dt_from, moscow_dt_to),
+            )
+        return [occurrence.to_schema() for occurrence in occurrences]
 
-        while current_date <= moscow_dt_to:
-            concrete_pairs.extend(
-                await self._generate_concrete_pairs_for_date(
-                    schedule_pairs,
+    @classmethod
+    def _clip_to_semester(
+        cls,
+        calendar: domain.AcademicCalendar,
+        moscow_dt_from: datetime,
+        moscow_dt_to: datetime,
+    ) -> tuple[datetime, datetime]:
+        """Первый день (полночь) и конец диапазона в пределах семестра."""
+        # на каникулах занятий нет, поэтому диапазон обрезается по семестру
+        first_day = max(
+            cls._normalize_to_moscow_midnight(moscow_dt_from),
+            datetime.combine(calendar.semester_starts, time.min, tzinfo=MOSCOW_TZ),
+        )
+        last_dt = min(
+            moscow_dt_to,
+            datetime.combine(calendar.semester_ends, time.max, tzinfo=MOSCOW_TZ),
+        )
+        return first_day, last_dt
+
+    @classmethod
+    def _expand_daily(
+        cls,
+        index: PairIndex,
+        templates: PairTemplates,
+        week_of: Callable[[datetime], domain.Week],
+        first_day: datetime,
+        dt_range: tuple[datetime, datetime],
+    ) -> list[Occurrence]:
+        dt_from, dt_to = dt_range
+        occurrences = []
+        current_date = first_day
+        while current_date <= dt_to:
+            day_of_week = domain.DayOfWeek.from_weekday(current_date.weekday())
+            occurrences.extend(
+                cls._occurrences_on(
+                    index.get((day_of_week, week_of(current_date)), ()),
+                    templates,
                     current_date,
-                    moscow_dt_from,
-                    moscow_dt_to,
+                    dt_from,
+                    dt_to,
                 ),
             )
             current_date += timedelta(days=1)
-        return concrete_pairs
+        return occurrences
 
-    async def _generate_concrete_pairs_for_date(
-        self,
-        schedule_pairs: Sequence[models.SchedulePair],
-        current_date: datetime,
-        dt_from: datetime,
-        dt_to: datetime,
-    ) -> list[schemas.SchedulePairRead]:
-        current_week = await self.current_week()
-        week = domain.Week.from_datetime(current_date, current_week)
-        day_of_week = domain.DayOfWeek.from_datetime(current_date)
-
-        return self.create_concrete_pairs_for_day_and_week(
-            schedule_pairs=schedule_pairs,
-            day_of_week=day_of_week,
-            week=week,
-            current_date=current_date,
-            dt_from=dt_from,
-            dt_to=dt_to,
-        )
+    @classmethod
+    def index_pairs(cls, schedule_pairs: Sequence[models.SchedulePair]) -> PairIndex:
+        """Раскладывает пары по дню недели и неделе, в которую они проходят.
+
+        Пара на каждой неделе попадает в корзины всех недель. Порядок пар
+        внутри корзины тот же, что во входной последовательности.
+        """
+        index: PairIndex = defaultdict(list)
+        for pair in schedule_pairs:
+            day_of_week = domain.DayOfWeek(pair.day)
+            weeks = [
+                week
+                for week in domain.Week
+                if cls.is_pair_matching_day_and_week(pair, day_of_week, week)
+            ]
+            for week in weeks:
+                index[(day_of_week, week)].append(pair)
+        return index
 
     @classmethod
     def create_concrete_pairs_for_day_and_week(
@@ -85,24 +172,33 @@ class ScheduleManager:
         dt_from: datetime,
         dt_to: datetime,
     ) -> list[schemas.SchedulePairRead]:
-        concrete_pairs = []
-        for pair in schedule_pairs:
-            if not cls.is_pair_matching_day_and_week(pair, day_of_week, week):
-                continue
-
-            concrete_times = domain.TimeSlot.from_str_times(
-                start_time=pair.start_time,
-                end_time=pair.end_time,
-                current_date=current_date,
-            )
-
-            if not concrete_times.is_in_range(dt_from, dt_to):
-                continue
-
-            concrete_pair = create_concrete_pair(pair, concrete_times)
-            concrete_pairs.append(concrete_pair)
+        occurrences = cls._occurrences_on(
+            (
+                pair
+                for pair in schedule_pairs
+                if cls.is_pair_matching_day_and_week(pair, day_of_week, week)
+            ),
+            PairTemplates(),
+            current_date,
+            dt_from,
+            dt_to,
+        )
+        return [occurrence.to_schema() for occurrence in occurrences]
 
-        return concrete_pairs
+    @staticmethod
+    def _occurrences_on(
+        schedule_pairs: Iterable[models.SchedulePair],
+        templates: PairTemplates,
+        current_date: datetime,
+        dt_from: datetime,
+        dt_to: datetime,
+    ) -> list[Occurrence]:
+        occurrences = []
+        for pair in schedule_pairs:
+            occurrence = templates[pair].on(current_date)
+            if occurrence.is_in_range(dt_from, dt_to):
+                occurrences.append(occurrence)
+        return occurrences
 
     @staticmethod
     def is_pair_matching_day_and_week(
@@ -114,18 +210,30 @@ class ScheduleManager:
             pair.week,
         ).match(week)
 
-    @cached(ttl=schedule_manager_settings().current_schedule_cache_ttl_sec)
     async def current_schedule(self) -> lks.CurrentSchedule:
-        return await self.lks_client.get_current_schedule()
+        return await self.__current_schedule.get()
 
-    async def current_week(self) -> domain.Week:
+    async def warm_up(self) -> None:
+        await self.__current_schedule.warm_up()
+
+    async def academic_calendar(self) -> domain.AcademicCalendar:
         current_schedule = await self.current_schedule()
-        return domain.Week.from_lks_ru(current_schedule.week_ru)
+        # ответ ЛКС кешируется, календарь перестраивается только вместе с ним
+        if self.__calendar is None or self.__calendar[0] is not current_schedule:
+            calendar = domain.AcademicCalendar.from_current_schedule(
+                current_schedule,
+                today=datetime.now(tz=MOSCOW_TZ).date(),
+            )
+            self.__calendar = (current_schedule, calendar)
+        return self.__calendar[1]
 
 
 @lru_cache
 def schedule_manager() -> ScheduleManager:
-    return ScheduleManager(lks_client=lks.get_lks_client())
+    return ScheduleManager(
+        lks_client=lks.get_lks_client(),
+        settings=schedule_manager_settings(),
+    )
 
 
 ScheduleManagerDep = Annotated[ScheduleManager, Depends(schedule_manager)]
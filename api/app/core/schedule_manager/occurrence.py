@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, time
+
+from app import domain, models
+from app.api import schemas
+from app.domain.timeslot import MOSCOW_TZ, parse_time
+
+
+@dataclass(frozen=True, slots=True)
+class PairTemplate:
+    """Общая для всех занятий пары часть ответа.
+
+    Строится один раз на пару, вложенные схемы проверяются pydantic тоже
+    один раз и разделяются всеми занятиями.
+    """
+
+    start_time: time
+    end_time: time
+    discipline: schemas.DisciplineBase
+    teachers: list[schemas.TeacherBase]
+    rooms: list[schemas.RoomBase]
+    groups: list[schemas.GroupBase]
+
+    @classmethod
+    def from_model(cls, pair: models.SchedulePair) -> PairTemplate:
+        return cls(
+            start_time=parse_time(pair.start_time),
+            end_time=parse_time(pair.end_time),
+            discipline=_create_discipline_base(pair.discipline),
+            teachers=[_create_teacher_base(t) for t in pair.teachers],
+            rooms=[_create_room_base(a) for a in pair.audiences],
+            groups=[_create_group_base(g) for g in pair.groups],
+        )
+
+    def on(self, day: datetime) -> Occurrence:
+        return Occurrence(
+            template=self,
+            start_time=datetime.combine(day, self.start_time, MOSCOW_TZ),
+            end_time=datetime.combine(day, self.end_time, MOSCOW_TZ),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Occurrence:
+    """Занятие пары в конкретный день."""
+
+    template: PairTemplate
+    start_time: datetime
+    end_time: datetime
+
+    def is_in_range(self, dt_from: datetime, dt_to: datetime) -> bool:
+        return not (self.end_time < dt_from or self.start_time > dt_to)
+
+    def to_schema(self) -> schemas.SchedulePairRead:
+        # все части уже проверены, повторная валидация не нужна
+        template = self.template
+        return schemas.SchedulePairRead.model_construct(
+            time_slot=domain.TimeSlot.model_construct(
+                start_time=self.start_time,
+                end_time=self.end_time,
+            ),
+            discipline=template.discipline,
+            teachers=template.teachers,
+            rooms=template.rooms,
+            groups=template.groups,
+        )
+
+
+class PairTemplates:
+    """Шаблоны пар одного запроса, шаблон строится при первом обращении.
+
+    Ключ - объект пары, поэтому пары должны жить не меньше, чем кеш.
+    """
+
+    def __init__(self) -> None:
+        self.__templates: dict[int, PairTemplate] = {}
+
+    def __getitem__(self, pair: models.SchedulePair) -> PairTemplate:
+        template = self.__templates.get(id(pair))
+        if template is None:
+            template = PairTemplate.from_model(pair)
+            self.__templates[id(pair)] = template
+        return template
+
+
+def _create_discipline_base(discipline: models.Discipline) -> schemas.DisciplineBase:
+    return schemas.DisciplineBase(
+        id=discipline.id,
+        abbr=discipline.abbr,
+        full_name=discipline.full_name,
+        short_name=discipline.short_name,
+        act_type=discipline.act_type,
+    )
+
+
+def _create_teacher_base(teacher: models.Teacher) -> schemas.TeacherBase:
+    return schemas.TeacherBase(
+        id=teacher.id,
+        first_name=teacher.first_name,
+        middle_name=teacher.middle_name,
+        last_name=teacher.last_name,
+        departments=[],
+    )
+
+
+def _create_room_base(audience: models.Audience) -> schemas.RoomBase:
+    return schemas.RoomBase(
+        id=audience.id,
+        name=audience.name,
+        building=audience.building,
+        map_url=audience.map_url,
+    )
+
+
+def _create_group_base(group: models.Group) -> schemas.GroupBase:
+    return schemas.GroupBase(
+        id=group.id,
+        abbr=group.abbr,
+        course_id=group.course_id,
+        semester_num=group.semester_num,
+    )
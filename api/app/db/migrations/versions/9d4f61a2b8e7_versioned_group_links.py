@@ -0,0 +1,99 @@
+"""versioned_group_links
+
+Revision ID: 9d4f61a2b8e7
+Revises: 7b3e9f0c2d64
+Create Date: 2026-10-18 19:42:10.518204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4f61a2b8e7"
+down_revision: Union[str, None] = "7b3e9f0c2d64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "synchronizations",
+        sa.Column("published_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    # без успешной синхронизации текущие связи относятся к служебной записи:
+    # иначе опубликованной версии не будет и читатели увидят пустое расписание
+    op.execute(
+        "INSERT INTO synchronizations (status, comment, created_at, finished_at) "
+        "SELECT 'success', 'versioned_group_links baseline', now(), now() "
+        "WHERE NOT EXISTS (SELECT 1 FROM synchronizations WHERE status = 'success')",
+    )
+    # текущие связи считаются опубликованными последней успешной синхронизацией
+    op.execute(
+        "UPDATE synchronizations SET published_at = coalesce(finished_at, now()) "
+        "WHERE id = (SELECT max(id) FROM synchronizations WHERE status = 'success')",
+    )
+
+    op.add_column(
+        "schedule_pair_group",
+        sa.Column("sync_id", sa.Integer(), nullable=True),
+    )
+    op.execute(
+        "UPDATE schedule_pair_group SET sync_id = "
+        "(SELECT max(id) FROM synchronizations WHERE published_at IS NOT NULL)",
+    )
+    op.alter_column("schedule_pair_group", "sync_id", nullable=False)
+    op.create_foreign_key(
+        "schedule_pair_group_sync_id_fkey",
+        "schedule_pair_group",
+        "synchronizations",
+        ["sync_id"],
+        ["id"],
+    )
+    op.drop_constraint("schedule_pair_group_pkey", "schedule_pair_group")
+    op.create_primary_key(
+        "schedule_pair_group_pkey",
+        "schedule_pair_group",
+        ["schedule_pair_id", "group_id", "sync_id"],
+    )
+    op.create_index(
+        "ix_schedule_pair_group_group_id_sync_id",
+        "schedule_pair_group",
+        ["group_id", "sync_id"],
+        unique=False,
+    )
+    # в ключ пары вошли дисциплина и преподаватели: следующая синхронизация
+    # перезапишет все группы, и пары со старыми ключами уйдут при сборке мусора
+    op.execute("UPDATE groups SET schedule_hash = NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # прежний ключ пары не совпадает с новым, группы перезапишутся заново
+    op.execute("UPDATE groups SET schedule_hash = NULL")
+    op.drop_index(
+        "ix_schedule_pair_group_group_id_sync_id",
+        table_name="schedule_pair_group",
+    )
+    # остаётся только опубликованная версия связей
+    op.execute(
+        "DELETE FROM schedule_pair_group WHERE sync_id <> coalesce("
+        "(SELECT max(id) FROM synchronizations WHERE published_at IS NOT NULL), "
+        "(SELECT max(id) FROM synchronizations))",
+    )
+    op.drop_constraint("schedule_pair_group_pkey", "schedule_pair_group")
+    op.create_primary_key(
+        "schedule_pair_group_pkey",
+        "schedule_pair_group",
+        ["schedule_pair_id", "group_id"],
+    )
+    op.drop_constraint(
+        "schedule_pair_group_sync_id_fkey",
+        "schedule_pair_group",
+        type_="foreignkey",
+    )
+    op.drop_column("schedule_pair_group", "sync_id")
+    op.drop_column("synchronizations", "published_at")
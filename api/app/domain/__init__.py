@@ -1,7 +1,16 @@
 from app.domain import errors, schedule
+from app.domain.academic_calendar import AcademicCalendar
 from app.domain.day_of_week import DayOfWeek
 from app.domain.schedule import ScheduleResult
 from app.domain.timeslot import TimeSlot
 from app.domain.week import Week
 
-__all__ = ["DayOfWeek", "ScheduleResult", "TimeSlot", "Week", "errors", "schedule"]
+__all__ = [
+    "AcademicCalendar",
+    "DayOfWeek",
+    "ScheduleResult",
+    "TimeSlot",
+    "Week",
+    "errors",
+    "schedule",
+]
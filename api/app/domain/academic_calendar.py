@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import NamedTuple, Optional
+
+from loguru import logger
+
+import app.clients.lks.models as lks
+from app.domain.week import Week
+
+
+class AcademicWeek(NamedTuple):
+    number: int
+    week: Week
+
+
+class AcademicCalendar:
+    """Номер и чётность учебной недели для каждого дня семестра.
+
+    Первая неделя - календарная неделя от понедельника, на которую
+    приходится начало семестра, нечётные недели - числитель. При
+    `flip_parity` нечётные недели, наоборот, знаменатель. Таблица дней
+    строится один раз, поиск по дате - O(1). Дни вне семестра в таблицу не
+    попадают.
+    """
+
+    def __init__(
+        self,
+        semester_starts: date,
+        semester_ends: date,
+        week_offset: int = 0,
+        flip_parity: bool = False,
+    ) -> None:
+        self.semester_starts = semester_starts
+        self.semester_ends = semester_ends
+        self.flip_parity = flip_parity
+        first_monday = semester_starts - timedelta(days=semester_starts.weekday())
+        days = (semester_ends - semester_starts).days + 1
+        self.__days = tuple(
+            self.__academic_week(
+                ((semester_starts - first_monday).days + offset) // 7 + 1 + week_offset,
+            )
+            for offset in range(max(days, 0))
+        )
+
+    @classmethod
+    def from_current_schedule(
+        cls,
+        current_schedule: lks.CurrentSchedule,
+        today: date,
+    ) -> AcademicCalendar:
+        """Строит календарь по ответу ЛКС про текущий семестр.
+
+        Если сегодняшний день внутри семестра, номер недели и чётность из ЛКС
+        считаются верными: нумерация сдвигается под номер, чётность же при
+        расхождении берётся из `weekShortName`.
+        """
+        calendar = cls(current_schedule.semester_starts, current_schedule.semester_ends)
+        current = calendar.get(today)
+        if current is None:
+            return calendar
+
+        week_offset = current_schedule.week_number - current.number
+        number = current_schedule.week_number
+        counted = Week.ODD if number % 2 else Week.EVEN
+        lks_week = Week.from_lks_ru(current_schedule.week_ru)
+        flip_parity = lks_week not in {Week.ALL, counted}
+        if flip_parity:
+            logger.warning(
+                f"LKS week {number} is {lks_week}, counted parity is {counted}; "
+                "using parity from LKS",
+            )
+        if week_offset == 0 and not flip_parity:
+            return calendar
+        return cls(
+            current_schedule.semester_starts,
+            current_schedule.semester_ends,
+            week_offset=week_offset,
+            flip_parity=flip_parity,
+        )
+
+    def get(self, day: date) -> Optional[AcademicWeek]:
+        offset = (day - self.semester_starts).days
+        if 0 <= offset < len(self.__days):
+            return self.__days[offset]
+        return None
+
+    def week(self, day: date) -> Optional[Week]:
+        academic_week = self.get(day)
+        return academic_week.week if academic_week else None
+
+    def __academic_week(self, number: int) -> AcademicWeek:
+        odd = bool(number % 2) != self.flip_parity
+        return AcademicWeek(number=number, week=Week.ODD if odd else Week.EVEN)
@@ -17,6 +17,11 @@ class DayOfWeek(StrEnum):
     def from_datetime(cls, dt: datetime) -> "DayOfWeek":
         return cls(dt.strftime("%A").lower())
 
+    @classmethod
+    def from_weekday(cls, weekday: int) -> "DayOfWeek":
+        # нумерация как у datetime.weekday(): понедельник - 0
+        return _DAYS_OF_WEEK[weekday]
+
     @classmethod
     def from_lks(cls, day: Day) -> "DayOfWeek":
         all_days_of_week = (
@@ -29,3 +34,6 @@ class DayOfWeek(StrEnum):
             cls.SUNDAY,
         )
         return all_days_of_week[day - 1]
+
+
+_DAYS_OF_WEEK = tuple(DayOfWeek)
@@ -4,3 +4,7 @@ class NotFoundError(Exception):
 
 class InvalidTimeFormatError(ValueError):
     pass
+
+
+class SyncNotResumableError(Exception):
+    pass
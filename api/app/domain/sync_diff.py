@@ -0,0 +1,55 @@
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any
+
+
+class SyncEntity(StrEnum):
+    UNIVERSITIES = "universities"
+    FILIALS = "filials"
+    FACULTIES = "faculties"
+    DEPARTMENTS = "departments"
+    COURSES = "courses"
+    GROUPS = "groups"
+    TEACHERS = "teachers"
+    AUDIENCES = "audiences"
+    DISCIPLINES = "disciplines"
+    SCHEDULE_PAIRS = "schedule_pairs"
+    SCHEDULE_PAIR_GROUPS = "schedule_pair_group"
+    SCHEDULE_PAIR_TEACHERS = "schedule_pair_teacher"
+    SCHEDULE_PAIR_AUDIENCES = "schedule_pair_audience"
+
+
+# естественный ключ записи (lks_id, unique_field или пара ключей для связей)
+# -> сравниваемые значения, где родители тоже заданы естественными ключами
+EntityRows = dict[Any, tuple[Any, ...]]
+Snapshot = dict[SyncEntity, EntityRows]
+
+
+@dataclass
+class EntityDiff:
+    inserts: set[Any] = field(default_factory=set)
+    updates: set[Any] = field(default_factory=set)
+    deletes: set[Any] = field(default_factory=set)
+
+
+@dataclass
+class SyncDiff:
+    entities: dict[SyncEntity, EntityDiff]
+    failed_groups: int = 0
+
+
+def diff_snapshots(current: Snapshot, target: Snapshot) -> dict[SyncEntity, EntityDiff]:
+    diff = {}
+    for entity in SyncEntity:
+        current_rows = current.get(entity, {})
+        target_rows = target.get(entity, {})
+        diff[entity] = EntityDiff(
+            inserts=target_rows.keys() - current_rows.keys(),
+            updates={
+                key
+                for key in target_rows.keys() & current_rows.keys()
+                if target_rows[key] != current_rows[key]
+            },
+            deletes=current_rows.keys() - target_rows.keys(),
+        )
+    return diff
@@ -0,0 +1,7 @@
+from enum import StrEnum
+
+
+class SyncKind(StrEnum):
+    SYNC = "sync"
+    # пробный прогон: отчёт о том, что изменила бы синхронизация
+    DIFF = "diff"
@@ -0,0 +1,7 @@
+from enum import StrEnum
+
+
+class SyncStage(StrEnum):
+    STRUCTURE = "structure"
+    SCHEDULE = "schedule"
+    RECONCILE = "reconcile"
@@ -2,6 +2,7 @@ from enum import StrEnum
 
 
 class SyncStatus(StrEnum):
+    QUEUED = "queued"
     IN_PROGRESS = "in_progress"
     SUCCESS = "success"
     FAILED = "failed"
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 
 from pydantic import BaseModel
 
@@ -26,28 +26,17 @@ class TimeSlot(BaseModel):
         end_time: str,
         current_date: datetime,
     ) -> TimeSlot:
-        try:
-            start_hour, start_minute = map(int, start_time.split(":"))
-            end_hour, end_minute = map(int, end_time.split(":"))
-        except ValueError as e:
-            raise InvalidTimeFormatError from e
-
-        concrete_start = current_date.replace(
-            hour=start_hour,
-            minute=start_minute,
-            second=0,
-            microsecond=0,
-            tzinfo=MOSCOW_TZ,
-        )
-        concrete_end = current_date.replace(
-            hour=end_hour,
-            minute=end_minute,
-            second=0,
-            microsecond=0,
-            tzinfo=MOSCOW_TZ,
-        )
-
+        day = current_date.date()
         return TimeSlot(
-            start_time=concrete_start,
-            end_time=concrete_end,
+            start_time=datetime.combine(day, parse_time(start_time), MOSCOW_TZ),
+            end_time=datetime.combine(day, parse_time(end_time), MOSCOW_TZ),
         )
+
+
+def parse_time(value: str) -> time:
+    """Разбирает время пары из строки вида `HH:MM`."""
+    try:
+        hour, minute = map(int, value.split(":"))
+        return time(hour=hour, minute=minute)
+    except ValueError as e:
+        raise InvalidTimeFormatError from e
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
 from enum import StrEnum
 
 import app.clients.lks.models as lks
@@ -21,15 +20,6 @@ class Week(StrEnum):
             return Week.EVEN
         return Week.ALL
 
-    @classmethod
-    def from_datetime(cls, dt: datetime, current_week: Week) -> Week:
-        current_week_num = datetime.now(tz=timezone.utc).isocalendar()[1]
-        dt_week_num = dt.isocalendar()[1]
-
-        if current_week_num % 2 == dt_week_num % 2:
-            return current_week
-        return current_week.opposite()
-
     @classmethod
     def from_lks(cls, week: lks.Week) -> Week:
         lks_to_domain = {
@@ -17,6 +17,7 @@ class Course(Base, AbbrMixin, SyncMixin):
         Integer,
         ForeignKey("departments.id"),
         nullable=False,
+        index=True,
     )
     course_num: Mapped[int] = mapped_column(Integer, nullable=False)
     unique_field: Mapped[str] = mapped_column(
@@ -17,6 +17,7 @@ class Department(Base, LksMixin, AbbrNameMixin, SyncMixin):
         Integer,
         ForeignKey("faculties.id"),
         nullable=False,
+        index=True,
     )
 
     faculty: Mapped["Faculty"] = relationship("Faculty", back_populates="departments")
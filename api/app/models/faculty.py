@@ -17,6 +17,7 @@ class Faculty(Base, LksMixin, AbbrNameMixin, SyncMixin):
         Integer,
         ForeignKey("filials.id"),
         nullable=False,
+        index=True,
     )
 
     filial: Mapped["Filial"] = relationship("Filial", back_populates="faculties")
@@ -17,6 +17,7 @@ class Filial(Base, LksMixin, AbbrNameMixin, SyncMixin):
         Integer,
         ForeignKey("universities.id"),
         nullable=False,
+        index=True,
     )
 
     university: Mapped["University"] = relationship(
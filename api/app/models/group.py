@@ -1,11 +1,12 @@
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import ForeignKey, Integer
+from sqlalchemy import ForeignKey, Integer, String, and_
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import AbbrMixin, Base, LksMixin, SyncMixin
 from app.models.course import Course
 from app.models.many_to_many import schedule_pair_group
+from app.models.synchronization import published_sync_id
 
 if TYPE_CHECKING:
     from app.models.schedule_pair import SchedulePair
@@ -18,13 +19,27 @@ class Group(Base, LksMixin, AbbrMixin, SyncMixin):
         Integer,
         ForeignKey("courses.id"),
         nullable=True,
+        index=True,
     )
     semester_num: Mapped[int] = mapped_column(Integer, nullable=False)
+    schedule_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # синхронизация, в которой расписание группы последний раз было обработано
+    schedule_sync_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        ForeignKey("synchronizations.id"),
+        nullable=True,
+    )
 
     course: Mapped[Optional["Course"]] = relationship("Course", back_populates="groups")
 
     schedule_pairs: Mapped[list["SchedulePair"]] = relationship(
         "SchedulePair",
         secondary=schedule_pair_group,
+        primaryjoin=lambda: and_(
+            Group.id == schedule_pair_group.c.group_id,
+            schedule_pair_group.c.sync_id == published_sync_id(),
+        ),
+        secondaryjoin="SchedulePair.id == schedule_pair_group.c.schedule_pair_id",
         back_populates="groups",
+        viewonly=True,
     )
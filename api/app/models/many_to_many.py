@@ -1,7 +1,9 @@
-from sqlalchemy import Column, ForeignKey, Integer, Table
+from sqlalchemy import Column, ForeignKey, Index, Integer, Table
 
 from app.models.base import Base
 
+# связи групп версионированы синхронизацией: новая синхронизация пишет свою
+# версию рядом со старой, а читатели видят только опубликованную
 schedule_pair_group = Table(
     "schedule_pair_group",
     Base.metadata,
@@ -12,6 +14,13 @@ schedule_pair_group = Table(
         primary_key=True,
     ),
     Column("group_id", Integer, ForeignKey("groups.id"), primary_key=True),
+    Column(
+        "sync_id",
+        Integer,
+        ForeignKey("synchronizations.id"),
+        primary_key=True,
+    ),
+    Index("ix_schedule_pair_group_group_id_sync_id", "group_id", "sync_id"),
 )
 
 schedule_pair_teacher = Table(
@@ -1,6 +1,6 @@
 from typing import List
 
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Integer, String, and_
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.audience import Audience
@@ -12,6 +12,7 @@ from app.models.many_to_many import (
     schedule_pair_group,
     schedule_pair_teacher,
 )
+from app.models.synchronization import published_sync_id
 from app.models.teacher import Teacher
 
 
@@ -41,7 +42,13 @@ class SchedulePair(Base, SyncMixin):
     groups: Mapped[List[Group]] = relationship(
         "Group",
         secondary=schedule_pair_group,
+        primaryjoin=lambda: and_(
+            SchedulePair.id == schedule_pair_group.c.schedule_pair_id,
+            schedule_pair_group.c.sync_id == published_sync_id(),
+        ),
+        secondaryjoin=lambda: Group.id == schedule_pair_group.c.group_id,
         back_populates="schedule_pairs",
+        viewonly=True,
     )
     teachers: Mapped[List[Teacher]] = relationship(
         "Teacher",
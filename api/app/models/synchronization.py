@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import DateTime, Integer, ScalarSelect, String, func, select
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -12,7 +13,41 @@ class Synchronization(Base):
 
     comment: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     status: Mapped[str] = mapped_column(String, nullable=False)
+    kind: Mapped[str] = mapped_column(
+        String,
+        nullable=False,
+        default="sync",
+        server_default="sync",
+    )
     finished_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
     )
+    stage: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    groups_total: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    groups_done: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+    report: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    # воркер периодически обновляет отметку, пока выполняет синхронизацию
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    # момент, с которого расписание этой синхронизации видно читателям
+    published_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+
+def published_sync_id() -> ScalarSelect[Optional[int]]:
+    """Id последней опубликованной синхронизации, связи групп читаются из неё."""
+    return (
+        select(func.max(Synchronization.id))
+        .where(Synchronization.published_at.is_not(None))
+        .scalar_subquery()
+    )
@@ -66,6 +66,8 @@ class AudienceRepo(UniqueFieldRepo[Audience]):
             )
             .where(
                 schedule_pair_audience.c.audience_id == audience_id,
+                # пары, которых нет в опубликованном расписании групп, скрыты
+                SchedulePair.groups.any(),
             )
         )
 
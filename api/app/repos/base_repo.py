@@ -1,13 +1,34 @@
-from typing import Generic, Optional, Type, TypeVar
+from typing import Any, Collection, Generic, Optional, Sequence, Type, TypeVar, cast
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import CursorResult, Result, delete, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.base import Base
 
 T = TypeVar("T", bound=Base)
 
+# asyncpg ограничивает число параметров запроса (32767), поэтому большие
+# пачки режем на части
+UPSERT_BATCH_SIZE = 1000
+ID_MAP_CHUNK_SIZE = 10000
+
+
+def rowcount(result: Result[Any]) -> int:
+    """Число строк, затронутых DML-запросом без RETURNING."""
+    return cast(CursorResult[Any], result).rowcount  # noqa: TC006
+
+
+class UpsertedIds(dict[Any, int]):
+    """Id записей после upsert по ключу; `inserted` - сколько из них новые."""
+
+    inserted: int = 0
+
+    @property
+    def updated(self) -> int:
+        return len(self) - self.inserted
+
 
 class BaseRepo(Generic[T]):
     model: Type[T]
@@ -21,6 +42,78 @@ class BaseRepo(Generic[T]):
         await session.refresh(record)
         return record
 
+    async def _upsert_many(
+        self,
+        session: AsyncSession,
+        rows: Sequence[dict[str, Any]],
+        key: str,
+        update_columns: Sequence[str],
+    ) -> UpsertedIds:
+        # дубликаты ключа в одном INSERT ... ON CONFLICT DO UPDATE запрещены,
+        # а сортировка по ключу уменьшает шанс дедлока между транзакциями
+        unique_rows = sorted(
+            {row[key]: row for row in rows}.values(),
+            key=lambda row: row[key],
+        )
+        key_column = self.model.__table__.c[key]
+
+        ids = UpsertedIds()
+        for start in range(0, len(unique_rows), UPSERT_BATCH_SIZE):
+            insert_stmt = insert(self.model).values(
+                unique_rows[start : start + UPSERT_BATCH_SIZE],
+            )
+            upsert_stmt = insert_stmt.on_conflict_do_update(
+                index_elements=[key_column],
+                set_={
+                    column: insert_stmt.excluded[column] for column in update_columns
+                },
+            ).returning(
+                key_column,
+                self.model.id,
+                # xmax = 0 только у строк, вставленных, а не обновлённых запросом
+                literal_column("xmax = 0").label("inserted"),
+            )
+            res = await session.execute(upsert_stmt)
+            for key_value, record_id, inserted in res.tuples():
+                ids[key_value] = record_id
+                ids.inserted += inserted
+        return ids
+
+    async def touch_many(
+        self,
+        session: AsyncSession,
+        ids: Collection[int],
+        sync_id: int,
+    ) -> None:
+        ordered_ids = sorted(ids)
+        for start in range(0, len(ordered_ids), UPSERT_BATCH_SIZE):
+            await session.execute(
+                update(self.model)
+                .where(
+                    self.model.id.in_(ordered_ids[start : start + UPSERT_BATCH_SIZE]),
+                )
+                .values(sync_id=sync_id)
+                .execution_options(synchronize_session=False),
+            )
+
+    async def delete_stale(self, session: AsyncSession, sync_id: int) -> int:
+        sync_column = self.model.__table__.c.sync_id
+        res = await session.execute(
+            delete(self.model)
+            .where(sync_column < sync_id)
+            .execution_options(synchronize_session=False),
+        )
+        return rowcount(res)
+
+    async def _get_id_map(self, session: AsyncSession, key: str) -> dict[Any, int]:
+        key_column = self.model.__table__.c[key]
+        result = await session.stream(
+            select(key_column, self.model.id).execution_options(
+                yield_per=ID_MAP_CHUNK_SIZE,
+            ),
+        )
+        return {key_value: record_id async for key_value, record_id in result}
+
 
 class LksIdRepo(BaseRepo[T]):
     async def get_by_lks_id(
@@ -33,6 +126,17 @@ class LksIdRepo(BaseRepo[T]):
         )
         return res.scalar_one_or_none()
 
+    async def upsert_by_lks_id(
+        self,
+        session: AsyncSession,
+        rows: Sequence[dict[str, Any]],
+        update_columns: Sequence[str] = ("sync_id",),
+    ) -> UpsertedIds:
+        return await self._upsert_many(session, rows, "lks_id", update_columns)
+
+    async def get_lks_id_map(self, session: AsyncSession) -> dict[UUID, int]:
+        return await self._get_id_map(session, "lks_id")
+
 
 class UniqueFieldRepo(BaseRepo[T]):
     async def get_by_unique_field(
@@ -44,3 +148,14 @@ class UniqueFieldRepo(BaseRepo[T]):
             select(self.model).where(self.model.unique_field == unique_field),
         )
         return res.scalar_one_or_none()
+
+    async def upsert_by_unique_field(
+        self,
+        session: AsyncSession,
+        rows: Sequence[dict[str, Any]],
+        update_columns: Sequence[str] = ("sync_id",),
+    ) -> UpsertedIds:
+        return await self._upsert_many(session, rows, "unique_field", update_columns)
+
+    async def get_unique_field_map(self, session: AsyncSession) -> dict[str, int]:
+        return await self._get_id_map(session, "unique_field")
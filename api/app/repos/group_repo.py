@@ -1,16 +1,20 @@
 from functools import lru_cache
 from typing import Optional, Sequence, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 from sqlalchemy.sql.functions import count
 
 from app.domain.schedule import ScheduleResult
 from app.models.course import Course
+from app.models.department import Department
+from app.models.faculty import Faculty
+from app.models.filial import Filial
 from app.models.group import Group
 from app.models.many_to_many import schedule_pair_group
 from app.models.schedule_pair import SchedulePair
+from app.models.synchronization import published_sync_id
 from app.repos.base_repo import LksIdRepo
 
 
@@ -33,15 +37,26 @@ class GroupRepo(LksIdRepo[Group]):
         if abbr:
             query = query.where(self.model.abbr.ilike(f"%{abbr}%"))
 
+        # фильтры по иерархии — цепочка join по внешним ключам вверх от группы
+        if course_abbr or department_abbr or faculty_abbr or filial_abbr:
+            query = query.join(self.model.course)
         if course_abbr:
-            query = query.join(self.model.course).where(
-                Course.abbr.ilike(f"%{course_abbr}%"),
-            )
+            query = query.where(Course.abbr.ilike(f"%{course_abbr}%"))
 
-        # todo other joins
         if department_abbr or faculty_abbr or filial_abbr:
-            msg = "Department, faculty and filial filters are not implemented"
-            raise NotImplementedError(msg)
+            query = query.join(Course.department)
+        if department_abbr:
+            query = query.where(Department.abbr.ilike(f"%{department_abbr}%"))
+
+        if faculty_abbr or filial_abbr:
+            query = query.join(Department.faculty)
+        if faculty_abbr:
+            query = query.where(Faculty.abbr.ilike(f"%{faculty_abbr}%"))
+
+        if filial_abbr:
+            query = query.join(Faculty.filial).where(
+                Filial.abbr.ilike(f"%{filial_abbr}%"),
+            )
 
         count_query = select(count()).select_from(query.subquery())
         total = await session.scalar(count_query)
@@ -55,6 +70,70 @@ class GroupRepo(LksIdRepo[Group]):
 
         return groups, total or 0
 
+    async def get_schedule_hash_map(self, session: AsyncSession) -> dict[int, str]:
+        res = await session.execute(
+            select(self.model.id, self.model.schedule_hash).where(
+                self.model.schedule_hash.is_not(None),
+            ),
+        )
+        return {
+            group_id: schedule_hash
+            for group_id, schedule_hash in res.tuples()
+            if schedule_hash is not None
+        }
+
+    async def set_schedule_hash(
+        self,
+        session: AsyncSession,
+        group_id: int,
+        schedule_hash: Optional[str],
+    ) -> None:
+        await session.execute(
+            update(self.model)
+            .where(self.model.id == group_id)
+            .values(schedule_hash=schedule_hash),
+        )
+
+    async def mark_schedule_synced(
+        self,
+        session: AsyncSession,
+        group_ids: Sequence[int],
+        sync_id: int,
+    ) -> None:
+        if not group_ids:
+            return
+        await session.execute(
+            update(self.model)
+            .where(self.model.id.in_(group_ids))
+            .values(schedule_sync_id=sync_id)
+            .execution_options(synchronize_session=False),
+        )
+
+    async def reset_unpublished_schedule_hashes(self, session: AsyncSession) -> None:
+        """Сбрасывает хеши групп, записанных неопубликованной синхронизацией.
+
+        Такие хеши описывают расписание, которого читатели не увидели. Без
+        этого шага следующая синхронизация пропустила бы такие группы.
+        """
+        await session.execute(
+            update(self.model)
+            .where(
+                self.model.schedule_sync_id > func.coalesce(published_sync_id(), 0),
+            )
+            .values(schedule_hash=None)
+            .execution_options(synchronize_session=False),
+        )
+
+    async def get_schedule_synced_ids(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+    ) -> set[int]:
+        res = await session.execute(
+            select(self.model.id).where(self.model.schedule_sync_id == sync_id),
+        )
+        return set(res.scalars().all())
+
     async def get_schedule_by_group_id(
         self,
         session: AsyncSession,
@@ -81,6 +160,7 @@ class GroupRepo(LksIdRepo[Group]):
             )
             .where(
                 schedule_pair_group.c.group_id == group_id,
+                schedule_pair_group.c.sync_id == published_sync_id(),
             )
         )
 
@@ -1,12 +1,29 @@
 from functools import lru_cache
-from typing import Optional
+from typing import Collection, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Table,
+    delete,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from app.models.audience import Audience
+from app.models.discipline import Discipline
+from app.models.group import Group
+from app.models.many_to_many import (
+    schedule_pair_audience,
+    schedule_pair_group,
+    schedule_pair_teacher,
+)
 from app.models.schedule_pair import SchedulePair
-from app.repos.base_repo import UniqueFieldRepo
+from app.models.synchronization import published_sync_id
+from app.models.teacher import Teacher
+from app.repos.base_repo import UniqueFieldRepo, rowcount
 
 
 class SchedulePairRepo(UniqueFieldRepo[SchedulePair]):
@@ -26,6 +43,177 @@ class SchedulePairRepo(UniqueFieldRepo[SchedulePair]):
         )
         return res.unique().scalar_one_or_none()
 
+    async def add_links(
+        self,
+        session: AsyncSession,
+        schedule_pair_id: int,
+        group_ids: Sequence[int],
+        teacher_ids: Sequence[int],
+        audience_ids: Sequence[int],
+        sync_id: int,
+    ) -> None:
+        """Связи групп пишутся в версию `sync_id`.
+
+        Преподаватели и аудитории входят в ключ пары, поэтому их связи пишутся
+        только при создании пары и потом не меняются.
+        """
+        links: tuple[tuple[Table, str, Sequence[int], dict[str, int]], ...] = (
+            (schedule_pair_group, "group_id", group_ids, {"sync_id": sync_id}),
+            (schedule_pair_teacher, "teacher_id", teacher_ids, {}),
+            (schedule_pair_audience, "audience_id", audience_ids, {}),
+        )
+        for table, column, ids, extra in links:
+            if not ids:
+                continue
+            await session.execute(
+                insert(table)
+                .values(
+                    [
+                        {
+                            "schedule_pair_id": schedule_pair_id,
+                            column: record_id,
+                            **extra,
+                        }
+                        for record_id in ids
+                    ],
+                )
+                .on_conflict_do_nothing(),
+            )
+
+    async def delete_group_links(
+        self,
+        session: AsyncSession,
+        group_id: int,
+        sync_id: int,
+    ) -> None:
+        await session.execute(
+            delete(schedule_pair_group).where(
+                schedule_pair_group.c.group_id == group_id,
+                schedule_pair_group.c.sync_id == sync_id,
+            ),
+        )
+
+    async def carry_forward_links(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+        group_ids: Optional[Collection[int]] = None,
+    ) -> None:
+        """Копирует опубликованные связи групп в версию `sync_id`.
+
+        Так в новую версию попадает расписание групп, которые синхронизация не
+        перезаписала. Без `group_ids` копируются все группы, не обработанные
+        в этой синхронизации.
+        """
+        if group_ids is not None and not group_ids:
+            return
+        group_filter = (
+            schedule_pair_group.c.group_id.in_(sorted(group_ids))
+            if group_ids is not None
+            else schedule_pair_group.c.group_id.in_(
+                select(Group.id).where(
+                    Group.schedule_sync_id.is_distinct_from(sync_id),
+                ),
+            )
+        )
+        await session.execute(
+            insert(schedule_pair_group)
+            .from_select(
+                ["schedule_pair_id", "group_id", "sync_id"],
+                select(
+                    schedule_pair_group.c.schedule_pair_id,
+                    schedule_pair_group.c.group_id,
+                    literal(sync_id),
+                ).where(
+                    schedule_pair_group.c.sync_id == published_sync_id(),
+                    group_filter,
+                ),
+            )
+            .on_conflict_do_nothing(),
+        )
+
+    async def delete_old_link_versions(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+    ) -> int:
+        res = await session.execute(
+            delete(schedule_pair_group).where(schedule_pair_group.c.sync_id < sync_id),
+        )
+        return rowcount(res)
+
+    async def touch_live_schedules(self, session: AsyncSession, sync_id: int) -> None:
+        """Продлевает до sync_id пары живых групп и всё, на что они ссылаются.
+
+        Связи перезаписанных групп уже пересобраны, поэтому так сохраняется
+        расписание групп, которые в этот раз не перезаписывались: без
+        изменений, после ошибки загрузки или из прерванного прогона.
+        """
+        pair_ids = (
+            select(schedule_pair_group.c.schedule_pair_id)
+            .join(Group, Group.id == schedule_pair_group.c.group_id)
+            .where(Group.sync_id == sync_id, schedule_pair_group.c.sync_id == sync_id)
+        )
+        statements = (
+            update(SchedulePair).where(SchedulePair.id.in_(pair_ids)),
+            update(Teacher).where(
+                Teacher.id.in_(
+                    select(schedule_pair_teacher.c.teacher_id).where(
+                        schedule_pair_teacher.c.schedule_pair_id.in_(pair_ids),
+                    ),
+                ),
+            ),
+            update(Audience).where(
+                Audience.id.in_(
+                    select(schedule_pair_audience.c.audience_id).where(
+                        schedule_pair_audience.c.schedule_pair_id.in_(pair_ids),
+                    ),
+                ),
+            ),
+            update(Discipline).where(
+                Discipline.id.in_(
+                    select(SchedulePair.discipline_id).where(
+                        SchedulePair.id.in_(pair_ids),
+                    ),
+                ),
+            ),
+        )
+        for stmt in statements:
+            table = stmt.table
+            await session.execute(
+                stmt.where(table.c.sync_id < sync_id)
+                .values(sync_id=sync_id)
+                .execution_options(synchronize_session=False),
+            )
+
+    async def delete_stale_links(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+    ) -> dict[str, int]:
+        """Удаляет связи устаревших пар, групп, преподавателей и аудиторий.
+
+        Возвращает число удалённых строк по имени таблицы связей.
+        """
+        links: tuple[tuple[Table, type[Group | Teacher | Audience], str], ...] = (
+            (schedule_pair_group, Group, "group_id"),
+            (schedule_pair_teacher, Teacher, "teacher_id"),
+            (schedule_pair_audience, Audience, "audience_id"),
+        )
+        stale_pair_ids = select(SchedulePair.id).where(SchedulePair.sync_id < sync_id)
+
+        deleted: dict[str, int] = {}
+        for table, model, column in links:
+            stale_ids = select(model.id).where(model.sync_id < sync_id)
+            res = await session.execute(
+                delete(table).where(
+                    table.c.schedule_pair_id.in_(stale_pair_ids)
+                    | table.c[column].in_(stale_ids),
+                ),
+            )
+            deleted[table.name] = rowcount(res)
+        return deleted
+
 
 @lru_cache(maxsize=1)
 def schedule_pair_repo() -> SchedulePairRepo:
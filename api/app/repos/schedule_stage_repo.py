@@ -0,0 +1,199 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Collection
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Result,
+    String,
+    Table,
+    delete,
+    func,
+    literal,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.models.many_to_many import (
+    schedule_pair_audience,
+    schedule_pair_group,
+    schedule_pair_teacher,
+)
+from app.models.schedule_pair import SchedulePair
+from app.repos.base_repo import UpsertedIds
+
+# временные таблицы живут до конца транзакции и в общую схему не попадают
+stage_metadata = MetaData()
+
+
+def _stage_table(name: str, *columns: Column[Any]) -> Table:
+    return Table(
+        name,
+        stage_metadata,
+        *columns,
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+
+
+stage_schedule_pairs = _stage_table(
+    "stage_schedule_pairs",
+    Column("unique_field", String, nullable=False),
+    Column("day", String, nullable=False),
+    Column("week", String, nullable=False),
+    Column("start_time", String, nullable=False),
+    Column("end_time", String, nullable=False),
+    Column("discipline_id", Integer, nullable=False),
+)
+stage_schedule_pair_group = _stage_table(
+    "stage_schedule_pair_group",
+    Column("unique_field", String, nullable=False),
+    Column("group_id", Integer, nullable=False),
+)
+stage_schedule_pair_teacher = _stage_table(
+    "stage_schedule_pair_teacher",
+    Column("unique_field", String, nullable=False),
+    Column("teacher_id", Integer, nullable=False),
+)
+stage_schedule_pair_audience = _stage_table(
+    "stage_schedule_pair_audience",
+    Column("unique_field", String, nullable=False),
+    Column("audience_id", Integer, nullable=False),
+)
+
+
+@dataclass
+class ScheduleStage:
+    """Строки расписаний пачки групп в порядке колонок staging-таблиц.
+
+    Пары и связи ссылаются друг на друга через unique_field пары, т.к. id
+    новых пар появятся только при слиянии.
+    """
+
+    pairs: list[tuple[str, str, str, str, str, int]] = field(default_factory=list)
+    group_links: list[tuple[str, int]] = field(default_factory=list)
+    teacher_links: list[tuple[str, int]] = field(default_factory=list)
+    audience_links: list[tuple[str, int]] = field(default_factory=list)
+
+
+class ScheduleStageRepo:
+    """Пишет расписания пачкой: COPY во временные таблицы и слияние в основные.
+
+    Вместо запроса на каждую пару и связь выполняется по одному COPY на
+    staging-таблицу и несколько запросов INSERT ... SELECT. Вызывать нужно
+    внутри транзакции, которая затем коммитится: временные таблицы
+    удаляются при коммите.
+    """
+
+    async def merge(
+        self,
+        session: AsyncSession,
+        stage: ScheduleStage,
+        group_ids: Collection[int],
+        sync_id: int,
+    ) -> UpsertedIds:
+        """Заменяет расписания групп `group_ids` на `stage`.
+
+        Возвращает id записанных пар по unique_field.
+        """
+        connection = await session.connection()
+        await connection.run_sync(stage_metadata.create_all, checkfirst=False)
+        await self.__copy(connection, stage)
+
+        pair_ids = await self.__merge_pairs(session, sync_id)
+        # связи групп строятся заново, так отменённые пары пропадут из их
+        # расписаний
+        await session.execute(
+            delete(schedule_pair_group).where(
+                schedule_pair_group.c.group_id.in_(sorted(group_ids)),
+                schedule_pair_group.c.sync_id == sync_id,
+            ),
+        )
+        # связи групп пишутся в версию этой синхронизации
+        links: tuple[tuple[Table, Table, str, dict[str, Any]], ...] = (
+            (
+                schedule_pair_group,
+                stage_schedule_pair_group,
+                "group_id",
+                {"sync_id": literal(sync_id)},
+            ),
+            (schedule_pair_teacher, stage_schedule_pair_teacher, "teacher_id", {}),
+            (
+                schedule_pair_audience,
+                stage_schedule_pair_audience,
+                "audience_id",
+                {},
+            ),
+        )
+        for table, stage_table, column, version in links:
+            await session.execute(
+                insert(table)
+                .from_select(
+                    ["schedule_pair_id", column, *version],
+                    select(SchedulePair.id, stage_table.c[column], *version.values())
+                    .join(
+                        SchedulePair,
+                        SchedulePair.unique_field == stage_table.c.unique_field,
+                    )
+                    .distinct(),
+                )
+                .on_conflict_do_nothing(),
+            )
+        return pair_ids
+
+    @staticmethod
+    async def __copy(connection: AsyncConnection, stage: ScheduleStage) -> None:
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        assert driver_connection is not None
+        for table, records in (
+            (stage_schedule_pairs, stage.pairs),
+            (stage_schedule_pair_group, stage.group_links),
+            (stage_schedule_pair_teacher, stage.teacher_links),
+            (stage_schedule_pair_audience, stage.audience_links),
+        ):
+            if not records:
+                continue
+            await driver_connection.copy_records_to_table(
+                table.name,
+                records=records,
+                columns=[column.name for column in table.columns],
+            )
+
+    @staticmethod
+    async def __merge_pairs(session: AsyncSession, sync_id: int) -> UpsertedIds:
+        stage = stage_schedule_pairs
+        insert_stmt = insert(SchedulePair).from_select(
+            [*(column.name for column in stage.columns), "sync_id", "created_at"],
+            # сортировка по ключу уменьшает шанс дедлока между транзакциями
+            select(*stage.columns, literal(sync_id), func.now()).order_by(
+                stage.c.unique_field,
+            ),
+        )
+        res: Result[str, int, bool] = await session.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=[SchedulePair.unique_field],
+                # остальные поля входят в ключ пары, видимую читателям строку
+                # меняет только sync_id
+                set_={"sync_id": insert_stmt.excluded.sync_id},
+            ).returning(
+                SchedulePair.unique_field,
+                SchedulePair.id,
+                literal_column("xmax = 0").label("inserted"),
+            ),
+        )
+
+        ids = UpsertedIds()
+        for unique_field, pair_id, inserted in res.tuples():
+            ids[unique_field] = pair_id
+            ids.inserted += inserted
+        return ids
+
+
+@lru_cache(maxsize=1)
+def schedule_stage_repo() -> ScheduleStageRepo:
+    return ScheduleStageRepo()
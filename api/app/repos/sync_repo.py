@@ -1,16 +1,122 @@
+from datetime import datetime, timedelta, timezone
 from functools import lru_cache
+from typing import Any, Optional
 
-from sqlalchemy import update
+from sqlalchemy import ColumnElement, and_, exists, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.domain.sync_kind import SyncKind
+from app.domain.sync_stage import SyncStage
 from app.domain.sync_status import SyncStatus
 from app.models.synchronization import Synchronization
 from app.repos.base_repo import BaseRepo
 
+# ключ advisory-блокировки, под которой воркеры по очереди забирают задачи
+SYNC_CLAIM_LOCK_ID = 7_314_001
+
 
 class SyncRepo(BaseRepo[Synchronization]):
     model = Synchronization
 
+    async def claim(
+        self,
+        session: AsyncSession,
+        stale_after_sec: float,
+    ) -> Optional[Synchronization]:
+        """Забирает старейшую синхронизацию из очереди и помечает её начатой.
+
+        Брошенная упавшим воркером синхронизация тоже попадает в выборку.
+        Пока другая синхронизация выполняется, ничего не возвращает: две
+        синхронизации одновременно перезаписывали бы данные друг друга.
+        Синхронизации старше опубликованной помечаются упавшими: их версия
+        уже никогда не станет видна читателям.
+        """
+        await session.execute(select(func.pg_advisory_xact_lock(SYNC_CLAIM_LOCK_ID)))
+        now = datetime.now(tz=timezone.utc)
+        stale_before = now - timedelta(seconds=stale_after_sec)
+        if await session.scalar(select(exists().where(self._alive(stale_before)))):
+            return None
+
+        pending = or_(
+            self.model.status == SyncStatus.QUEUED,
+            and_(
+                self.model.status == SyncStatus.IN_PROGRESS,
+                ~self._alive(stale_before),
+            ),
+        )
+        await session.execute(
+            update(self.model)
+            .where(pending, self._superseded())
+            .values(status=SyncStatus.FAILED, finished_at=now),
+        )
+        sync_model = await session.scalar(
+            select(self.model)
+            .where(pending, ~self._superseded())
+            .order_by(self.model.id)
+            .limit(1)
+            .with_for_update(skip_locked=True),
+        )
+        if sync_model is None:
+            return None
+        sync_model.status = SyncStatus.IN_PROGRESS
+        sync_model.heartbeat_at = now
+        await session.flush()
+        return sync_model
+
+    async def touch_heartbeat(self, session: AsyncSession, sync_id: int) -> None:
+        await session.execute(
+            update(self.model)
+            .where(self.model.id == sync_id)
+            .values(heartbeat_at=datetime.now(tz=timezone.utc)),
+        )
+
+    async def has_newer(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+        stale_after_sec: float,
+    ) -> bool:
+        """Есть ли после `sync_id` опубликованная или выполняющаяся синхронизация.
+
+        Пробные прогоны не учитываются.
+        """
+        stale_before = datetime.now(tz=timezone.utc) - timedelta(
+            seconds=stale_after_sec,
+        )
+        return bool(
+            await session.scalar(
+                select(
+                    exists().where(
+                        self.model.id > sync_id,
+                        self.model.kind == SyncKind.SYNC,
+                        or_(
+                            self.model.published_at.is_not(None),
+                            self._alive(stale_before),
+                        ),
+                    ),
+                ),
+            ),
+        )
+
+    def _superseded(self) -> ColumnElement[bool]:
+        # пробный прогон ничего не публикует, устареть он не может
+        newer = aliased(self.model)
+        return and_(
+            self.model.kind == SyncKind.SYNC,
+            exists().where(
+                newer.id > self.model.id,
+                newer.published_at.is_not(None),
+            ),
+        )
+
+    def _alive(self, stale_before: datetime) -> ColumnElement[bool]:
+        return and_(
+            self.model.status == SyncStatus.IN_PROGRESS,
+            func.coalesce(self.model.heartbeat_at, self.model.created_at)
+            >= stale_before,
+        )
+
     async def update_status(
         self,
         session: AsyncSession,
@@ -21,6 +127,56 @@ class SyncRepo(BaseRepo[Synchronization]):
             update(self.model).where(self.model.id == sync_id).values(status=status),
         )
 
+    async def update_stage(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+        stage: SyncStage,
+        groups_total: Optional[int] = None,
+    ) -> None:
+        values: dict[str, object] = {"stage": stage}
+        if groups_total is not None:
+            values["groups_total"] = groups_total
+        await session.execute(
+            update(self.model).where(self.model.id == sync_id).values(**values),
+        )
+
+    async def add_groups_done(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+        count: int,
+    ) -> None:
+        await session.execute(
+            update(self.model)
+            .where(self.model.id == sync_id)
+            .values(groups_done=self.model.groups_done + count),
+        )
+
+    async def publish(self, session: AsyncSession, sync_id: int) -> None:
+        await session.execute(
+            update(self.model)
+            .where(self.model.id == sync_id)
+            .values(published_at=datetime.now(tz=timezone.utc)),
+        )
+
+    async def finish(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+        status: SyncStatus,
+        report: dict[str, Any],
+    ) -> None:
+        await session.execute(
+            update(self.model)
+            .where(self.model.id == sync_id)
+            .values(
+                status=status,
+                finished_at=datetime.now(tz=timezone.utc),
+                report=report,
+            ),
+        )
+
 
 @lru_cache(maxsize=1)
 def sync_repo() -> SyncRepo:
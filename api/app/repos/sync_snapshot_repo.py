@@ -0,0 +1,167 @@
+from functools import lru_cache
+
+from sqlalchemy import Executable, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.sync_diff import EntityRows, Snapshot, SyncEntity
+from app.models.audience import Audience
+from app.models.course import Course
+from app.models.department import Department
+from app.models.discipline import Discipline
+from app.models.faculty import Faculty
+from app.models.filial import Filial
+from app.models.group import Group
+from app.models.many_to_many import (
+    schedule_pair_audience,
+    schedule_pair_group,
+    schedule_pair_teacher,
+)
+from app.models.schedule_pair import SchedulePair
+from app.models.synchronization import published_sync_id
+from app.models.teacher import Teacher
+from app.models.university import University
+from app.repos.base_repo import ID_MAP_CHUNK_SIZE
+
+
+class SyncSnapshotRepo:
+    """Выгружает синхронизируемые таблицы для сверки против данных ЛКС.
+
+    Внутренние id заменены естественными ключами, поэтому снимок сравнивается
+    напрямую, без записи данных ЛКС в БД.
+    """
+
+    async def load(self, session: AsyncSession) -> Snapshot:
+        return {
+            entity: await self.__load_rows(session, query, key_size)
+            for entity, query, key_size in self.__queries()
+        }
+
+    @staticmethod
+    async def __load_rows(
+        session: AsyncSession,
+        query: Executable,
+        key_size: int,
+    ) -> EntityRows:
+        result = await session.stream(
+            query.execution_options(yield_per=ID_MAP_CHUNK_SIZE),
+        )
+        if key_size == 1:
+            return {row[0]: tuple(row[1:]) async for row in result}
+        return {tuple(row[:key_size]): tuple(row[key_size:]) async for row in result}
+
+    @staticmethod
+    def __queries() -> list[tuple[SyncEntity, Executable, int]]:
+        return [
+            (
+                SyncEntity.UNIVERSITIES,
+                select(University.lks_id, University.abbr, University.name),
+                1,
+            ),
+            (
+                SyncEntity.FILIALS,
+                select(
+                    Filial.lks_id,
+                    Filial.abbr,
+                    Filial.name,
+                    University.lks_id,
+                ).join(Filial.university),
+                1,
+            ),
+            (
+                SyncEntity.FACULTIES,
+                select(
+                    Faculty.lks_id,
+                    Faculty.abbr,
+                    Faculty.name,
+                    Filial.lks_id,
+                ).join(Faculty.filial),
+                1,
+            ),
+            (
+                SyncEntity.DEPARTMENTS,
+                select(
+                    Department.lks_id,
+                    Department.abbr,
+                    Department.name,
+                    Faculty.lks_id,
+                ).join(Department.faculty),
+                1,
+            ),
+            (
+                SyncEntity.COURSES,
+                select(
+                    Course.unique_field,
+                    Course.abbr,
+                    Course.course_num,
+                    Department.lks_id,
+                ).join(Course.department),
+                1,
+            ),
+            (
+                SyncEntity.GROUPS,
+                select(
+                    Group.lks_id,
+                    Group.abbr,
+                    Group.semester_num,
+                    Course.unique_field,
+                ).outerjoin(Group.course),
+                1,
+            ),
+            # существующим преподавателям, аудиториям и дисциплинам
+            # синхронизация продлевает только sync_id, поэтому сравниваются
+            # одни ключи: иначе diff насчитал бы изменения, которых не будет
+            (SyncEntity.TEACHERS, select(Teacher.lks_id), 1),
+            (SyncEntity.AUDIENCES, select(Audience.unique_field), 1),
+            (SyncEntity.DISCIPLINES, select(Discipline.unique_field), 1),
+            (
+                SyncEntity.SCHEDULE_PAIRS,
+                select(
+                    SchedulePair.unique_field,
+                    SchedulePair.day,
+                    SchedulePair.week,
+                    SchedulePair.start_time,
+                    SchedulePair.end_time,
+                    Discipline.unique_field,
+                ).join(SchedulePair.discipline),
+                1,
+            ),
+            (
+                SyncEntity.SCHEDULE_PAIR_GROUPS,
+                select(SchedulePair.unique_field, Group.lks_id)
+                .select_from(schedule_pair_group)
+                .join(
+                    SchedulePair,
+                    SchedulePair.id == schedule_pair_group.c.schedule_pair_id,
+                )
+                .join(Group, Group.id == schedule_pair_group.c.group_id)
+                .where(schedule_pair_group.c.sync_id == published_sync_id()),
+                2,
+            ),
+            (
+                SyncEntity.SCHEDULE_PAIR_TEACHERS,
+                select(SchedulePair.unique_field, Teacher.lks_id)
+                .select_from(schedule_pair_teacher)
+                .join(
+                    SchedulePair,
+                    SchedulePair.id == schedule_pair_teacher.c.schedule_pair_id,
+                )
+                .join(Teacher, Teacher.id == schedule_pair_teacher.c.teacher_id),
+                2,
+            ),
+            (
+                SyncEntity.SCHEDULE_PAIR_AUDIENCES,
+                select(SchedulePair.unique_field, Audience.unique_field)
+                .select_from(schedule_pair_audience)
+                .join(
+                    SchedulePair,
+                    SchedulePair.id == schedule_pair_audience.c.schedule_pair_id,
+                )
+                .join(Audience, Audience.id == schedule_pair_audience.c.audience_id),
+                2,
+            ),
+        ]
+
+
+@lru_cache(maxsize=1)
+def sync_snapshot_repo() -> SyncSnapshotRepo:
+    return SyncSnapshotRepo()
@@ -90,6 +90,8 @@ class TeacherRepo(LksIdRepo[Teacher]):
             )
             .where(
                 schedule_pair_teacher.c.teacher_id == teacher_id,
+                # пары, которых нет в опубликованном расписании групп, скрыты
+                SchedulePair.groups.any(),
             )
         )
 
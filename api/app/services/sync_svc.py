@@ -1,40 +1,162 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
 from functools import lru_cache
-from typing import Annotated
+from typing import Annotated, Any
 
-from fastapi import BackgroundTasks, Depends
+from fastapi import Depends
 from loguru import logger
 
+from app.api.schemas.admin import SyncDiffSchema, SyncInfo
 from app.db.database import ISessionMaker
+from app.domain.errors import NotFoundError, SyncNotResumableError
+from app.domain.sync_kind import SyncKind
 from app.domain.sync_status import SyncStatus
 from app.models.synchronization import Synchronization
 from app.repos.sync_repo import SyncRepo, sync_repo
+from app.settings import WorkerSettings, worker_settings
 from app.utils.lks_synchronizer import LksSynchronizer, lks_synchronizer
+from app.utils.sync_stats import SyncStats
 
 
 class SyncSvc:
-    def __init__(self, sync_repository: SyncRepo, lks_syncer: LksSynchronizer):
+    """Очередь синхронизаций.
+
+    API только ставит синхронизации и пробные прогоны в очередь, выполняет их
+    отдельный процесс `python -m app.worker` через `run_next`.
+    """
+
+    def __init__(
+        self,
+        sync_repository: SyncRepo,
+        lks_syncer: LksSynchronizer,
+        settings: WorkerSettings,
+    ):
         self.sync_repo = sync_repository
         self.lks_synchronizer = lks_syncer
+        self.settings = settings
 
     async def add_synchronization_task(
         self,
         sessionmaker: ISessionMaker,
-        bt: BackgroundTasks,
-    ) -> None:
+        kind: SyncKind = SyncKind.SYNC,
+    ) -> int:
         async with sessionmaker() as session:
             sync_model = Synchronization(
-                status=SyncStatus.IN_PROGRESS,
+                status=SyncStatus.QUEUED,
+                kind=kind,
             )
             await self.sync_repo.add(session, sync_model)
             await session.commit()
-            logger.info(f"Syncing task added (sync_id: {sync_model.id})")
+            logger.info(f"Syncing task queued (sync_id: {sync_model.id}, kind: {kind})")
+        return sync_model.id
+
+    async def resume_synchronization_task(
+        self,
+        sessionmaker: ISessionMaker,
+        sync_id: int,
+    ) -> None:
+        async with sessionmaker() as session:
+            sync_model = await self.sync_repo.get_by_id(session, sync_id)
+            if not sync_model:
+                msg = "Synchronization not found"
+                raise NotFoundError(msg)
+            # in_progress без свежей отметки воркера остаётся после его падения
+            if (
+                sync_model.kind != SyncKind.SYNC
+                or sync_model.status in {SyncStatus.SUCCESS, SyncStatus.QUEUED}
+                or self._is_alive(sync_model)
+            ):
+                msg = f"Synchronization {sync_id} is {sync_model.status}"
+                raise SyncNotResumableError(msg)
+            # версия связей старой синхронизации уже не станет видна, а её
+            # хеши расписаний заставили бы следующую пропустить эти группы
+            if await self.sync_repo.has_newer(
+                session,
+                sync_id,
+                self.settings.stale_after_sec,
+            ):
+                msg = f"Synchronization {sync_id} is superseded by a newer one"
+                raise SyncNotResumableError(msg)
+
+            await self.sync_repo.update_status(session, sync_id, SyncStatus.QUEUED)
+            await session.commit()
+            logger.info(f"Syncing task queued for resume (sync_id: {sync_id})")
 
-        bt.add_task(self._synchronize, sessionmaker, sync_model.id)
+    async def run_next(self, sessionmaker: ISessionMaker) -> bool:
+        """Выполняет следующую синхронизацию из очереди.
 
-    async def _synchronize(self, sessionmaker: ISessionMaker, sync_id: int) -> None:
+        Возвращает False, если выполнять нечего. Начатая ранее синхронизация
+        продолжается от места остановки.
+        """
+        async with sessionmaker() as session:
+            sync_model = await self.sync_repo.claim(
+                session,
+                self.settings.stale_after_sec,
+            )
+            await session.commit()
+        if sync_model is None:
+            return False
+
+        heartbeat = asyncio.create_task(self._heartbeat(sessionmaker, sync_model.id))
+        try:
+            if sync_model.kind == SyncKind.DIFF:
+                await self._diff(sessionmaker, sync_model.id)
+            else:
+                await self._synchronize(
+                    sessionmaker,
+                    sync_model.id,
+                    resume=sync_model.stage is not None,
+                )
+        finally:
+            heartbeat.cancel()
+        return True
+
+    async def get_synchronization(
+        self,
+        sessionmaker: ISessionMaker,
+        sync_id: int,
+    ) -> SyncInfo:
+        async with sessionmaker() as session:
+            sync_model = await self.sync_repo.get_by_id(session, sync_id)
+            if not sync_model:
+                msg = "Synchronization not found"
+                raise NotFoundError(msg)
+        return SyncInfo.model_validate(sync_model)
+
+    async def _heartbeat(self, sessionmaker: ISessionMaker, sync_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.settings.heartbeat_interval_sec)
+            try:
+                async with sessionmaker() as session:
+                    await self.sync_repo.touch_heartbeat(session, sync_id)
+                    await session.commit()
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"Error updating heartbeat (sync_id: {sync_id}): {e}")
+
+    def _is_alive(self, sync_model: Synchronization) -> bool:
+        stale_before = datetime.now(tz=timezone.utc) - timedelta(
+            seconds=self.settings.stale_after_sec,
+        )
+        last_seen = sync_model.heartbeat_at or sync_model.created_at
+        return sync_model.status == SyncStatus.IN_PROGRESS and last_seen >= stale_before
+
+    async def _synchronize(
+        self,
+        sessionmaker: ISessionMaker,
+        sync_id: int,
+        resume: bool = False,
+    ) -> None:
+        stats = SyncStats()
+        started_at = time.monotonic()
         try:
             logger.info(f"Syncing with LKS (sync_id: {sync_id})")
-            await self.lks_synchronizer.synchronize(sessionmaker, sync_id)
+            await self.lks_synchronizer.synchronize(
+                sessionmaker,
+                sync_id,
+                resume=resume,
+                stats=stats,
+            )
             status = SyncStatus.SUCCESS
         except Exception as e:  # noqa: BLE001
             logger.error(
@@ -42,11 +164,36 @@ class SyncSvc:
             )
             status = SyncStatus.FAILED
 
+        # отчёт сохраняется и для упавшей синхронизации: по нему видно, где
+        # она остановилась
+        report = stats.report()
+        report["total_sec"] = round(time.monotonic() - started_at, 3)
         async with sessionmaker() as session:
-            await self.sync_repo.update_status(session, sync_id, status)
+            await self.sync_repo.finish(session, sync_id, status, report)
             await session.commit()
 
-        logger.success(f"Syncing with LKS (sync_id: {sync_id}) completed")
+        logger.success(
+            f"Syncing with LKS (sync_id: {sync_id}) completed in "
+            f"{report['total_sec']} s: {report['durations_sec']}",
+        )
+
+    async def _diff(self, sessionmaker: ISessionMaker, sync_id: int) -> None:
+        started_at = time.monotonic()
+        report: dict[str, Any] = {}
+        try:
+            logger.info(f"Computing LKS sync diff (sync_id: {sync_id})")
+            sync_diff = await self.lks_synchronizer.diff(sessionmaker)
+            report = SyncDiffSchema.from_diff(sync_diff).model_dump(mode="json")
+            status = SyncStatus.SUCCESS
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Error computing LKS sync diff (sync_id: {sync_id}): {e}")
+            status = SyncStatus.FAILED
+
+        report["total_sec"] = round(time.monotonic() - started_at, 3)
+        async with sessionmaker() as session:
+            await self.sync_repo.finish(session, sync_id, status, report)
+            await session.commit()
+        logger.info(f"LKS sync diff (sync_id: {sync_id}) finished: {status}")
 
 
 @lru_cache(maxsize=1)
@@ -54,6 +201,7 @@ def sync_svc() -> SyncSvc:
     return SyncSvc(
         sync_repository=sync_repo(),
         lks_syncer=lks_synchronizer(),
+        settings=worker_settings(),
     )
 
 
@@ -1,5 +1,6 @@
 import os
 from functools import lru_cache
+from typing import Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -8,6 +9,9 @@ ENV = os.getenv("ENV", "local")
 ENVS_DIR = "envs"
 ENV_FILE = f"{ENVS_DIR}/{ENV}.env"
 COMMON_ENV_FILE = f"{ENVS_DIR}/common.env"
+# состояние, которое переживает перезапуск процесса; пустая строка в
+# настройке пути выключает запись на диск
+DATA_DIR = "data"
 
 
 class EnvSettings(BaseSettings):
@@ -25,6 +29,26 @@ class LksSettings(EnvSettings):
 
     base_api_url: str
     use_ssl: bool
+    connection_limit_per_host: int = 20
+    keepalive_timeout_sec: float = 30
+    dns_cache_ttl_sec: int = 300
+    response_cache_dir: Optional[str] = f"{DATA_DIR}/lks_responses"
+    # за синхронизацию запрашиваются тысячи адресов, и небольшой кеш в памяти
+    # вытесняет ответы раньше повторного запроса: по умолчанию хватает диска
+    response_cache_memory_size: int = Field(default=0, ge=0)
+    request_timeout_sec: float = 30
+    retry_attempts: int = Field(default=4, ge=1)
+    retry_wait_sec: float = 0.5
+    retry_max_wait_sec: float = 10
+    concurrency_initial: int = Field(default=4, ge=1)
+    concurrency_min: int = Field(default=1, ge=1)
+    concurrency_max: int = Field(default=20, ge=1)
+    latency_target_sec: float = 2
+    # запись ответов в архив и прогон синхронизации по нему без сети
+    record_archive_path: Optional[str] = None
+    replay_archive_path: Optional[str] = None
+    replay_latency_sec: float = Field(default=0, ge=0)
+    replay_latency_jitter_sec: float = Field(default=0, ge=0)
 
 
 class DbSettings(EnvSettings):
@@ -53,7 +77,49 @@ class ScheduleManagerSettings(EnvSettings):
         env_prefix="SCHEDULE_MANAGER__",
     )
 
+    # после этого срока данные о семестре обновляются в фоне, а до конца
+    # обновления отдаются старые
     current_schedule_cache_ttl_sec: int = 86400  # 24h
+    current_schedule_retry_sec: float = Field(default=60, ge=0)
+    # файл, в котором данные о семестре переживают перезапуск
+    current_schedule_cache_path: Optional[str] = f"{DATA_DIR}/current_schedule.json"
+    # с такой длины диапазона занятия раскладываются по неделям, а не по дням
+    batch_expansion_min_days: int = Field(default=28, ge=1)
+
+
+class SyncSettings(EnvSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="SYNC__",
+    )
+
+    # фактический параллелизм определяет адаптивный лимит LksClient
+    schedule_fetch_concurrency: int = Field(default=20, ge=1)
+    schedule_parse_concurrency: int = Field(default=2, ge=1)
+    # разбор ответов в пуле из стольких процессов, 0 - в потоках
+    schedule_parse_processes: int = Field(default=0, ge=0)
+    pipeline_queue_size: int = Field(default=50, ge=1)
+    groups_per_transaction: int = Field(default=1, ge=1)
+    incremental: bool = True
+    # удаление строк, которых синхронизация не увидела, включается явно
+    collect_garbage: bool = False
+    # сводка о ходе синхронизации пишется раз в столько групп, подробный лог
+    # по каждой группе и паре выключен: это сотни тысяч записей за прогон
+    progress_log_every_groups: int = Field(default=200, ge=1)
+    log_details: bool = False
+    # запись расписаний через COPY и слияние, окупается при пачках из сотен групп
+    bulk_write: bool = False
+
+
+class WorkerSettings(EnvSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="WORKER__",
+    )
+
+    poll_interval_sec: float = Field(default=5, gt=0)
+    heartbeat_interval_sec: float = Field(default=15, gt=0)
+    # синхронизация без отметки дольше этого срока считается брошенной
+    # упавшим воркером и забирается заново
+    stale_after_sec: float = Field(default=120, gt=0)
 
 
 @lru_cache(maxsize=1)
@@ -69,3 +135,13 @@ def lks_settings() -> LksSettings:
 @lru_cache(maxsize=1)
 def db_settings() -> DbSettings:
     return DbSettings()
+
+
+@lru_cache(maxsize=1)
+def sync_settings() -> SyncSettings:
+    return SyncSettings()
+
+
+@lru_cache(maxsize=1)
+def worker_settings() -> WorkerSettings:
+    return WorkerSettings()
@@ -0,0 +1,204 @@
+from functools import lru_cache
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import ISessionMaker
+from app.domain.sync_diff import SyncEntity
+from app.repos.group_repo import GroupRepo, group_repo
+from app.repos.schedule_pair_repo import SchedulePairRepo, schedule_pair_repo
+from app.settings import SyncSettings, sync_settings
+from app.utils.lks_rows import SyncedGroup
+from app.utils.reference_writer import ReferenceWriter, reference_writer
+from app.utils.schedule_rows import PairRow, ScheduleRows
+from app.utils.sync_cache import KnownIds, SyncCache
+from app.utils.sync_log import log_detail
+from app.utils.sync_stats import SyncStats
+
+
+class GroupScheduleWriter:
+    """Пишет расписание одной группы: справочники, пары и их связи.
+
+    Id записанных строк складываются в переданный `SyncCache`, поэтому одна и
+    та же запись не пишется дважды за прогон.
+    """
+
+    def __init__(
+        self,
+        references: ReferenceWriter,
+        schedule_pair_repository: SchedulePairRepo,
+        group_repository: GroupRepo,
+        settings: SyncSettings,
+    ) -> None:
+        self.references = references
+        self.schedule_pair_repository = schedule_pair_repository
+        self.group_repository = group_repository
+        self.settings = settings
+
+    async def preload_ids(self, sessionmaker: ISessionMaker) -> KnownIds:
+        async with sessionmaker() as session:
+            known = KnownIds(
+                schedule_pairs=await self.schedule_pair_repository.get_unique_field_map(
+                    session,
+                ),
+                schedule_hashes=await self.group_repository.get_schedule_hash_map(
+                    session,
+                ),
+            )
+            await self.references.load_known(session, known)
+        logger.info(
+            f"Preloaded ids: {len(known.teachers)} teachers, "
+            f"{len(known.audiences)} audiences, {len(known.disciplines)} disciplines, "
+            f"{len(known.schedule_pairs)} schedule pairs",
+        )
+        return known
+
+    async def write(
+        self,
+        session: AsyncSession,
+        cache: SyncCache,
+        sync_id: int,
+        group: SyncedGroup,
+        schedule: ScheduleRows,
+        stats: SyncStats,
+    ) -> bool:
+        """Пишет расписание группы, каждую пару в своей точке сохранения.
+
+        Возвращает False, если хотя бы одна пара не записалась.
+        """
+        await self.references.write(session, cache, sync_id, schedule, stats)
+        # связи группы строятся заново, так отменённые пары пропадут из её
+        # расписания
+        await self.schedule_pair_repository.delete_group_links(
+            session,
+            group.id,
+            sync_id,
+        )
+
+        complete = True
+        refreshed: list[int] = []
+        for pair in schedule.pairs:
+            complete &= await self._write_pair_savepoint(
+                session,
+                cache,
+                sync_id,
+                pair,
+                group,
+                refreshed,
+                stats,
+            )
+
+        await self.schedule_pair_repository.touch_many(session, refreshed, sync_id)
+        stats.add_updated(SyncEntity.SCHEDULE_PAIRS, len(refreshed))
+        return complete
+
+    async def _write_pair_savepoint(
+        self,
+        session: AsyncSession,
+        cache: SyncCache,
+        sync_id: int,
+        pair: PairRow,
+        group: SyncedGroup,
+        refreshed: list[int],
+        stats: SyncStats,
+    ) -> bool:
+        pair_cache = cache.child()
+        pair_stats = stats.child()
+        pair_refreshed: list[int] = []
+        try:
+            async with session.begin_nested():
+                await self._write_pair(
+                    session,
+                    pair_cache,
+                    sync_id,
+                    pair,
+                    group,
+                    pair_refreshed,
+                    pair_stats,
+                )
+        except Exception as e:  # noqa: BLE001
+            logger.error(
+                f"Group {group.id} - Error saving pair {pair.discipline_abbr} "
+                f"{pair.day} {pair.start_time}: {e}",
+            )
+            return False
+        pair_cache.commit()
+        pair_stats.commit()
+        refreshed.extend(pair_refreshed)
+        return True
+
+    async def _write_pair(
+        self,
+        session: AsyncSession,
+        cache: SyncCache,
+        sync_id: int,
+        pair: PairRow,
+        group: SyncedGroup,
+        refreshed: list[int],
+        stats: SyncStats,
+    ) -> None:
+        log_detail(
+            self.settings,
+            "Syncing schedule pair {} {}",
+            pair.discipline_abbr,
+            group.abbr,
+        )
+
+        unique_field, teacher_ids, audience_ids = cache.schedule_pair_key(pair)
+
+        schedule_pair_id = cache.schedule_pairs.get(unique_field)
+        if schedule_pair_id is not None:
+            # пару уже записали для другой группы в этом прогоне
+            await self.schedule_pair_repository.add_links(
+                session,
+                schedule_pair_id,
+                group_ids=[group.id],
+                teacher_ids=[],
+                audience_ids=[],
+                sync_id=sync_id,
+            )
+            return
+
+        schedule_pair_id = cache.known.schedule_pairs.get(unique_field)
+        if schedule_pair_id is not None:
+            # дисциплина, преподаватели и аудитории входят в ключ пары, поэтому
+            # у существующей пары достаточно продлить sync_id и связать группу
+            refreshed.append(schedule_pair_id)
+            teacher_ids, audience_ids = [], []
+        else:
+            ids = await self.schedule_pair_repository.upsert_by_unique_field(
+                session,
+                [
+                    {
+                        "day": pair.day,
+                        "week": pair.week,
+                        "start_time": pair.start_time,
+                        "end_time": pair.end_time,
+                        "discipline_id": cache.disciplines[pair.discipline_key],
+                        "unique_field": unique_field,
+                        "sync_id": sync_id,
+                    },
+                ],
+            )
+            stats.add_upserted(SyncEntity.SCHEDULE_PAIRS, ids)
+            schedule_pair_id = ids[unique_field]
+
+        await self.schedule_pair_repository.add_links(
+            session,
+            schedule_pair_id,
+            group_ids=[group.id],
+            teacher_ids=teacher_ids,
+            audience_ids=audience_ids,
+            sync_id=sync_id,
+        )
+        cache.schedule_pairs[unique_field] = schedule_pair_id
+
+
+@lru_cache(maxsize=1)
+def group_schedule_writer() -> GroupScheduleWriter:
+    return GroupScheduleWriter(
+        references=reference_writer(),
+        schedule_pair_repository=schedule_pair_repo(),
+        group_repository=group_repo(),
+        settings=sync_settings(),
+    )
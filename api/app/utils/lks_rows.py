@@ -0,0 +1,151 @@
+import hashlib
+import re
+from typing import Any, NamedTuple, Sequence
+from uuid import UUID
+
+import app.clients.lks.models as lks
+from app.domain.day_of_week import DayOfWeek
+from app.domain.week import Week
+
+
+class SyncedGroup(NamedTuple):
+    id: int
+    lks_id: UUID
+    abbr: str
+
+
+# md5 здесь безопасен, т.к. хеши используются только для поиска
+
+
+def audience_unique_field(audience: lks.Audience) -> str:
+    # у аудиторий может не быть lks_id, поэтому смотрим также на name и building
+    return hashlib.md5(  # noqa: S324
+        f"{audience.id}_{audience.name}_{audience.building}".encode(),
+    ).hexdigest()
+
+
+def discipline_unique_field(discipline: lks.Discipline) -> str:
+    return hashlib.md5(  # noqa: S324
+        f"{discipline.full_name}_{discipline.act_type}".encode(),
+    ).hexdigest()
+
+
+def schedule_pair_unique_field(
+    day: DayOfWeek,
+    week: Week,
+    start_time: str,
+    end_time: str,
+    audience_ids: Sequence[int],
+    discipline_key: str,
+    teacher_keys: Sequence[UUID],
+) -> str:
+    # пары совпадают, если в одно время в одном месте проходит та же
+    # дисциплина у тех же преподавателей. Строка пары и её связи с
+    # преподавателями и аудиториями не меняются: при любой правке появляется
+    # новая пара, а старая видна читателям до публикации синхронизации
+    return hashlib.md5(  # noqa: S324
+        f"{day}_{week}_{start_time}_{end_time}_{sorted(audience_ids)}_"
+        f"{discipline_key}_{sorted(map(str, teacher_keys))}".encode(),
+    ).hexdigest()
+
+
+def schedule_fingerprint(schedule: lks.Schedule) -> str:
+    # порядок пар в ответе ЛКС не важен, поэтому хешируем отсортированный список
+    pairs = sorted(pair.model_dump_json() for pair in schedule.data)
+    return hashlib.sha256("\n".join(pairs).encode()).hexdigest()
+
+
+def course_unique_field(
+    department: lks.StructureNode,
+    course: lks.StructureNode,
+) -> str:
+    # uuid курсов в ЛКС не уникальны, поэтому курс определяется кафедрой
+    return hashlib.md5(  # noqa: S324
+        f"{department.id}_{course.abbr}_{course.name}".encode(),
+    ).hexdigest()
+
+
+COURSE_NUM_RE = re.compile(r"(\d+)\s*курс")
+
+
+def course_num(course: lks.StructureNode) -> int:
+    # номер берётся из названия вида "ИУ7 (3 курс)", иначе из семестра групп
+    for text in (course.abbr, course.name):
+        if text and (match := COURSE_NUM_RE.search(text)):
+            return int(match.group(1))
+    semesters = [g.semester_num for g in course.children if g.semester_num]
+    return (min(semesters) + 1) // 2 if semesters else 1
+
+
+def structure_row(
+    node: lks.StructureNode,
+    sync_id: int,
+    **parent_ids: int,
+) -> dict[str, Any]:
+    return {
+        "lks_id": node.id,
+        "abbr": node.abbr or node.name or "",
+        "name": node.name or node.abbr or "",
+        "sync_id": sync_id,
+        **parent_ids,
+    }
+
+
+class StructureLevels(NamedTuple):
+    """Узлы дерева структуры по уровням, для каждого узла указан родитель.
+
+    Для групп вместо родителя хранится ключ курса: uuid курсов в ЛКС не
+    уникальны.
+    """
+
+    filials: list[tuple[lks.StructureNode, lks.StructureNode]]
+    faculties: list[tuple[lks.StructureNode, lks.StructureNode]]
+    departments: list[tuple[lks.StructureNode, lks.StructureNode]]
+    courses: list[tuple[lks.StructureNode, lks.StructureNode]]
+    groups: list[tuple[lks.StructureNode, str]]
+
+
+def structure_levels(university: lks.StructureNode) -> StructureLevels:
+    # узлы без uuid не синхронизируются, у курсов вместо uuid свой ключ
+    filials = [(f, university) for f in university.children if f.id]
+    faculties = [(f, filial) for filial, _ in filials for f in filial.children if f.id]
+    departments = [
+        (d, faculty) for faculty, _ in faculties for d in faculty.children if d.id
+    ]
+    courses = [(c, dep) for dep, _ in departments for c in dep.children]
+    groups = [
+        (g, course_unique_field(dep, course))
+        for course, dep in courses
+        for g in course.children
+        if g.id
+    ]
+    return StructureLevels(filials, faculties, departments, courses, groups)
+
+
+def course_row(
+    course: lks.StructureNode,
+    department: lks.StructureNode,
+    department_id: int,
+    sync_id: int,
+) -> dict[str, Any]:
+    return {
+        "unique_field": course_unique_field(department, course),
+        "abbr": course.abbr or course.name or "",
+        "course_num": course_num(course),
+        "department_id": department_id,
+        "sync_id": sync_id,
+    }
+
+
+def group_row(
+    group: lks.StructureNode,
+    course_id: int,
+    sync_id: int,
+) -> dict[str, Any]:
+    return {
+        "lks_id": group.id,
+        "abbr": group.abbr,
+        "semester_num": group.semester_num or 1,
+        "course_id": course_id,
+        "sync_id": sync_id,
+    }
@@ -0,0 +1,169 @@
+from collections.abc import Awaitable, Callable, Mapping, MutableMapping, Sequence
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.sync_diff import SyncEntity
+from app.repos.audience_repo import AudienceRepo, audience_repo
+from app.repos.base_repo import BaseRepo, UpsertedIds
+from app.repos.discipline_repo import DisciplineRepo, discipline_repo
+from app.repos.teacher_repo import TeacherRepo, teacher_repo
+from app.utils.schedule_rows import (
+    AUDIENCE_COLUMNS,
+    DISCIPLINE_COLUMNS,
+    TEACHER_COLUMNS,
+    ScheduleRows,
+    row_dict,
+)
+from app.utils.sync_cache import KnownIds, SyncCache
+from app.utils.sync_stats import SyncStats
+
+Upsert = Callable[[AsyncSession, Sequence[dict[str, Any]]], Awaitable[UpsertedIds]]
+
+
+class ReferenceWriter:
+    """Пишет преподавателей, аудитории и дисциплины из расписаний групп."""
+
+    def __init__(
+        self,
+        teacher_repository: TeacherRepo,
+        audience_repository: AudienceRepo,
+        discipline_repository: DisciplineRepo,
+    ) -> None:
+        self.teacher_repository = teacher_repository
+        self.audience_repository = audience_repository
+        self.discipline_repository = discipline_repository
+
+    async def load_known(self, session: AsyncSession, known: KnownIds) -> None:
+        """Заполняет `known` id уже записанных в БД справочников."""
+        known.teachers = await self.teacher_repository.get_lks_id_map(session)
+        known.audiences = await self.audience_repository.get_unique_field_map(session)
+        known.disciplines = await self.discipline_repository.get_unique_field_map(
+            session,
+        )
+
+    async def write(
+        self,
+        session: AsyncSession,
+        cache: SyncCache,
+        sync_id: int,
+        schedule: ScheduleRows,
+        stats: SyncStats,
+    ) -> None:
+        await self._sync_teachers(session, cache, sync_id, schedule, stats)
+        await self._sync_audiences(session, cache, sync_id, schedule, stats)
+        await self._sync_disciplines(session, cache, sync_id, schedule, stats)
+
+    async def _sync_teachers(
+        self,
+        session: AsyncSession,
+        cache: SyncCache,
+        sync_id: int,
+        schedule: ScheduleRows,
+        stats: SyncStats,
+    ) -> None:
+        rows = {
+            teacher[0]: row_dict(TEACHER_COLUMNS, teacher, sync_id)
+            for teacher in schedule.teachers
+        }
+        await self._sync_rows(
+            session,
+            sync_id,
+            rows,
+            synced=cache.teachers,
+            known=cache.known.teachers,
+            entity=SyncEntity.TEACHERS,
+            stats=stats,
+            repository=self.teacher_repository,
+            upsert=self.teacher_repository.upsert_by_lks_id,
+        )
+
+    async def _sync_audiences(
+        self,
+        session: AsyncSession,
+        cache: SyncCache,
+        sync_id: int,
+        schedule: ScheduleRows,
+        stats: SyncStats,
+    ) -> None:
+        rows = {
+            audience[0]: row_dict(AUDIENCE_COLUMNS, audience, sync_id)
+            for audience in schedule.audiences
+        }
+        await self._sync_rows(
+            session,
+            sync_id,
+            rows,
+            synced=cache.audiences,
+            known=cache.known.audiences,
+            entity=SyncEntity.AUDIENCES,
+            stats=stats,
+            repository=self.audience_repository,
+            upsert=self.audience_repository.upsert_by_unique_field,
+        )
+
+    async def _sync_disciplines(
+        self,
+        session: AsyncSession,
+        cache: SyncCache,
+        sync_id: int,
+        schedule: ScheduleRows,
+        stats: SyncStats,
+    ) -> None:
+        rows = {
+            discipline[0]: row_dict(DISCIPLINE_COLUMNS, discipline, sync_id)
+            for discipline in schedule.disciplines
+        }
+        await self._sync_rows(
+            session,
+            sync_id,
+            rows,
+            synced=cache.disciplines,
+            known=cache.known.disciplines,
+            entity=SyncEntity.DISCIPLINES,
+            stats=stats,
+            repository=self.discipline_repository,
+            upsert=self.discipline_repository.upsert_by_unique_field,
+        )
+
+    @staticmethod
+    async def _sync_rows(
+        session: AsyncSession,
+        sync_id: int,
+        rows: dict[Any, dict[str, Any]],
+        synced: MutableMapping[Any, int],
+        known: Mapping[Any, int],
+        entity: SyncEntity,
+        stats: SyncStats,
+        repository: BaseRepo[Any],
+        upsert: Upsert,
+    ) -> None:
+        # уже известным записям достаточно обновить sync_id одним запросом,
+        # вставлять приходится только новые
+        touched_ids = []
+        new_rows = []
+        for key, row in rows.items():
+            if key in synced:
+                continue
+            record_id = known.get(key)
+            if record_id is None:
+                new_rows.append(row)
+            else:
+                synced[key] = record_id
+                touched_ids.append(record_id)
+
+        await repository.touch_many(session, touched_ids, sync_id)
+        stats.add_updated(entity, len(touched_ids))
+        ids = await upsert(session, new_rows)
+        stats.add_upserted(entity, ids)
+        synced.update(ids)
+
+
+@lru_cache(maxsize=1)
+def reference_writer() -> ReferenceWriter:
+    return ReferenceWriter(
+        teacher_repository=teacher_repo(),
+        audience_repository=audience_repo(),
+        discipline_repository=discipline_repo(),
+    )
@@ -0,0 +1,283 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+
+import app.clients.lks.models as lks
+from app.clients.lks.client import LksClient
+from app.db.database import ISessionMaker
+from app.settings import SyncSettings
+from app.utils.lks_rows import SyncedGroup
+from app.utils.schedule_rows import ScheduleRows, parse_schedule_rows
+from app.utils.schedule_writer import GroupSchedule, ScheduleWriter
+from app.utils.sync_cache import SyncCache
+from app.utils.sync_log import log_detail
+from app.utils.sync_stats import SyncStats
+
+RawSchedule = tuple[SyncedGroup, bytes]
+
+
+class SchedulePipeline:
+    """Конвейер расписаний одного прогона: скачивание -> разбор -> запись.
+
+    Очереди между стадиями ограничены, поэтому быстрая стадия ждёт медленную
+    и не копит память. Пишет в БД один писатель, чтобы кеши и уникальные
+    поля не гонялись между собой.
+    """
+
+    def __init__(
+        self,
+        lks_api_client: LksClient,
+        writer: ScheduleWriter,
+        settings: SyncSettings,
+        cache: SyncCache,
+        stats: SyncStats,
+    ) -> None:
+        self.lks_client = lks_api_client
+        self.writer = writer
+        self.settings = settings
+        self.__cache = cache
+        self.__stats = stats
+        self.__groups_total = 0
+        self.__next_progress_log = settings.progress_log_every_groups
+
+    async def run(
+        self,
+        sessionmaker: ISessionMaker,
+        sync_id: int,
+        groups: list[SyncedGroup],
+    ) -> None:
+        logger.info(f"Syncing schedule for {len(groups)} groups")
+        self.__groups_total = len(groups)
+        groups_queue: asyncio.Queue[SyncedGroup] = asyncio.Queue()
+        for group in groups:
+            groups_queue.put_nowait(group)
+
+        queue_size = self.settings.pipeline_queue_size
+        raw_queue: asyncio.Queue[Optional[RawSchedule]] = asyncio.Queue(queue_size)
+        schedules_queue: asyncio.Queue[Optional[GroupSchedule]] = asyncio.Queue(
+            queue_size,
+        )
+        with _parse_executor(self.settings.schedule_parse_processes) as executor:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(
+                    self._write_worker(sessionmaker, sync_id, schedules_queue),
+                )
+                await self._parse(executor, groups_queue, raw_queue, schedules_queue)
+                await schedules_queue.put(None)
+
+    async def _parse(
+        self,
+        executor: Optional[Executor],
+        groups_queue: asyncio.Queue[SyncedGroup],
+        raw_queue: asyncio.Queue[Optional[RawSchedule]],
+        schedules_queue: asyncio.Queue[Optional[GroupSchedule]],
+    ) -> None:
+        parsers_count = self.settings.schedule_parse_concurrency
+        async with asyncio.TaskGroup() as parsers:
+            for _ in range(parsers_count):
+                parsers.create_task(
+                    self._parse_worker(executor, raw_queue, schedules_queue),
+                )
+            await self._fetch(groups_queue, raw_queue)
+            for _ in range(parsers_count):
+                await raw_queue.put(None)
+
+    async def _fetch(
+        self,
+        groups_queue: asyncio.Queue[SyncedGroup],
+        raw_queue: asyncio.Queue[Optional[RawSchedule]],
+    ) -> None:
+        fetchers_count = min(
+            self.settings.schedule_fetch_concurrency,
+            groups_queue.qsize(),
+        )
+        async with asyncio.TaskGroup() as fetchers:
+            for _ in range(fetchers_count):
+                fetchers.create_task(self._fetch_worker(groups_queue, raw_queue))
+
+    async def _fetch_worker(
+        self,
+        groups_queue: asyncio.Queue[SyncedGroup],
+        raw_queue: asyncio.Queue[Optional[RawSchedule]],
+    ) -> None:
+        while not groups_queue.empty():
+            group = groups_queue.get_nowait()
+            data = await self._fetch_schedule(group)
+            if data is not None:
+                await raw_queue.put((group, data))
+
+    async def _fetch_schedule(self, group: SyncedGroup) -> Optional[bytes]:
+        started_at = time.monotonic()
+        try:
+            with self.__stats.timer("schedule_fetch"):
+                data = await self.lks_client.get_schedule_raw(group.lks_id)
+        except Exception as e:  # noqa: BLE001
+            logger.error(
+                f"Group {group.id} - Error syncing schedule for {group.abbr}: {e}",
+            )
+            self.__stats.add_groups("fetch_failed")
+            return None
+        self.__stats.add_fetch_latency(time.monotonic() - started_at)
+        log_detail(
+            self.settings,
+            "Group {} - Fetched schedule for {}",
+            group.id,
+            group.abbr,
+        )
+        return data
+
+    async def _parse_worker(
+        self,
+        executor: Optional[Executor],
+        raw_queue: asyncio.Queue[Optional[RawSchedule]],
+        schedules_queue: asyncio.Queue[Optional[GroupSchedule]],
+    ) -> None:
+        while (item := await raw_queue.get()) is not None:
+            group, data = item
+            schedule = await self._parse_schedule(executor, group, data)
+            if schedule is not None:
+                await schedules_queue.put(self._skip_unchanged(group, schedule))
+
+    async def _parse_schedule(
+        self,
+        executor: Optional[Executor],
+        group: SyncedGroup,
+        data: bytes,
+    ) -> Optional[ScheduleRows]:
+        try:
+            with self.__stats.timer("schedule_parse"):
+                return await _parse_rows(executor, data)
+        except Exception as e:  # noqa: BLE001
+            logger.error(
+                f"Group {group.id} - Error parsing schedule for {group.abbr}: {e}",
+            )
+            self.__stats.add_groups("parse_failed")
+            return None
+
+    def _skip_unchanged(
+        self,
+        group: SyncedGroup,
+        schedule: ScheduleRows,
+    ) -> GroupSchedule:
+        known_hash = self.__cache.known.schedule_hashes.get(group.id)
+        if not self.settings.incremental or schedule.fingerprint != known_hash:
+            return group, schedule, schedule.fingerprint
+        log_detail(
+            self.settings,
+            "Group {} - Schedule unchanged for {}",
+            group.id,
+            group.abbr,
+        )
+        self.__stats.add_groups("unchanged")
+        # писатель только отметит группу как обработанную
+        return group, None, schedule.fingerprint
+
+    async def _write_worker(
+        self,
+        sessionmaker: ISessionMaker,
+        sync_id: int,
+        schedules_queue: asyncio.Queue[Optional[GroupSchedule]],
+    ) -> None:
+        batch: list[GroupSchedule] = []
+        while (item := await schedules_queue.get()) is not None:
+            batch.append(item)
+            if len(batch) >= self.settings.groups_per_transaction:
+                await self._write(sessionmaker, sync_id, batch)
+                batch = []
+                self._log_progress()
+        if batch:
+            await self._write(sessionmaker, sync_id, batch)
+        self._log_progress(force=True)
+
+    async def _write(
+        self,
+        sessionmaker: ISessionMaker,
+        sync_id: int,
+        batch: list[GroupSchedule],
+    ) -> None:
+        with self.__stats.timer("schedule_write"):
+            await self.writer.write(
+                sessionmaker,
+                sync_id,
+                batch,
+                self.__cache,
+                self.__stats,
+            )
+
+    def _log_progress(self, force: bool = False) -> None:
+        processed = self.__stats.groups_processed()
+        if not force and processed < self.__next_progress_log:
+            return
+        every = self.settings.progress_log_every_groups
+        self.__next_progress_log = (processed // every + 1) * every
+        logger.info(
+            "Schedule progress: {}/{} groups, {}",
+            processed,
+            self.__groups_total,
+            self.__stats.progress(),
+        )
+
+
+async def fetch_schedules(
+    lks_api_client: LksClient,
+    group_ids: list[UUID],
+    concurrency: int,
+) -> tuple[dict[UUID, lks.Schedule], list[UUID]]:
+    """Скачивает и разбирает расписания групп для сравнения без записи в БД.
+
+    Возвращает разобранные расписания и uuid групп, которые не удалось
+    скачать или разобрать.
+    """
+    groups_queue: asyncio.Queue[UUID] = asyncio.Queue()
+    for group_id in group_ids:
+        groups_queue.put_nowait(group_id)
+
+    schedules: dict[UUID, lks.Schedule] = {}
+    failed: list[UUID] = []
+
+    async def worker() -> None:
+        while not groups_queue.empty():
+            group_id = groups_queue.get_nowait()
+            try:
+                data = await lks_api_client.get_schedule_raw(group_id)
+                schedules[group_id] = await asyncio.to_thread(
+                    lks_api_client.parse_schedule,
+                    data,
+                )
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Error fetching schedule for group {group_id}: {e}")
+                failed.append(group_id)
+
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(min(concurrency, len(group_ids))):
+            tg.create_task(worker())
+    return schedules, failed
+
+
+async def _parse_rows(executor: Optional[Executor], data: bytes) -> ScheduleRows:
+    # разбор вне цикла событий, чтобы большие ответы его не стопорили
+    if executor is None:
+        return await asyncio.to_thread(parse_schedule_rows, data)
+    return await asyncio.get_running_loop().run_in_executor(
+        executor,
+        parse_schedule_rows,
+        data,
+    )
+
+
+def _parse_executor(processes: int) -> AbstractContextManager[Optional[Executor]]:
+    # без пула процессов разбор идёт в потоках через asyncio.to_thread
+    if not processes:
+        return nullcontext()
+    # spawn, а не fork: форк процесса с запущенным циклом событий и
+    # открытыми соединениями небезопасен
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
@@ -0,0 +1,108 @@
+from typing import Any, NamedTuple, Optional
+from uuid import UUID
+
+from app.clients.lks.models import ScheduleResponseBody
+from app.domain.day_of_week import DayOfWeek
+from app.domain.week import Week
+from app.utils.lks_rows import (
+    audience_unique_field,
+    discipline_unique_field,
+    schedule_fingerprint,
+)
+
+# порядок значений в кортежах строк, sync_id добавляется при записи
+TEACHER_COLUMNS = ("lks_id", "first_name", "middle_name", "last_name")
+AUDIENCE_COLUMNS = ("unique_field", "lks_id", "name", "building")
+DISCIPLINE_COLUMNS = ("unique_field", "abbr", "full_name", "short_name", "act_type")
+
+TeacherRow = tuple[UUID, str, str, str]
+AudienceRow = tuple[str, Optional[UUID], str, Optional[str]]
+DisciplineRow = tuple[str, str, str, str, Optional[str]]
+
+
+class PairRow(NamedTuple):
+    day: DayOfWeek
+    week: Week
+    start_time: str
+    end_time: str
+    discipline_key: str
+    teacher_keys: tuple[UUID, ...]
+    audience_keys: tuple[str, ...]
+    # только для логов
+    discipline_abbr: str
+
+
+class ScheduleRows(NamedTuple):
+    """Расписание группы, разобранное в строки таблиц.
+
+    Вместо дерева pydantic-моделей хранит плоские кортежи, ключи в них уже
+    посчитаны: такие дешевле передавать между процессами.
+    """
+
+    teachers: tuple[TeacherRow, ...]
+    audiences: tuple[AudienceRow, ...]
+    disciplines: tuple[DisciplineRow, ...]
+    pairs: tuple[PairRow, ...]
+    fingerprint: str
+
+
+def parse_schedule_rows(data: bytes) -> ScheduleRows:
+    """Разбирает ответ ЛКС на расписание группы.
+
+    Функция чистая и не трогает состояние процесса, поэтому её можно
+    выполнять в пуле процессов.
+    """
+    schedule = ScheduleResponseBody.model_validate_json(data).data
+    teachers: dict[UUID, TeacherRow] = {}
+    audiences: dict[str, AudienceRow] = {}
+    disciplines: dict[str, DisciplineRow] = {}
+    pairs = []
+    for pair in schedule.data:
+        for teacher in pair.teachers:
+            teachers[teacher.id] = (
+                teacher.id,
+                teacher.first_name,
+                teacher.middle_name,
+                teacher.last_name,
+            )
+        audience_keys = []
+        for audience in pair.audiences:
+            key = audience_unique_field(audience)
+            audience_keys.append(key)
+            audiences[key] = (key, audience.id, audience.name, audience.building)
+        discipline = pair.discipline
+        discipline_key = discipline_unique_field(discipline)
+        disciplines[discipline_key] = (
+            discipline_key,
+            discipline.abbr,
+            discipline.full_name,
+            discipline.short_name,
+            discipline.act_type,
+        )
+        pairs.append(
+            PairRow(
+                day=DayOfWeek.from_lks(pair.day),
+                week=Week.from_lks(pair.week),
+                start_time=pair.start_time,
+                end_time=pair.end_time,
+                discipline_key=discipline_key,
+                teacher_keys=tuple(t.id for t in pair.teachers),
+                audience_keys=tuple(audience_keys),
+                discipline_abbr=discipline.abbr,
+            ),
+        )
+    return ScheduleRows(
+        teachers=tuple(teachers.values()),
+        audiences=tuple(audiences.values()),
+        disciplines=tuple(disciplines.values()),
+        pairs=tuple(pairs),
+        fingerprint=schedule_fingerprint(schedule),
+    )
+
+
+def row_dict(
+    columns: tuple[str, ...],
+    values: tuple[Any, ...],
+    sync_id: int,
+) -> dict[str, Any]:
+    return {**dict(zip(columns, values, strict=True)), "sync_id": sync_id}
@@ -0,0 +1,291 @@
+from collections.abc import Collection
+from functools import lru_cache
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import ISessionMaker
+from app.domain.sync_diff import SyncEntity
+from app.repos.base_repo import UpsertedIds
+from app.repos.group_repo import GroupRepo, group_repo
+from app.repos.schedule_pair_repo import SchedulePairRepo, schedule_pair_repo
+from app.repos.schedule_stage_repo import (
+    ScheduleStage,
+    ScheduleStageRepo,
+    schedule_stage_repo,
+)
+from app.repos.sync_repo import SyncRepo, sync_repo
+from app.settings import SyncSettings, sync_settings
+from app.utils.group_schedule_writer import GroupScheduleWriter, group_schedule_writer
+from app.utils.lks_rows import SyncedGroup
+from app.utils.schedule_rows import PairRow, ScheduleRows
+from app.utils.sync_cache import SyncCache
+from app.utils.sync_log import log_detail
+from app.utils.sync_stats import SyncStats
+
+# расписание группы без изменений приходит без строк, только с хешем
+GroupSchedule = tuple[SyncedGroup, Optional[ScheduleRows], str]
+WrittenSchedule = tuple[SyncedGroup, ScheduleRows, str]
+
+
+class ScheduleWriter:
+    """Пишет пачки расписаний групп, каждую пачку своей транзакцией.
+
+    Отметка прогресса коммитится той же транзакцией, что и расписания пачки,
+    поэтому после падения синхронизация продолжится ровно от последней
+    записанной пачки.
+    """
+
+    def __init__(
+        self,
+        group_writer: GroupScheduleWriter,
+        group_repository: GroupRepo,
+        schedule_pair_repository: SchedulePairRepo,
+        schedule_stage_repository: ScheduleStageRepo,
+        sync_repository: SyncRepo,
+        settings: SyncSettings,
+    ) -> None:
+        self.group_writer = group_writer
+        self.group_repository = group_repository
+        self.schedule_pair_repository = schedule_pair_repository
+        self.schedule_stage_repository = schedule_stage_repository
+        self.sync_repository = sync_repository
+        self.settings = settings
+
+    async def write(
+        self,
+        sessionmaker: ISessionMaker,
+        sync_id: int,
+        batch: list[GroupSchedule],
+        cache: SyncCache,
+        stats: SyncStats,
+    ) -> None:
+        if self.settings.bulk_write:
+            await self._write_bulk(sessionmaker, sync_id, batch, cache, stats)
+        else:
+            await self._write_by_group(sessionmaker, sync_id, batch, cache, stats)
+
+    async def _write_by_group(
+        self,
+        sessionmaker: ISessionMaker,
+        sync_id: int,
+        batch: list[GroupSchedule],
+        cache: SyncCache,
+        stats: SyncStats,
+    ) -> None:
+        batch_cache = cache.child()
+        batch_stats = stats.child()
+        async with sessionmaker() as session:
+            written_ids = await self._write_groups(
+                session,
+                batch_cache,
+                sync_id,
+                batch,
+                batch_stats,
+            )
+            await self._finish_batch(session, sync_id, batch, written_ids)
+            await session.commit()
+        batch_cache.commit()
+        batch_stats.commit()
+
+    async def _write_groups(
+        self,
+        session: AsyncSession,
+        cache: SyncCache,
+        sync_id: int,
+        batch: list[GroupSchedule],
+        stats: SyncStats,
+    ) -> set[int]:
+        written_ids: set[int] = set()
+        for group, schedule, schedule_hash in batch:
+            if schedule is not None and await self._write_group(
+                session,
+                cache,
+                sync_id,
+                (group, schedule, schedule_hash),
+                stats,
+            ):
+                written_ids.add(group.id)
+        return written_ids
+
+    async def _write_group(
+        self,
+        session: AsyncSession,
+        cache: SyncCache,
+        sync_id: int,
+        written: WrittenSchedule,
+        stats: SyncStats,
+    ) -> bool:
+        group, schedule, schedule_hash = written
+        group_cache = cache.child()
+        group_stats = stats.child()
+        try:
+            async with session.begin_nested():
+                complete = await self.group_writer.write(
+                    session,
+                    group_cache,
+                    sync_id,
+                    group,
+                    schedule,
+                    group_stats,
+                )
+                # если часть пар не записалась, хеш сбрасываем, чтобы
+                # следующая синхронизация обработала группу заново
+                await self.group_repository.set_schedule_hash(
+                    session,
+                    group.id,
+                    schedule_hash if complete else None,
+                )
+        except Exception as e:  # noqa: BLE001
+            logger.error(
+                f"Group {group.id} - Error saving schedule for {group.abbr}: {e}",
+            )
+            stats.add_groups("write_failed")
+            return False
+        group_cache.commit()
+        group_stats.commit()
+        stats.add_groups("written")
+        log_detail(
+            self.settings,
+            "Group {} - Synced schedule for {}",
+            group.id,
+            group.abbr,
+        )
+        return True
+
+    async def _write_bulk(
+        self,
+        sessionmaker: ISessionMaker,
+        sync_id: int,
+        batch: list[GroupSchedule],
+        cache: SyncCache,
+        stats: SyncStats,
+    ) -> None:
+        # вся пачка пишется одной транзакцией без точек сохранения, поэтому при
+        # ошибке пачка переписывается по одной группе, чтобы найти виноватую
+        written = [(g, s, h) for g, s, h in batch if s is not None]
+        batch_cache = cache.child()
+        batch_stats = stats.child()
+        try:
+            async with sessionmaker() as session:
+                pair_ids = await self._merge(
+                    session,
+                    batch_cache,
+                    sync_id,
+                    written,
+                    batch_stats,
+                )
+                await self._finish_batch(
+                    session,
+                    sync_id,
+                    batch,
+                    {group.id for group, _, _ in written},
+                )
+                await session.commit()
+        except Exception as e:  # noqa: BLE001
+            logger.warning(
+                f"Bulk write of {len(written)} schedules failed, "
+                f"writing them one by one: {e}",
+            )
+            await self._write_by_group(sessionmaker, sync_id, batch, cache, stats)
+            return
+
+        batch_cache.commit()
+        batch_stats.add_upserted(SyncEntity.SCHEDULE_PAIRS, pair_ids)
+        batch_stats.add_groups("written", len(written))
+        batch_stats.commit()
+        log_detail(self.settings, "Synced {} schedules with bulk write", len(written))
+
+    async def _merge(
+        self,
+        session: AsyncSession,
+        cache: SyncCache,
+        sync_id: int,
+        written: list[WrittenSchedule],
+        stats: SyncStats,
+    ) -> UpsertedIds:
+        stage = ScheduleStage()
+        staged: set[str] = set()
+        for group, schedule, _ in written:
+            await self.group_writer.references.write(
+                session,
+                cache,
+                sync_id,
+                schedule,
+                stats,
+            )
+            for pair in schedule.pairs:
+                _stage_schedule_pair(cache, stage, staged, pair, group)
+
+        pair_ids = await self.schedule_stage_repository.merge(
+            session,
+            stage,
+            [group.id for group, _, _ in written],
+            sync_id,
+        )
+        cache.schedule_pairs.update(pair_ids)
+        for group, _, schedule_hash in written:
+            await self.group_repository.set_schedule_hash(
+                session,
+                group.id,
+                schedule_hash,
+            )
+        return pair_ids
+
+    async def _finish_batch(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+        batch: list[GroupSchedule],
+        written_ids: Collection[int],
+    ) -> None:
+        # группы без нового расписания сохраняют опубликованное
+        group_ids = [group.id for group, _, _ in batch]
+        await self.schedule_pair_repository.carry_forward_links(
+            session,
+            sync_id,
+            [group_id for group_id in group_ids if group_id not in written_ids],
+        )
+        await self.group_repository.mark_schedule_synced(session, group_ids, sync_id)
+        await self.sync_repository.add_groups_done(session, sync_id, len(group_ids))
+
+
+def _stage_schedule_pair(
+    cache: SyncCache,
+    stage: ScheduleStage,
+    staged: set[str],
+    pair: PairRow,
+    group: SyncedGroup,
+) -> None:
+    unique_field, teacher_ids, audience_ids = cache.schedule_pair_key(pair)
+    stage.group_links.append((unique_field, group.id))
+    # как и при записи по одной группе, пару, уже записанную в этом
+    # прогоне, только связываем с группой
+    if unique_field in cache.schedule_pairs or unique_field in staged:
+        return
+    staged.add(unique_field)
+    stage.pairs.append(
+        (
+            unique_field,
+            str(pair.day),
+            str(pair.week),
+            pair.start_time,
+            pair.end_time,
+            cache.disciplines[pair.discipline_key],
+        ),
+    )
+    stage.teacher_links.extend((unique_field, t_id) for t_id in teacher_ids)
+    stage.audience_links.extend((unique_field, a_id) for a_id in audience_ids)
+
+
+@lru_cache(maxsize=1)
+def schedule_writer() -> ScheduleWriter:
+    return ScheduleWriter(
+        group_writer=group_schedule_writer(),
+        group_repository=group_repo(),
+        schedule_pair_repository=schedule_pair_repo(),
+        schedule_stage_repository=schedule_stage_repo(),
+        sync_repository=sync_repo(),
+        settings=sync_settings(),
+    )
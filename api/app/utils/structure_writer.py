@@ -0,0 +1,152 @@
+from functools import lru_cache
+from typing import Any
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.clients.lks.models import StructureNode
+from app.domain.sync_diff import SyncEntity
+from app.repos.base_repo import UpsertedIds
+from app.repos.course_repo import CourseRepo, course_repo
+from app.repos.department_repo import DepartmentRepo, department_repo
+from app.repos.faculty_repo import FacultyRepo, faculty_repo
+from app.repos.filial_repo import FilialRepo, filial_repo
+from app.repos.group_repo import GroupRepo, group_repo
+from app.repos.university_repo import UniversityRepo, university_repo
+from app.utils.lks_rows import (
+    StructureLevels,
+    SyncedGroup,
+    course_row,
+    group_row,
+    structure_levels,
+    structure_row,
+)
+from app.utils.sync_stats import SyncStats
+
+STRUCTURE_UPDATE_COLUMNS = ("abbr", "name", "sync_id")
+
+
+class StructureWriter:
+    """Пишет дерево структуры ЛКС: от университета до групп.
+
+    Каждый уровень дерева пишется одним upsert, id родителей берутся из
+    результатов предыдущего уровня.
+    """
+
+    def __init__(
+        self,
+        university_repository: UniversityRepo,
+        filial_repository: FilialRepo,
+        faculty_repository: FacultyRepo,
+        department_repository: DepartmentRepo,
+        course_repository: CourseRepo,
+        group_repository: GroupRepo,
+    ) -> None:
+        self.university_repository = university_repository
+        self.filial_repository = filial_repository
+        self.faculty_repository = faculty_repository
+        self.department_repository = department_repository
+        self.course_repository = course_repository
+        self.group_repository = group_repository
+
+    async def write(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+        university: StructureNode,
+        stats: SyncStats,
+    ) -> list[SyncedGroup]:
+        levels = structure_levels(university)
+        logger.info(
+            f"Syncing structure: {len(levels.filials)} filials, "
+            f"{len(levels.faculties)} faculties, "
+            f"{len(levels.departments)} departments, {len(levels.courses)} courses, "
+            f"{len(levels.groups)} groups",
+        )
+
+        university_ids = await self.university_repository.upsert_by_lks_id(
+            session,
+            [structure_row(university, sync_id)],
+            update_columns=STRUCTURE_UPDATE_COLUMNS,
+        )
+        stats.add_upserted(SyncEntity.UNIVERSITIES, university_ids)
+        department_ids = await self._write_departments(
+            session,
+            sync_id,
+            levels,
+            university_ids,
+            stats,
+        )
+        course_ids = await self.course_repository.upsert_by_unique_field(
+            session,
+            [
+                course_row(c, parent, department_ids[parent.id], sync_id)
+                for c, parent in levels.courses
+            ],
+            update_columns=("abbr", "course_num", "department_id", "sync_id"),
+        )
+        stats.add_upserted(SyncEntity.COURSES, course_ids)
+
+        group_rows: dict[Any, dict[str, Any]] = {
+            g.id: group_row(g, course_ids[course_key], sync_id)
+            for g, course_key in levels.groups
+        }
+        group_ids = await self.group_repository.upsert_by_lks_id(
+            session,
+            list(group_rows.values()),
+            update_columns=("abbr", "semester_num", "course_id", "sync_id"),
+        )
+        stats.add_upserted(SyncEntity.GROUPS, group_ids)
+        return [
+            SyncedGroup(id=group_ids[lks_id], lks_id=lks_id, abbr=row["abbr"])
+            for lks_id, row in group_rows.items()
+        ]
+
+    async def _write_departments(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+        levels: StructureLevels,
+        university_ids: UpsertedIds,
+        stats: SyncStats,
+    ) -> UpsertedIds:
+        filial_ids = await self.filial_repository.upsert_by_lks_id(
+            session,
+            [
+                structure_row(f, sync_id, university_id=university_ids[parent.id])
+                for f, parent in levels.filials
+            ],
+            update_columns=(*STRUCTURE_UPDATE_COLUMNS, "university_id"),
+        )
+        stats.add_upserted(SyncEntity.FILIALS, filial_ids)
+        faculty_ids = await self.faculty_repository.upsert_by_lks_id(
+            session,
+            [
+                structure_row(f, sync_id, filial_id=filial_ids[parent.id])
+                for f, parent in levels.faculties
+            ],
+            update_columns=(*STRUCTURE_UPDATE_COLUMNS, "filial_id"),
+        )
+        stats.add_upserted(SyncEntity.FACULTIES, faculty_ids)
+        department_ids = await self.department_repository.upsert_by_lks_id(
+            session,
+            [
+                structure_row(d, sync_id, faculty_id=faculty_ids[parent.id])
+                for d, parent in levels.departments
+            ],
+            update_columns=(*STRUCTURE_UPDATE_COLUMNS, "faculty_id"),
+        )
+        stats.add_upserted(SyncEntity.DEPARTMENTS, department_ids)
+        return department_ids
+
+
+@lru_cache(maxsize=1)
+def structure_writer() -> StructureWriter:
+    return StructureWriter(
+        university_repository=university_repo(),
+        filial_repository=filial_repo(),
+        faculty_repository=faculty_repo(),
+        department_repository=department_repo(),
+        course_repository=course_repo(),
+        group_repository=group_repo(),
+    )
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from collections import ChainMap
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+from app.utils.lks_rows import schedule_pair_unique_field
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from app.utils.schedule_rows import PairRow
+
+
+@dataclass
+class KnownIds:
+    """Id всех записей, которые уже были в БД на момент начала синхронизации."""
+
+    teachers: dict[UUID, int] = field(default_factory=dict)
+    audiences: dict[str, int] = field(default_factory=dict)
+    disciplines: dict[str, int] = field(default_factory=dict)
+    schedule_pairs: dict[str, int] = field(default_factory=dict)
+    schedule_hashes: dict[int, str] = field(default_factory=dict)
+
+
+class SyncCache:
+    """Ключи синхронизированных за прогон записей и их id.
+
+    Каждая транзакция и точка сохранения пишет в свой дочерний слой, который
+    переносится в родительский через `commit` только после успешной записи в
+    БД. Так id из откатившихся вставок не попадают в общий кеш.
+    """
+
+    def __init__(
+        self,
+        known: Optional[KnownIds] = None,
+        parent: Optional[SyncCache] = None,
+    ) -> None:
+        if parent is None:
+            self.known = known or KnownIds()
+            self.teachers: ChainMap[UUID, int] = ChainMap()
+            self.audiences: ChainMap[str, int] = ChainMap()
+            self.disciplines: ChainMap[str, int] = ChainMap()
+            self.schedule_pairs: ChainMap[str, int] = ChainMap()
+        else:
+            self.known = parent.known
+            self.teachers = parent.teachers.new_child()
+            self.audiences = parent.audiences.new_child()
+            self.disciplines = parent.disciplines.new_child()
+            self.schedule_pairs = parent.schedule_pairs.new_child()
+
+    def child(self) -> SyncCache:
+        return SyncCache(parent=self)
+
+    def schedule_pair_key(self, pair: PairRow) -> tuple[str, list[int], list[int]]:
+        """unique_field пары и id её преподавателей и аудиторий из кеша."""
+        teacher_ids = [self.teachers[key] for key in pair.teacher_keys]
+        audience_ids = [self.audiences[key] for key in pair.audience_keys]
+        unique_field = schedule_pair_unique_field(
+            pair.day,
+            pair.week,
+            pair.start_time,
+            pair.end_time,
+            audience_ids,
+            pair.discipline_key,
+            pair.teacher_keys,
+        )
+        return unique_field, teacher_ids, audience_ids
+
+    def commit(self) -> None:
+        for chain in self.__chains():
+            chain.maps[1].update(chain.maps[0])
+            chain.maps[0].clear()
+
+    def __chains(self) -> tuple[ChainMap[Any, int], ...]:
+        return self.teachers, self.audiences, self.disciplines, self.schedule_pairs
@@ -0,0 +1,194 @@
+import hashlib
+from collections.abc import Collection, Mapping
+from typing import Any
+from uuid import UUID
+
+import app.clients.lks.models as lks
+from app.domain.day_of_week import DayOfWeek
+from app.domain.sync_diff import Snapshot, SyncEntity
+from app.domain.week import Week
+from app.utils.lks_rows import (
+    audience_unique_field,
+    course_row,
+    discipline_unique_field,
+    schedule_pair_unique_field,
+    structure_levels,
+    structure_row,
+)
+
+# целевой набор не пишется в БД, поэтому sync_id в строках не важен
+_NO_SYNC_ID = 0
+
+
+def build_target(
+    university: lks.StructureNode,
+    schedules: Mapping[UUID, lks.Schedule],
+    audience_ids: Mapping[str, int],
+) -> Snapshot:
+    """Собирает из ответов ЛКС снимок, который оставила бы синхронизация.
+
+    Ключи и значения устроены как в `SyncSnapshotRepo.load`.
+    `audience_ids` нужны для ключей пар: синхронизация строит их из id
+    аудиторий в БД.
+    """
+    target: Snapshot = {entity: {} for entity in SyncEntity}
+    _add_structure(target, university)
+    for group_id, schedule in schedules.items():
+        for pair in schedule.data:
+            _add_schedule_pair(target, group_id, pair, audience_ids)
+    return target
+
+
+def keep_failed_groups(
+    target: Snapshot,
+    current: Snapshot,
+    failed_group_ids: Collection[UUID],
+) -> None:
+    """Переносит в целевой снимок текущее расписание групп, которые не скачались.
+
+    Синхронизация не трогает расписание таких групп, поэтому и в diff оно
+    не должно попасть в удаления.
+    """
+    kept_pairs = _keep_group_links(target, current, set(failed_group_ids))
+    _keep_pairs(target, current, kept_pairs)
+    for link_entity, entity in (
+        (SyncEntity.SCHEDULE_PAIR_TEACHERS, SyncEntity.TEACHERS),
+        (SyncEntity.SCHEDULE_PAIR_AUDIENCES, SyncEntity.AUDIENCES),
+    ):
+        _keep_pair_links(target, current, kept_pairs, link_entity, entity)
+
+
+def _add_structure(target: Snapshot, university: lks.StructureNode) -> None:
+    levels = structure_levels(university)
+    target[SyncEntity.UNIVERSITIES][university.id] = _structure_values(university)
+    for entity, level in (
+        (SyncEntity.FILIALS, levels.filials),
+        (SyncEntity.FACULTIES, levels.faculties),
+        (SyncEntity.DEPARTMENTS, levels.departments),
+    ):
+        for node, parent in level:
+            target[entity][node.id] = (*_structure_values(node), parent.id)
+    for course, department in levels.courses:
+        row = course_row(course, department, 0, _NO_SYNC_ID)
+        target[SyncEntity.COURSES][row["unique_field"]] = (
+            row["abbr"],
+            row["course_num"],
+            department.id,
+        )
+    for group, course_key in levels.groups:
+        target[SyncEntity.GROUPS][group.id] = (
+            group.abbr,
+            group.semester_num or 1,
+            course_key,
+        )
+
+
+def _keep_group_links(
+    target: Snapshot,
+    current: Snapshot,
+    failed: set[UUID],
+) -> set[str]:
+    kept_pairs = set()
+    for key, values in current.get(SyncEntity.SCHEDULE_PAIR_GROUPS, {}).items():
+        pair_key, group_id = key
+        if group_id in failed:
+            target[SyncEntity.SCHEDULE_PAIR_GROUPS][key] = values
+            kept_pairs.add(pair_key)
+    return kept_pairs
+
+
+def _keep_pairs(target: Snapshot, current: Snapshot, kept_pairs: set[str]) -> None:
+    current_pairs = current.get(SyncEntity.SCHEDULE_PAIRS, {})
+    current_disciplines = current.get(SyncEntity.DISCIPLINES, {})
+    for pair_key in kept_pairs:
+        values = current_pairs[pair_key]
+        target[SyncEntity.SCHEDULE_PAIRS].setdefault(pair_key, values)
+        discipline_key = values[-1]
+        target[SyncEntity.DISCIPLINES].setdefault(
+            discipline_key,
+            current_disciplines[discipline_key],
+        )
+
+
+def _keep_pair_links(
+    target: Snapshot,
+    current: Snapshot,
+    kept_pairs: set[str],
+    link_entity: SyncEntity,
+    entity: SyncEntity,
+) -> None:
+    # вместе со связью переносится и запись, на которую она ссылается
+    current_rows = current.get(entity, {})
+    for key, values in current.get(link_entity, {}).items():
+        pair_key, other_key = key
+        if pair_key in kept_pairs:
+            target[link_entity].setdefault(key, values)
+            target[entity].setdefault(other_key, current_rows[other_key])
+
+
+def _structure_values(node: lks.StructureNode) -> tuple[Any, ...]:
+    row = structure_row(node, _NO_SYNC_ID)
+    return row["abbr"], row["name"]
+
+
+def _add_schedule_pair(
+    target: Snapshot,
+    group_id: UUID,
+    pair: lks.SchedulePair,
+    audience_ids: Mapping[str, int],
+) -> None:
+    # как и в снимке, у этих записей сравниваются только ключи
+    for teacher in pair.teachers:
+        target[SyncEntity.TEACHERS][teacher.id] = ()
+    audience_keys = [audience_unique_field(audience) for audience in pair.audiences]
+    for audience_key in audience_keys:
+        target[SyncEntity.AUDIENCES][audience_key] = ()
+    target[SyncEntity.DISCIPLINES][discipline_unique_field(pair.discipline)] = ()
+
+    day = DayOfWeek.from_lks(pair.day)
+    week = Week.from_lks(pair.week)
+    pair_key = _schedule_pair_key(day, week, pair, audience_keys, audience_ids)
+    # как и синхронизация, пару пишем один раз, остальные группы её переиспользуют
+    target[SyncEntity.SCHEDULE_PAIRS].setdefault(
+        pair_key,
+        (
+            day,
+            week,
+            pair.start_time,
+            pair.end_time,
+            discipline_unique_field(pair.discipline),
+        ),
+    )
+    target[SyncEntity.SCHEDULE_PAIR_GROUPS][(pair_key, group_id)] = ()
+    for teacher in pair.teachers:
+        target[SyncEntity.SCHEDULE_PAIR_TEACHERS][(pair_key, teacher.id)] = ()
+    for audience_key in audience_keys:
+        target[SyncEntity.SCHEDULE_PAIR_AUDIENCES][(pair_key, audience_key)] = ()
+
+
+def _schedule_pair_key(
+    day: DayOfWeek,
+    week: Week,
+    pair: lks.SchedulePair,
+    audience_keys: list[str],
+    audience_ids: Mapping[str, int],
+) -> str:
+    discipline_key = discipline_unique_field(pair.discipline)
+    teacher_keys = [teacher.id for teacher in pair.teachers]
+    if all(key in audience_ids for key in audience_keys):
+        return schedule_pair_unique_field(
+            day,
+            week,
+            pair.start_time,
+            pair.end_time,
+            [audience_ids[key] for key in audience_keys],
+            discipline_key,
+            teacher_keys,
+        )
+    # id новой аудитории появится только при записи, а такой пары в БД точно
+    # нет, поэтому хватит любого устойчивого ключа
+    key = (
+        f"{day}_{week}_{pair.start_time}_{pair.end_time}_{sorted(audience_keys)}_"
+        f"{discipline_key}_{sorted(map(str, teacher_keys))}"
+    )
+    return "new:" + hashlib.md5(key.encode()).hexdigest()  # noqa: S324
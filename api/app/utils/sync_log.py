@@ -0,0 +1,14 @@
+from typing import Any
+
+from loguru import logger
+
+from app.settings import SyncSettings
+
+
+def log_detail(settings: SyncSettings, message: str, *args: Any) -> None:
+    """Пишет подробный лог синхронизации по отдельным группам и парам.
+
+    Шаблон форматируется только при включённом `log_details`.
+    """
+    if settings.log_details:
+        logger.debug(message, *args)
@@ -0,0 +1,112 @@
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import ISessionMaker
+from app.domain.sync_diff import SyncEntity
+from app.repos.audience_repo import audience_repo
+from app.repos.base_repo import BaseRepo
+from app.repos.course_repo import course_repo
+from app.repos.department_repo import department_repo
+from app.repos.discipline_repo import discipline_repo
+from app.repos.faculty_repo import faculty_repo
+from app.repos.filial_repo import filial_repo
+from app.repos.group_repo import group_repo
+from app.repos.schedule_pair_repo import SchedulePairRepo, schedule_pair_repo
+from app.repos.sync_repo import SyncRepo, sync_repo
+from app.repos.teacher_repo import teacher_repo
+from app.repos.university_repo import university_repo
+from app.settings import SyncSettings, sync_settings
+from app.utils.sync_stats import SyncStats
+
+
+class SyncReconciler:
+    """Публикует версию синхронизации и убирает то, что она не увидела.
+
+    Устаревшие строки `stale_repositories` удаляются в переданном порядке,
+    поэтому сначала должны идти таблицы, которые ссылаются на остальные.
+    """
+
+    def __init__(
+        self,
+        schedule_pair_repository: SchedulePairRepo,
+        sync_repository: SyncRepo,
+        stale_repositories: Sequence[BaseRepo[Any]],
+        settings: SyncSettings,
+    ) -> None:
+        self.schedule_pair_repository = schedule_pair_repository
+        self.sync_repository = sync_repository
+        self.stale_repositories = stale_repositories
+        self.settings = settings
+
+    async def reconcile(
+        self,
+        sessionmaker: ISessionMaker,
+        sync_id: int,
+        stats: SyncStats,
+    ) -> None:
+        # переключение версии - одна транзакция: читатели видят либо старое
+        # расписание целиком, либо новое
+        async with sessionmaker() as session:
+            await self.schedule_pair_repository.carry_forward_links(session, sync_id)
+            await self.sync_repository.publish(session, sync_id)
+            await session.commit()
+
+        async with sessionmaker() as session:
+            deleted = await self.schedule_pair_repository.delete_old_link_versions(
+                session,
+                sync_id,
+            )
+            stats.add_deleted(SyncEntity.SCHEDULE_PAIR_GROUPS, deleted)
+            await self.schedule_pair_repository.touch_live_schedules(session, sync_id)
+
+            if self.settings.collect_garbage:
+                await self._collect_garbage(session, sync_id, stats)
+            await session.commit()
+
+    async def _collect_garbage(
+        self,
+        session: AsyncSession,
+        sync_id: int,
+        stats: SyncStats,
+    ) -> None:
+        # сначала связи, затем сами строки
+        deleted = await self.schedule_pair_repository.delete_stale_links(
+            session,
+            sync_id,
+        )
+        for repository in self.stale_repositories:
+            table_name = repository.model.__tablename__
+            deleted[table_name] = await repository.delete_stale(session, sync_id)
+
+        for table_name, count in deleted.items():
+            stats.add_deleted(SyncEntity(table_name), count)
+        logger.info(
+            "Deleted stale rows: "
+            + ", ".join(f"{count} {name}" for name, count in deleted.items()),
+        )
+
+
+@lru_cache(maxsize=1)
+def sync_reconciler() -> SyncReconciler:
+    return SyncReconciler(
+        schedule_pair_repository=schedule_pair_repo(),
+        sync_repository=sync_repo(),
+        # сначала пары, и только потом то, на что они ссылаются
+        stale_repositories=(
+            schedule_pair_repo(),
+            discipline_repo(),
+            teacher_repo(),
+            audience_repo(),
+            group_repo(),
+            course_repo(),
+            department_repo(),
+            faculty_repo(),
+            filial_repo(),
+            university_repo(),
+        ),
+        settings=sync_settings(),
+    )
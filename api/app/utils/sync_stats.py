@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Iterator, Optional
+
+from app.domain.sync_diff import SyncEntity
+from app.repos.base_repo import UpsertedIds
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class RowCounts:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+
+
+class SyncStats:
+    """Время этапов и объём изменений одного прогона синхронизации.
+
+    Этапы конвейера расписаний идут параллельно, поэтому для скачивания,
+    разбора и записи считается суммарное время работы, для всего этапа
+    `schedule` - время по часам.
+
+    Как и `SyncCache`, каждая транзакция и точка сохранения копит счётчики в
+    своём дочернем слое, который переносится в родительский через `commit`
+    только после успешной записи. Так строки из откатившихся записей не
+    попадают в отчёт, и пачка, переписанная после ошибки, не считается дважды.
+    """
+
+    def __init__(self, parent: Optional[SyncStats] = None) -> None:
+        self.parent = parent
+        self.durations: defaultdict[str, float] = defaultdict(float)
+        self.fetch_latencies: list[float] = []
+        self.rows: defaultdict[SyncEntity, RowCounts] = defaultdict(RowCounts)
+        self.groups: defaultdict[str, int] = defaultdict(int)
+
+    def child(self) -> SyncStats:
+        return SyncStats(parent=self)
+
+    def commit(self) -> None:
+        if self.parent is None:
+            return
+        for stage, duration in self.durations.items():
+            self.parent.durations[stage] += duration
+        self.parent.fetch_latencies.extend(self.fetch_latencies)
+        for entity, counts in self.rows.items():
+            parent_counts = self.parent.rows[entity]
+            parent_counts.inserted += counts.inserted
+            parent_counts.updated += counts.updated
+            parent_counts.deleted += counts.deleted
+        for outcome, count in self.groups.items():
+            self.parent.groups[outcome] += count
+        self.durations.clear()
+        self.fetch_latencies.clear()
+        self.rows.clear()
+        self.groups.clear()
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.durations[stage] += time.monotonic() - started_at
+
+    def add_fetch_latency(self, latency: float) -> None:
+        self.fetch_latencies.append(latency)
+
+    def add_upserted(self, entity: SyncEntity, ids: UpsertedIds) -> None:
+        self.rows[entity].inserted += ids.inserted
+        self.rows[entity].updated += ids.updated
+
+    def add_updated(self, entity: SyncEntity, count: int) -> None:
+        self.rows[entity].updated += count
+
+    def add_deleted(self, entity: SyncEntity, count: int) -> None:
+        self.rows[entity].deleted += count
+
+    def add_groups(self, outcome: str, count: int = 1) -> None:
+        self.groups[outcome] += count
+
+    def groups_processed(self) -> int:
+        # пропущенные при продолжении группы обработаны в прошлых прогонах
+        return sum(
+            count for outcome, count in self.groups.items() if outcome != "skipped"
+        )
+
+    def progress(self) -> str:
+        """Короткая сводка для периодического лога."""
+        groups = ", ".join(
+            f"{outcome} {count}" for outcome, count in sorted(self.groups.items())
+        )
+        rows = ", ".join(
+            f"{entity} +{counts.inserted}/~{counts.updated}"
+            for entity, counts in sorted(self.rows.items())
+        )
+        return f"groups: {groups or '-'}; rows: {rows or '-'}"
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "durations_sec": {
+                stage: round(duration, 3) for stage, duration in self.durations.items()
+            },
+            "fetch_latency_sec": _latency_summary(self.fetch_latencies),
+            "rows": {
+                str(entity): asdict(counts) for entity, counts in self.rows.items()
+            },
+            "groups": dict(self.groups),
+        }
+
+
+def _latency_summary(latencies: list[float]) -> dict[str, float]:
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    summary = {
+        # перцентиль по ближайшему рангу, без интерполяции
+        f"p{percentile}": round(
+            ordered[max(0, -(-len(ordered) * percentile // 100) - 1)],
+            3,
+        )
+        for percentile in LATENCY_PERCENTILES
+    }
+    summary["max"] = round(ordered[-1], 3)
+    return summary
@@ -0,0 +1,42 @@
+import asyncio
+import signal
+from contextlib import suppress
+
+from loguru import logger
+
+from app.db.database import get_default_session_maker
+from app.services.sync_svc import sync_svc
+from app.settings import worker_settings
+
+
+async def run_worker() -> None:
+    """Выполняет синхронизации из очереди, пока процесс не остановят.
+
+    По SIGTERM или SIGINT текущая синхронизация доводится до конца. Если
+    процесс всё же убьют, её заберёт другой воркер, когда отметка устареет.
+    """
+    settings = worker_settings()
+    sessionmaker = get_default_session_maker()
+    svc = sync_svc()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    logger.info("Sync worker started")
+    while not stopping.is_set():
+        try:
+            claimed = await svc.run_next(sessionmaker)
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Error claiming synchronization: {e}")
+            claimed = False
+        if claimed:
+            continue
+        with suppress(TimeoutError):
+            await asyncio.wait_for(stopping.wait(), settings.poll_interval_sec)
+    logger.info("Sync worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
@@ -0,0 +1,25 @@
+from http import HTTPStatus
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi.testclient import TestClient
+
+from app.api.app import create_app
+from app.db.database import get_default_session_maker
+from app.domain.errors import SyncNotResumableError
+from app.services.sync_svc import SyncSvc, sync_svc
+
+
+def test_resume_not_resumable_sync_returns_conflict() -> None:
+    sync_svc_mock = AsyncMock(spec=SyncSvc)
+    sync_svc_mock.resume_synchronization_task.side_effect = SyncNotResumableError(
+        "Synchronization 5 is success",
+    )
+    session_maker_mock = MagicMock()
+    app = create_app()
+    app.dependency_overrides[sync_svc] = lambda: sync_svc_mock
+    app.dependency_overrides[get_default_session_maker] = lambda: session_maker_mock
+
+    response = TestClient(app).post("/admin/sync/5/resume")
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {"detail": "Synchronization 5 is success"}
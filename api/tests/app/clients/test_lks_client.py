@@ -1,17 +1,40 @@
 import uuid
+from pathlib import Path
+from typing import Any
 
+import aiohttp
 import pytest
 from aioresponses import aioresponses
+from pytest_mock import MockerFixture
+from yarl import URL
 
-from app.clients.lks.client import LksClient, get_lks_client
-from app.clients.lks.models import Schedule, StructureNode
+from app.clients.lks.client import LksClient, ReplayLksClient
+from app.clients.lks.models import CurrentSchedule, Schedule, StructureNode
+from app.settings import LksSettings, lks_settings
 
 pytestmark = pytest.mark.asyncio
 
 
 @pytest.fixture(name="lks_client")
 def lks_client_fixture() -> LksClient:
-    return get_lks_client()
+    return LksClient(settings=no_disk_cache_settings())
+
+
+def no_disk_cache_settings() -> LksSettings:
+    return lks_settings().model_copy(update={"response_cache_dir": None})
+
+
+@pytest.fixture(name="current_schedule_response")
+def current_schedule_response_fixture() -> dict[str, Any]:
+    return {
+        "data": {
+            "term": 2,
+            "weekNumber": 7,
+            "weekShortName": "чс",
+            "semesterStarts": "2025-02-10",
+            "semesterEnds": "2025-06-30",
+        },
+    }
 
 
 async def test_get_structure(lks_client: LksClient) -> None:
@@ -93,3 +116,134 @@ async def test_get_schedule(lks_client: LksClient) -> None:
         assert pair.start_time == "09:00"
         assert pair.end_time == "10:30"
         assert pair.discipline.abbr == "ВУЦ"
+
+
+async def test_open_session_reuses_session(
+    lks_client: LksClient,
+    mocker: MockerFixture,
+    current_schedule_response: dict[str, Any],
+) -> None:
+    session_spy = mocker.spy(aiohttp, "ClientSession")
+
+    with aioresponses() as mock:
+        mock.get(
+            "https://lks.bmstu.ru/lks-back/api/v1/schedules/current",
+            payload=current_schedule_response,
+            repeat=True,
+        )
+
+        async with lks_client.open_session(), lks_client.open_session():
+            await lks_client.get_current_schedule()
+            await lks_client.get_current_schedule()
+
+        await lks_client.get_current_schedule()
+
+    expected_sessions = 2
+    assert session_spy.call_count == expected_sessions
+
+
+def make_cached_client(cache_dir: Path) -> LksClient:
+    settings = lks_settings().model_copy(
+        update={"response_cache_dir": str(cache_dir), "retry_wait_sec": 0.01},
+    )
+    return LksClient(settings=settings)
+
+
+async def test_not_modified_returns_cached_body(
+    tmp_path: Path,
+    current_schedule_response: dict[str, Any],
+) -> None:
+    url = "https://lks.bmstu.ru/lks-back/api/v1/schedules/current"
+    lks_client = make_cached_client(tmp_path)
+
+    with aioresponses() as mock:
+        mock.get(url, payload=current_schedule_response, headers={"ETag": '"v1"'})
+        mock.get(url, status=304)
+
+        first: CurrentSchedule = await lks_client.get_current_schedule()
+        second: CurrentSchedule = await lks_client.get_current_schedule()
+
+        requests = mock.requests[("GET", URL(url))]
+
+    assert second == first
+    assert "If-None-Match" not in requests[0].kwargs["headers"]
+    assert requests[1].kwargs["headers"]["If-None-Match"] == '"v1"'
+
+
+async def test_unreachable_returns_cached_body_from_disk(
+    tmp_path: Path,
+    current_schedule_response: dict[str, Any],
+) -> None:
+    url = "https://lks.bmstu.ru/lks-back/api/v1/schedules/current"
+
+    with aioresponses() as mock:
+        mock.get(url, payload=current_schedule_response)
+        expected = await make_cached_client(tmp_path).get_current_schedule()
+
+    with aioresponses():
+        actual = await make_cached_client(tmp_path).get_current_schedule()
+
+    assert actual == expected
+
+
+async def test_unreachable_without_cache_raises(tmp_path: Path) -> None:
+    with aioresponses(), pytest.raises(aiohttp.ClientConnectionError):
+        await make_cached_client(tmp_path).get_current_schedule()
+
+
+async def test_retries_server_errors(
+    tmp_path: Path,
+    current_schedule_response: dict[str, Any],
+) -> None:
+    url = "https://lks.bmstu.ru/lks-back/api/v1/schedules/current"
+    lks_client = make_cached_client(tmp_path)
+
+    with aioresponses() as mock:
+        mock.get(url, status=503)
+        mock.get(url, payload=current_schedule_response)
+
+        current_schedule = await lks_client.get_current_schedule()
+
+    expected_week_number = 7
+    assert current_schedule.week_number == expected_week_number
+
+
+async def test_does_not_retry_client_errors(tmp_path: Path) -> None:
+    url = "https://lks.bmstu.ru/lks-back/api/v1/schedules/current"
+    lks_client = make_cached_client(tmp_path)
+
+    with aioresponses() as mock:
+        mock.get(url, status=404)
+        mock.get(url, status=200)
+
+        with pytest.raises(aiohttp.ClientResponseError):
+            await lks_client.get_current_schedule()
+
+
+async def test_recorded_responses_are_replayed_offline(
+    tmp_path: Path,
+    current_schedule_response: dict[str, Any],
+) -> None:
+    url = "https://lks.bmstu.ru/lks-back/api/v1/schedules/current"
+    archive_path = tmp_path / "lks.zip"
+    settings = no_disk_cache_settings().model_copy(
+        update={"record_archive_path": str(archive_path)},
+    )
+    recording_client = LksClient(settings=settings)
+
+    with aioresponses() as mock:
+        mock.get(url, payload=current_schedule_response)
+        async with recording_client.open_session():
+            recorded = await recording_client.get_current_schedule()
+
+    replay_client = ReplayLksClient(
+        settings=no_disk_cache_settings(),
+        archive_path=archive_path,
+        latency_sec=0.01,
+    )
+    with aioresponses():
+        replayed = await replay_client.get_current_schedule()
+        with pytest.raises(LookupError):
+            await replay_client.get_structure()
+
+    assert replayed == recorded
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+
+from app.clients.lks.limiter import AimdLimiter
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_limiter(initial_limit: int = 4) -> AimdLimiter:
+    return AimdLimiter(
+        initial_limit=initial_limit,
+        min_limit=1,
+        max_limit=8,
+        latency_target_sec=1,
+    )
+
+
+async def test_limit_grows_on_fast_responses() -> None:
+    limiter = make_limiter()
+
+    # примерно +1 за каждые `limit` успешных ответов
+    for _ in range(5):
+        async with limiter.slot() as started_at:
+            limiter.on_success(started_at)
+
+    expected_limit = 5
+    assert limiter.limit == expected_limit
+
+
+async def test_limit_halves_once_per_wave_of_failures() -> None:
+    limiter = make_limiter(initial_limit=8)
+    started_at = time.monotonic()
+
+    limiter.on_failure(started_at)
+    limiter.on_failure(started_at)
+
+    expected_limit = 4
+    assert limiter.limit == expected_limit
+
+    limiter.on_failure(time.monotonic())
+
+    expected_limit = 2
+    assert limiter.limit == expected_limit
+
+
+async def test_limit_shrinks_on_slow_responses() -> None:
+    limiter = make_limiter(initial_limit=8)
+
+    limiter.on_success(time.monotonic() - 2)
+
+    expected_limit = 7
+    assert limiter.limit == expected_limit
+
+
+async def test_slot_waits_for_free_place() -> None:
+    limiter = make_limiter(initial_limit=1)
+    entered = asyncio.Event()
+
+    async def second_request() -> None:
+        async with limiter.slot():
+            entered.set()
+
+    async with limiter.slot():
+        task = asyncio.create_task(second_request())
+        await asyncio.sleep(0.01)
+        assert not entered.is_set()
+
+    await asyncio.wait_for(task, timeout=1)
+    assert entered.is_set()
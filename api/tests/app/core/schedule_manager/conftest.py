@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timezone
 from unittest.mock import AsyncMock
 
 import pytest
@@ -12,6 +12,7 @@ from app.models.discipline import Discipline
 from app.models.group import Group
 from app.models.schedule_pair import SchedulePair
 from app.models.teacher import Teacher
+from app.settings import schedule_manager_settings
 
 
 @pytest.fixture(name="lks_client_mock")
@@ -21,15 +22,20 @@ def lks_client_mock_fixture() -> AsyncMock:
         term=1,
         weekNumber=1,
         weekShortName=lks.WeekRu.ODD,
-        semesterStarts=datetime.now(tz=timezone.utc).date(),
-        semesterEnds=datetime.now(tz=timezone.utc).date() + timedelta(days=30),
+        # 2024-03-18, на который приходится большинство тестов, - понедельник
+        # седьмой, нечётной недели
+        semesterStarts=date(2024, 2, 5),
+        semesterEnds=date(2024, 6, 30),
     )
     return client
 
 
 @pytest.fixture(name="schedule_manager")
 def schedule_manager_fixture(lks_client_mock: AsyncMock) -> ScheduleManager:
-    return ScheduleManager(lks_client=lks_client_mock)
+    settings = schedule_manager_settings().model_copy(
+        update={"current_schedule_cache_path": None},
+    )
+    return ScheduleManager(lks_client=lks_client_mock, settings=settings)
 
 
 @pytest.fixture(name="monday_time_slot")
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.clients import lks
+from app.core.schedule_manager.current_schedule_cache import CurrentScheduleCache
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_current_schedule(week_number: int) -> lks.CurrentSchedule:
+    return lks.CurrentSchedule(
+        term=1,
+        weekNumber=week_number,
+        weekShortName=lks.WeekRu.ODD,
+        semesterStarts=date(2024, 2, 5),
+        semesterEnds=date(2024, 6, 30),
+    )
+
+
+async def test_persisted_value_survives_restart(tmp_path: Path) -> None:
+    path = tmp_path / "current_schedule.json"
+    expected = make_current_schedule(week_number=1)
+    await CurrentScheduleCache(
+        fetch=AsyncMock(return_value=expected),
+        ttl_sec=3600,
+        retry_sec=60,
+        path=path,
+    ).warm_up()
+
+    fetch = AsyncMock(side_effect=TimeoutError)
+    cache = CurrentScheduleCache(fetch=fetch, ttl_sec=3600, retry_sec=60, path=path)
+
+    assert await cache.get() == expected
+    fetch.assert_not_called()
+
+
+async def test_stale_value_is_served_while_refreshing() -> None:
+    stale = make_current_schedule(week_number=1)
+    fresh = make_current_schedule(week_number=2)
+    fetch = AsyncMock(side_effect=[stale, fresh])
+    cache = CurrentScheduleCache(fetch=fetch, ttl_sec=0, retry_sec=60)
+
+    assert await cache.get() == stale
+    assert await cache.get() == stale
+    await asyncio.sleep(0)
+
+    assert await cache.get() == fresh
+
+
+async def test_failed_refresh_keeps_stale_value() -> None:
+    stale = make_current_schedule(week_number=1)
+    fetch = AsyncMock(side_effect=[stale, TimeoutError])
+    cache = CurrentScheduleCache(fetch=fetch, ttl_sec=0, retry_sec=60)
+
+    await cache.get()
+    await cache.get()
+    await asyncio.sleep(0)
+
+    assert await cache.get() == stale
+    # повтор после неудачи откладывается на retry_sec
+    expected_calls = 2
+    assert fetch.await_count == expected_calls
@@ -0,0 +1,74 @@
+from datetime import date, datetime, timedelta, timezone
+
+from app import domain
+from app.core.schedule_manager import ScheduleManager
+from app.core.schedule_manager.expansion import expand_weekly
+from app.models.discipline import Discipline
+from app.models.schedule_pair import SchedulePair
+
+MOSCOW_TZ = timezone(timedelta(hours=3))
+
+
+def make_pair(
+    pair_id: int,
+    day: domain.DayOfWeek,
+    week: domain.Week,
+    discipline: Discipline,
+) -> SchedulePair:
+    return SchedulePair(
+        id=pair_id,
+        day=day.value,
+        week=week.value,
+        start_time="10:15",
+        end_time="11:50",
+        discipline=discipline,
+        groups=[],
+        teachers=[],
+        audiences=[],
+        unique_field=str(pair_id),
+    )
+
+
+def test_expand_weekly_matches_day_by_day_reference(
+    mock_discipline: Discipline,
+) -> None:
+    pairs = [
+        make_pair(1, domain.DayOfWeek.MONDAY, domain.Week.ODD, mock_discipline),
+        make_pair(2, domain.DayOfWeek.MONDAY, domain.Week.ALL, mock_discipline),
+        make_pair(3, domain.DayOfWeek.FRIDAY, domain.Week.EVEN, mock_discipline),
+        make_pair(4, domain.DayOfWeek.SUNDAY, domain.Week.ALL, mock_discipline),
+    ]
+    # диапазон пересекает новый год, начало и конец внутри дня
+    dt_from = datetime(2024, 12, 16, 11, 0, tzinfo=MOSCOW_TZ)
+    dt_to = datetime(2025, 2, 10, 10, 30, tzinfo=MOSCOW_TZ)
+    first_day = dt_from.replace(hour=0, minute=0)
+
+    calendar = domain.AcademicCalendar(date(2024, 9, 2), date(2025, 6, 30))
+
+    def week_of(day: datetime) -> domain.Week:
+        week = calendar.week(day.date())
+        assert week is not None
+        return week
+
+    expected = []
+    day = first_day
+    while day <= dt_to:
+        expected.extend(
+            ScheduleManager.create_concrete_pairs_for_day_and_week(
+                schedule_pairs=pairs,
+                day_of_week=domain.DayOfWeek.from_weekday(day.weekday()),
+                week=week_of(day),
+                current_date=day,
+                dt_from=dt_from,
+                dt_to=dt_to,
+            ),
+        )
+        day += timedelta(days=1)
+
+    result = [
+        occurrence.to_schema()
+        for occurrence in expand_weekly(pairs, first_day, dt_from, dt_to, week_of)
+    ]
+
+    assert expected
+    assert result == expected
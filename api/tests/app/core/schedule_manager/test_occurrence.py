@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from app import domain
+from app.api import schemas
+from app.core.schedule_manager.occurrence import PairTemplates
+from app.models.schedule_pair import SchedulePair
+
+MOSCOW_TZ = timezone(timedelta(hours=3))
+
+
+def test_occurrence_schema_matches_validated_schema(
+    mock_schedule_pair: SchedulePair,
+    mock_discipline_base: schemas.DisciplineBase,
+    mock_group_base: schemas.GroupBase,
+    mock_teacher_base: schemas.TeacherBase,
+    mock_room_base: schemas.RoomBase,
+) -> None:
+    day = datetime(2024, 3, 18, tzinfo=MOSCOW_TZ)
+
+    occurrence = PairTemplates()[mock_schedule_pair].on(day)
+
+    assert occurrence.to_schema() == schemas.SchedulePairRead(
+        time_slot=domain.TimeSlot.from_str_times(
+            start_time=mock_schedule_pair.start_time,
+            end_time=mock_schedule_pair.end_time,
+            current_date=day,
+        ),
+        discipline=mock_discipline_base,
+        groups=[mock_group_base],
+        teachers=[mock_teacher_base],
+        rooms=[mock_room_base],
+    )
+
+
+def test_template_is_built_once_per_pair(mock_schedule_pair: SchedulePair) -> None:
+    templates = PairTemplates()
+    monday = datetime(2024, 3, 18, tzinfo=MOSCOW_TZ)
+
+    first = templates[mock_schedule_pair].on(monday)
+    second = templates[mock_schedule_pair].on(monday + timedelta(weeks=1))
+
+    assert first.template is second.template
+    assert first.to_schema().discipline is second.to_schema().discipline
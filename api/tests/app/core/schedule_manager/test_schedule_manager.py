@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timezone
 from unittest.mock import AsyncMock
 
 import pytest
@@ -79,8 +79,9 @@ async def test_generate_concrete_pairs_wrong_week(
         term=1,
         weekNumber=2,
         weekShortName=WeekRu.EVEN,
-        semesterStarts=datetime.now(tz=timezone.utc).date(),
-        semesterEnds=datetime.now(tz=timezone.utc).date() + timedelta(days=30),
+        # 2024-03-18 приходится на шестую, чётную неделю
+        semesterStarts=date(2024, 2, 12),
+        semesterEnds=date(2024, 6, 30),
     )
 
     result = await schedule_manager.generate_concrete_pairs(
@@ -269,3 +270,28 @@ async def test_generate_concrete_pairs_invalid_time_format(
             dt_from=monday_time_slot.start_time,
             dt_to=monday_time_slot.end_time,
         )
+
+
+async def test_index_pairs_buckets_by_day_and_week(
+    mock_schedule_pair: SchedulePair,
+    mock_discipline: Discipline,
+) -> None:
+    every_week_pair = SchedulePair(
+        id=2,
+        day=domain.DayOfWeek.MONDAY.value,
+        week=domain.Week.ALL.value,
+        start_time="12:00",
+        end_time="13:30",
+        discipline=mock_discipline,
+        groups=[],
+        teachers=[],
+        audiences=[],
+        unique_field="every-week",
+    )
+
+    index = ScheduleManager.index_pairs([mock_schedule_pair, every_week_pair])
+
+    monday = domain.DayOfWeek.MONDAY
+    assert index[(monday, domain.Week.ODD)] == [mock_schedule_pair, every_week_pair]
+    assert index[(monday, domain.Week.EVEN)] == [every_week_pair]
+    assert (domain.DayOfWeek.TUESDAY, domain.Week.ODD) not in index
@@ -0,0 +1,64 @@
+from datetime import date
+
+from app.clients.lks.models import CurrentSchedule, WeekRu
+from app.domain import AcademicCalendar, Week
+
+
+def make_current_schedule(week_number: int, week_ru: WeekRu) -> CurrentSchedule:
+    return CurrentSchedule(
+        term=2,
+        weekNumber=week_number,
+        weekShortName=week_ru,
+        semesterStarts=date(2024, 2, 5),
+        semesterEnds=date(2024, 6, 30),
+    )
+
+
+def test_weeks_are_counted_from_semester_start() -> None:
+    calendar = AcademicCalendar(date(2024, 2, 5), date(2024, 6, 30))
+
+    assert calendar.get(date(2024, 2, 5)) == (1, Week.ODD)
+    assert calendar.get(date(2024, 2, 12)) == (2, Week.EVEN)
+    assert calendar.get(date(2024, 3, 18)) == (7, Week.ODD)
+
+
+def test_days_outside_semester_have_no_week() -> None:
+    calendar = AcademicCalendar(date(2024, 2, 5), date(2024, 6, 30))
+
+    assert calendar.week(date(2024, 2, 4)) is None
+    assert calendar.week(date(2024, 7, 1)) is None
+
+
+def test_semester_starting_midweek_keeps_calendar_weeks() -> None:
+    # 2024-09-04 - среда, понедельник 2024-09-09 начинает вторую неделю
+    calendar = AcademicCalendar(date(2024, 9, 4), date(2025, 1, 31))
+
+    assert calendar.get(date(2024, 9, 8)) == (1, Week.ODD)
+    assert calendar.get(date(2024, 9, 9)) == (2, Week.EVEN)
+    # через новый год чётность не сбивается
+    assert calendar.get(date(2025, 1, 6)) == (19, Week.ODD)
+
+
+def test_lks_week_number_overrides_counting_inside_semester() -> None:
+    today = date(2024, 3, 18)
+
+    calendar = AcademicCalendar.from_current_schedule(
+        make_current_schedule(8, WeekRu.EVEN),
+        today,
+    )
+
+    assert calendar.get(today) == (8, Week.EVEN)
+    assert calendar.get(date(2024, 2, 5)) == (2, Week.EVEN)
+
+
+def test_lks_parity_wins_over_counted_parity() -> None:
+    today = date(2024, 3, 18)
+
+    # седьмая неделя по счёту нечётная, но ЛКС называет её знаменателем
+    calendar = AcademicCalendar.from_current_schedule(
+        make_current_schedule(7, WeekRu.EVEN),
+        today,
+    )
+
+    assert calendar.get(today) == (7, Week.EVEN)
+    assert calendar.get(date(2024, 3, 25)) == (8, Week.ODD)
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.schedule_pair import SchedulePair
+from app.repos.discipline_repo import discipline_repo
+from app.repos.schedule_pair_repo import schedule_pair_repo
+
+
+async def add_pair(
+    session: AsyncSession,
+    unique_field: str,
+    sync_id: int,
+) -> SchedulePair:
+    discipline_ids = await discipline_repo().upsert_by_unique_field(
+        session,
+        [
+            {
+                "unique_field": unique_field,
+                "abbr": "БД",
+                "full_name": "Базы данных",
+                "short_name": "БД",
+                "act_type": "lecture",
+                "sync_id": sync_id,
+            },
+        ],
+    )
+    return await schedule_pair_repo().add(
+        session,
+        SchedulePair(
+            unique_field=unique_field,
+            day="monday",
+            week="all",
+            start_time="08:30",
+            end_time="10:05",
+            discipline_id=discipline_ids[unique_field],
+            sync_id=sync_id,
+            created_at=datetime.now(tz=timezone.utc),
+        ),
+    )
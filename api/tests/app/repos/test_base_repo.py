@@ -0,0 +1,109 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.sync_status import SyncStatus
+from app.models.synchronization import Synchronization
+from app.models.teacher import Teacher
+from app.repos.audience_repo import audience_repo
+from app.repos.sync_repo import sync_repo
+from app.repos.teacher_repo import teacher_repo
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_upsert_by_lks_id_inserts_new_rows(
+    db_session_test: AsyncSession,
+    get_or_create_sync: Synchronization,
+) -> None:
+    teacher_repository = teacher_repo()
+    rows = [
+        {
+            "lks_id": uuid.uuid4(),
+            "first_name": f"Test-{i}",
+            "middle_name": "Test",
+            "last_name": "Test",
+            "sync_id": get_or_create_sync.id,
+        }
+        for i in range(3)
+    ]
+
+    ids = await teacher_repository.upsert_by_lks_id(db_session_test, rows)
+    await db_session_test.commit()
+
+    assert set(ids) == {row["lks_id"] for row in rows}
+    for row in rows:
+        teacher = await teacher_repository.get_by_id(
+            db_session_test,
+            ids[row["lks_id"]],
+        )
+        assert teacher is not None
+        assert teacher.first_name == row["first_name"]
+
+
+async def test_upsert_by_lks_id_keeps_existing_rows(
+    db_session_test: AsyncSession,
+    get_or_create_sync: Synchronization,
+    get_or_create_teacher: Teacher,
+) -> None:
+    teacher_repository = teacher_repo()
+    rows = [
+        {
+            "lks_id": get_or_create_teacher.lks_id,
+            "first_name": "Changed",
+            "middle_name": "Changed",
+            "last_name": "Changed",
+            "sync_id": get_or_create_sync.id,
+        },
+    ] * 2
+
+    ids = await teacher_repository.upsert_by_lks_id(db_session_test, rows)
+    await db_session_test.commit()
+
+    assert ids == {get_or_create_teacher.lks_id: get_or_create_teacher.id}
+
+
+async def test_upsert_by_unique_field_empty(
+    db_session_test: AsyncSession,
+) -> None:
+    ids = await audience_repo().upsert_by_unique_field(db_session_test, [])
+
+    assert ids == {}
+
+
+async def test_delete_stale_removes_rows_of_older_syncs(
+    db_session_test: AsyncSession,
+    get_or_create_teacher: Teacher,
+) -> None:
+    teacher_repository = teacher_repo()
+    new_sync = await sync_repo().add(
+        db_session_test,
+        Synchronization(
+            created_at=datetime.now(tz=timezone.utc),
+            status=SyncStatus.IN_PROGRESS,
+        ),
+    )
+    fresh = await teacher_repository.add(
+        db_session_test,
+        Teacher(
+            lks_id=uuid.uuid4(),
+            first_name="Fresh",
+            middle_name="Fresh",
+            last_name="Fresh",
+            sync_id=new_sync.id,
+        ),
+    )
+    await db_session_test.commit()
+
+    deleted = await teacher_repository.delete_stale(db_session_test, new_sync.id)
+    await db_session_test.commit()
+
+    db_session_test.expunge_all()
+    assert deleted == 1
+    assert await teacher_repository.get_by_id(db_session_test, fresh.id) is not None
+    assert (
+        await teacher_repository.get_by_id(db_session_test, get_or_create_teacher.id)
+        is None
+    )
@@ -6,6 +6,7 @@ import pytest
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.domain.sync_status import SyncStatus
 from app.domain.week import Week
 from app.models.audience import Audience
 from app.models.course import Course
@@ -19,6 +20,7 @@ from app.repos.course_repo import course_repo
 from app.repos.discipline_repo import discipline_repo
 from app.repos.group_repo import group_repo
 from app.repos.schedule_pair_repo import schedule_pair_repo
+from app.repos.sync_repo import sync_repo
 
 pytestmark = pytest.mark.asyncio
 
@@ -204,6 +206,31 @@ async def test_get_all_with_course_abbr_filter(
     assert filtered_groups[0].id == groups[0].id
 
 
+async def test_get_all_with_hierarchy_filters(
+    db_session_test: AsyncSession,
+    get_or_create_group: Group,
+) -> None:
+    group_repository = group_repo()
+
+    filtered_groups, total = await group_repository.get_all(
+        db_session_test,
+        department_abbr="АК1",
+        faculty_abbr="АК",
+        filial_abbr="Баумана",
+    )
+
+    assert get_or_create_group.id in {group.id for group in filtered_groups}
+    assert total == len(filtered_groups)
+
+    filtered_groups, total = await group_repository.get_all(
+        db_session_test,
+        faculty_abbr="unknown-faculty",
+    )
+
+    assert total == 0
+    assert filtered_groups == []
+
+
 async def test_get_order_by_created_at(
     db_session_test: AsyncSession,
     get_or_create_sync: Synchronization,
@@ -313,11 +340,15 @@ async def test_get_schedule_by_group_id_success(
     await db_session_test.execute(
         text(
             """
-        INSERT INTO schedule_pair_group (schedule_pair_id, group_id)
-        VALUES (:schedule_pair_id, :group_id)
+        INSERT INTO schedule_pair_group (schedule_pair_id, group_id, sync_id)
+        VALUES (:schedule_pair_id, :group_id, :sync_id)
         """,
         ),
-        {"schedule_pair_id": schedule_pair.id, "group_id": group.id},
+        {
+            "schedule_pair_id": schedule_pair.id,
+            "group_id": group.id,
+            "sync_id": get_or_create_sync.id,
+        },
     )
 
     await db_session_test.execute(
@@ -395,3 +426,42 @@ async def test_get_schedule_by_group_id_empty_schedule(
     assert result is not None
     assert result.group.id == group.id
     assert len(result.schedule_pairs) == 0
+
+
+async def test_reset_unpublished_schedule_hashes(
+    db_session_test: AsyncSession,
+    get_or_create_sync: Synchronization,
+    get_or_create_course: Course,
+) -> None:
+    group_repository = group_repo()
+    # синхронизация упала до публикации, её хеши читатели так и не увидели
+    unpublished = await sync_repo().add(
+        db_session_test,
+        Synchronization(
+            created_at=datetime.now(tz=timezone.utc),
+            status=SyncStatus.FAILED,
+        ),
+    )
+    groups = {
+        sync_id: await group_repository.add(
+            db_session_test,
+            Group(
+                abbr=f"ИУ7-hash-{sync_id}-unique-abbr",
+                course_id=get_or_create_course.id,
+                semester_num=5,
+                sync_id=get_or_create_sync.id,
+                lks_id=uuid.uuid4(),
+                schedule_hash="hash",
+                schedule_sync_id=sync_id,
+            ),
+        )
+        for sync_id in (get_or_create_sync.id, unpublished.id)
+    }
+    await db_session_test.commit()
+
+    await group_repository.reset_unpublished_schedule_hashes(db_session_test)
+    await db_session_test.commit()
+
+    hashes = await group_repository.get_schedule_hash_map(db_session_test)
+    assert hashes.get(groups[get_or_create_sync.id].id) == "hash"
+    assert groups[unpublished.id].id not in hashes
@@ -0,0 +1,128 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.sync_status import SyncStatus
+from app.models.course import Course
+from app.models.group import Group
+from app.models.many_to_many import schedule_pair_group
+from app.models.schedule_pair import SchedulePair
+from app.models.synchronization import Synchronization
+from app.repos.discipline_repo import discipline_repo
+from app.repos.group_repo import group_repo
+from app.repos.schedule_pair_repo import schedule_pair_repo
+from app.repos.sync_repo import sync_repo
+from tests.app.repos.conftest import add_pair
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_new_link_version_is_visible_after_publish(
+    db_session_test: AsyncSession,
+    get_or_create_sync: Synchronization,
+    get_or_create_group: Group,
+) -> None:
+    discipline_ids = await discipline_repo().upsert_by_unique_field(
+        db_session_test,
+        [
+            {
+                "unique_field": "versioned",
+                "abbr": "БД",
+                "full_name": "Базы данных",
+                "short_name": "БД",
+                "act_type": "lecture",
+                "sync_id": get_or_create_sync.id,
+            },
+        ],
+    )
+    repository = schedule_pair_repo()
+    pair = SchedulePair(
+        unique_field="versioned",
+        day="monday",
+        week="all",
+        start_time="08:30",
+        end_time="10:05",
+        discipline_id=discipline_ids["versioned"],
+        sync_id=get_or_create_sync.id,
+        created_at=datetime.now(tz=timezone.utc),
+    )
+    await repository.add(db_session_test, pair)
+    await repository.add_links(
+        db_session_test,
+        pair.id,
+        group_ids=[get_or_create_group.id],
+        teacher_ids=[],
+        audience_ids=[],
+        sync_id=get_or_create_sync.id,
+    )
+    new_sync = Synchronization(
+        created_at=datetime.now(tz=timezone.utc),
+        status="in_progress",
+    )
+    await sync_repo().add(db_session_test, new_sync)
+
+    await repository.carry_forward_links(db_session_test, new_sync.id)
+    await sync_repo().publish(db_session_test, new_sync.id)
+    await repository.delete_old_link_versions(db_session_test, new_sync.id)
+    await db_session_test.commit()
+
+    versions = await db_session_test.scalars(
+        select(schedule_pair_group.c.sync_id).where(
+            schedule_pair_group.c.schedule_pair_id == pair.id,
+        ),
+    )
+    assert list(versions) == [new_sync.id]
+
+
+async def test_delete_stale_links_keeps_links_of_live_rows(
+    db_session_test: AsyncSession,
+    get_or_create_group: Group,
+    get_or_create_course: Course,
+) -> None:
+    repository = schedule_pair_repo()
+    new_sync = await sync_repo().add(
+        db_session_test,
+        Synchronization(
+            created_at=datetime.now(tz=timezone.utc),
+            status=SyncStatus.IN_PROGRESS,
+        ),
+    )
+    live_group = await group_repo().add(
+        db_session_test,
+        Group(
+            abbr="ИУ7-55Б",
+            course_id=get_or_create_course.id,
+            semester_num=5,
+            sync_id=new_sync.id,
+            lks_id=uuid.uuid4(),
+        ),
+    )
+    live_pair = await add_pair(db_session_test, "live", new_sync.id)
+    stale_pair = await add_pair(db_session_test, "stale", get_or_create_group.sync_id)
+    # живая пара у пропавшей группы и пропавшая пара у живой группы
+    stale_links = [
+        (live_pair.id, get_or_create_group.id),
+        (stale_pair.id, live_group.id),
+    ]
+    for pair_id, group_id in [(live_pair.id, live_group.id), *stale_links]:
+        await repository.add_links(
+            db_session_test,
+            pair_id,
+            group_ids=[group_id],
+            teacher_ids=[],
+            audience_ids=[],
+            sync_id=new_sync.id,
+        )
+    await db_session_test.commit()
+
+    deleted = await repository.delete_stale_links(db_session_test, new_sync.id)
+    await db_session_test.commit()
+
+    assert deleted[schedule_pair_group.name] == len(stale_links)
+    res = await db_session_test.execute(
+        select(schedule_pair_group.c.schedule_pair_id, schedule_pair_group.c.group_id),
+    )
+    assert list(res.tuples()) == [(live_pair.id, live_group.id)]
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.group import Group
+from app.models.many_to_many import schedule_pair_group, schedule_pair_teacher
+from app.models.synchronization import Synchronization
+from app.models.teacher import Teacher
+from app.repos.discipline_repo import discipline_repo
+from app.repos.schedule_stage_repo import ScheduleStage, schedule_stage_repo
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_merge_writes_pairs_and_links(
+    db_session_test: AsyncSession,
+    get_or_create_sync: Synchronization,
+    get_or_create_teacher: Teacher,
+    get_or_create_group: Group,
+) -> None:
+    discipline_ids = await discipline_repo().upsert_by_unique_field(
+        db_session_test,
+        [
+            {
+                "unique_field": "discipline",
+                "abbr": "БД",
+                "full_name": "Базы данных",
+                "short_name": "БД",
+                "act_type": "lecture",
+                "sync_id": get_or_create_sync.id,
+            },
+        ],
+    )
+    stage = ScheduleStage(
+        pairs=[
+            (
+                "pair",
+                "monday",
+                "all",
+                "08:30",
+                "10:05",
+                discipline_ids["discipline"],
+            ),
+        ],
+        group_links=[("pair", get_or_create_group.id)],
+        teacher_links=[("pair", get_or_create_teacher.id)],
+    )
+    stage_repository = schedule_stage_repo()
+
+    first = await stage_repository.merge(
+        db_session_test,
+        stage,
+        [get_or_create_group.id],
+        get_or_create_sync.id,
+    )
+    await db_session_test.commit()
+    second = await stage_repository.merge(
+        db_session_test,
+        stage,
+        [get_or_create_group.id],
+        get_or_create_sync.id,
+    )
+    await db_session_test.commit()
+
+    assert first == second
+    assert (first.inserted, second.inserted) == (1, 0)
+    for table in (schedule_pair_group, schedule_pair_teacher):
+        links = await db_session_test.scalar(
+            select(func.count()).select_from(table),
+        )
+        assert links == 1
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.sync_kind import SyncKind
+from app.domain.sync_status import SyncStatus
+from app.models.synchronization import Synchronization
+from app.repos.sync_repo import sync_repo
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_claim_takes_one_queued_sync_at_a_time(
+    db_session_test: AsyncSession,
+) -> None:
+    repository = sync_repo()
+    now = datetime.now(tz=timezone.utc)
+    queued = [
+        await repository.add(
+            db_session_test,
+            Synchronization(created_at=now, status=SyncStatus.QUEUED),
+        )
+        for _ in range(2)
+    ]
+    await db_session_test.commit()
+
+    claimed = await repository.claim(db_session_test, stale_after_sec=60)
+    await db_session_test.commit()
+    assert claimed is not None
+    assert claimed.id == queued[0].id
+    assert claimed.status == SyncStatus.IN_PROGRESS
+
+    # пока первая синхронизация жива, вторая ждёт в очереди
+    assert await repository.claim(db_session_test, stale_after_sec=60) is None
+
+    claimed.heartbeat_at = now - timedelta(minutes=5)
+    await db_session_test.commit()
+    reclaimed = await repository.claim(db_session_test, stale_after_sec=60)
+    await db_session_test.commit()
+    assert reclaimed is not None
+    assert reclaimed.id == queued[0].id
+
+
+async def test_newer_published_sync_supersedes_older_ones(
+    db_session_test: AsyncSession,
+) -> None:
+    repository = sync_repo()
+    now = datetime.now(tz=timezone.utc)
+    failed = await repository.add(
+        db_session_test,
+        Synchronization(created_at=now, status=SyncStatus.FAILED),
+    )
+    queued = await repository.add(
+        db_session_test,
+        Synchronization(created_at=now, status=SyncStatus.QUEUED),
+    )
+    await repository.add(
+        db_session_test,
+        Synchronization(created_at=now, status=SyncStatus.SUCCESS, published_at=now),
+    )
+    await db_session_test.commit()
+
+    assert await repository.has_newer(db_session_test, failed.id, stale_after_sec=60)
+    # версия старой синхронизации уже не станет видна, её незачем выполнять
+    assert await repository.claim(db_session_test, stale_after_sec=60) is None
+    await db_session_test.commit()
+    await db_session_test.refresh(queued)
+    assert queued.status == SyncStatus.FAILED
+
+
+async def test_published_sync_does_not_supersede_diff(
+    db_session_test: AsyncSession,
+) -> None:
+    repository = sync_repo()
+    now = datetime.now(tz=timezone.utc)
+    diff = await repository.add(
+        db_session_test,
+        Synchronization(created_at=now, status=SyncStatus.QUEUED, kind=SyncKind.DIFF),
+    )
+    await repository.add(
+        db_session_test,
+        Synchronization(created_at=now, status=SyncStatus.SUCCESS, published_at=now),
+    )
+    await db_session_test.commit()
+
+    claimed = await repository.claim(db_session_test, stale_after_sec=60)
+    await db_session_test.commit()
+    assert claimed is not None
+    assert claimed.id == diff.id
+
+
+async def test_stale_sync_superseded_by_published_one_is_not_reclaimed(
+    db_session_test: AsyncSession,
+) -> None:
+    repository = sync_repo()
+    now = datetime.now(tz=timezone.utc)
+    abandoned = await repository.add(
+        db_session_test,
+        Synchronization(
+            created_at=now,
+            status=SyncStatus.IN_PROGRESS,
+            heartbeat_at=now - timedelta(minutes=5),
+        ),
+    )
+    await repository.add(
+        db_session_test,
+        Synchronization(created_at=now, status=SyncStatus.SUCCESS, published_at=now),
+    )
+    await db_session_test.commit()
+
+    assert await repository.claim(db_session_test, stale_after_sec=60) is None
+    await db_session_test.commit()
+    await db_session_test.refresh(abandoned)
+    assert abandoned.status == SyncStatus.FAILED
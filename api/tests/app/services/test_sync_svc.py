@@ -0,0 +1,226 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional
+from unittest.mock import ANY, AsyncMock
+
+import pytest
+
+from app.db.database import ISessionMaker
+from app.domain.errors import SyncNotResumableError
+from app.domain.sync_kind import SyncKind
+from app.domain.sync_stage import SyncStage
+from app.domain.sync_status import SyncStatus
+from app.models.synchronization import Synchronization
+from app.repos.sync_repo import SyncRepo
+from app.services.sync_svc import SyncSvc
+from app.settings import WorkerSettings
+from app.utils.lks_synchronizer import LksSynchronizer
+
+pytestmark = pytest.mark.asyncio
+
+SYNC_ID = 5
+HEARTBEAT_INTERVAL_SEC = 0.01
+
+
+@pytest.fixture(name="sync_repo_mock")
+def sync_repo_mock_fixture() -> AsyncMock:
+    return AsyncMock(spec=SyncRepo)
+
+
+@pytest.fixture(name="lks_synchronizer_mock")
+def lks_synchronizer_mock_fixture() -> AsyncMock:
+    return AsyncMock(spec=LksSynchronizer)
+
+
+@pytest.fixture(name="sync_svc")
+def sync_svc_fixture(
+    sync_repo_mock: AsyncMock,
+    lks_synchronizer_mock: AsyncMock,
+) -> SyncSvc:
+    return SyncSvc(
+        sync_repository=sync_repo_mock,
+        lks_syncer=lks_synchronizer_mock,
+        settings=WorkerSettings(heartbeat_interval_sec=HEARTBEAT_INTERVAL_SEC),
+    )
+
+
+def make_sync(
+    status: SyncStatus,
+    stage: Optional[SyncStage] = None,
+    kind: SyncKind = SyncKind.SYNC,
+) -> Synchronization:
+    return Synchronization(
+        id=SYNC_ID,
+        created_at=datetime.now(tz=timezone.utc),
+        status=status,
+        stage=stage,
+        kind=kind,
+    )
+
+
+async def test_run_next_returns_false_on_empty_queue(
+    sync_svc: SyncSvc,
+    sync_repo_mock: AsyncMock,
+    lks_synchronizer_mock: AsyncMock,
+    session_maker_mock: ISessionMaker,
+) -> None:
+    sync_repo_mock.claim.return_value = None
+
+    assert not await sync_svc.run_next(session_maker_mock)
+
+    lks_synchronizer_mock.synchronize.assert_not_awaited()
+    sync_repo_mock.finish.assert_not_awaited()
+
+
+async def test_run_next_starts_queued_sync_from_scratch(
+    sync_svc: SyncSvc,
+    sync_repo_mock: AsyncMock,
+    lks_synchronizer_mock: AsyncMock,
+    session_maker_mock: ISessionMaker,
+) -> None:
+    sync_repo_mock.claim.return_value = make_sync(SyncStatus.IN_PROGRESS)
+
+    assert await sync_svc.run_next(session_maker_mock)
+
+    lks_synchronizer_mock.synchronize.assert_awaited_once_with(
+        session_maker_mock,
+        SYNC_ID,
+        resume=False,
+        stats=ANY,
+    )
+    sync_repo_mock.finish.assert_awaited_once_with(
+        ANY,
+        SYNC_ID,
+        SyncStatus.SUCCESS,
+        ANY,
+    )
+
+
+async def test_run_next_resumes_sync_reclaimed_after_stale_heartbeat(
+    sync_svc: SyncSvc,
+    sync_repo_mock: AsyncMock,
+    lks_synchronizer_mock: AsyncMock,
+    session_maker_mock: ISessionMaker,
+) -> None:
+    # репозиторий отдаёт брошенную синхронизацию, у которой уже есть этап
+    sync_repo_mock.claim.return_value = make_sync(
+        SyncStatus.IN_PROGRESS,
+        stage=SyncStage.SCHEDULE,
+    )
+
+    assert await sync_svc.run_next(session_maker_mock)
+
+    lks_synchronizer_mock.synchronize.assert_awaited_once_with(
+        session_maker_mock,
+        SYNC_ID,
+        resume=True,
+        stats=ANY,
+    )
+
+
+async def test_run_next_marks_failed_sync(
+    sync_svc: SyncSvc,
+    sync_repo_mock: AsyncMock,
+    lks_synchronizer_mock: AsyncMock,
+    session_maker_mock: ISessionMaker,
+) -> None:
+    sync_repo_mock.claim.return_value = make_sync(SyncStatus.IN_PROGRESS)
+    lks_synchronizer_mock.synchronize.side_effect = RuntimeError("LKS is down")
+
+    assert await sync_svc.run_next(session_maker_mock)
+
+    sync_repo_mock.finish.assert_awaited_once_with(
+        ANY,
+        SYNC_ID,
+        SyncStatus.FAILED,
+        ANY,
+    )
+
+
+async def test_run_next_beats_heartbeat_until_sync_finishes(
+    sync_svc: SyncSvc,
+    sync_repo_mock: AsyncMock,
+    lks_synchronizer_mock: AsyncMock,
+    session_maker_mock: ISessionMaker,
+) -> None:
+    sync_repo_mock.claim.return_value = make_sync(SyncStatus.IN_PROGRESS)
+
+    async def synchronize(*_: object, **__: object) -> None:
+        await asyncio.sleep(HEARTBEAT_INTERVAL_SEC * 5)
+
+    lks_synchronizer_mock.synchronize.side_effect = synchronize
+
+    await sync_svc.run_next(session_maker_mock)
+    beats = sync_repo_mock.touch_heartbeat.await_count
+    await asyncio.sleep(HEARTBEAT_INTERVAL_SEC * 3)
+
+    assert beats > 0
+    sync_repo_mock.touch_heartbeat.assert_awaited_with(ANY, SYNC_ID)
+    assert sync_repo_mock.touch_heartbeat.await_count == beats
+
+
+async def test_run_next_reports_failed_diff(
+    sync_svc: SyncSvc,
+    sync_repo_mock: AsyncMock,
+    lks_synchronizer_mock: AsyncMock,
+    session_maker_mock: ISessionMaker,
+) -> None:
+    sync_repo_mock.claim.return_value = make_sync(
+        SyncStatus.IN_PROGRESS,
+        kind=SyncKind.DIFF,
+    )
+    lks_synchronizer_mock.diff.side_effect = RuntimeError("LKS is down")
+
+    assert await sync_svc.run_next(session_maker_mock)
+
+    lks_synchronizer_mock.synchronize.assert_not_awaited()
+    sync_repo_mock.finish.assert_awaited_once_with(
+        ANY,
+        SYNC_ID,
+        SyncStatus.FAILED,
+        ANY,
+    )
+
+
+async def test_resume_queues_failed_sync(
+    sync_svc: SyncSvc,
+    sync_repo_mock: AsyncMock,
+    session_maker_mock: ISessionMaker,
+) -> None:
+    sync_repo_mock.get_by_id.return_value = make_sync(SyncStatus.FAILED)
+    sync_repo_mock.has_newer.return_value = False
+
+    await sync_svc.resume_synchronization_task(session_maker_mock, SYNC_ID)
+
+    sync_repo_mock.update_status.assert_awaited_once_with(
+        ANY,
+        SYNC_ID,
+        SyncStatus.QUEUED,
+    )
+
+
+async def test_resume_rejects_finished_sync(
+    sync_svc: SyncSvc,
+    sync_repo_mock: AsyncMock,
+    session_maker_mock: ISessionMaker,
+) -> None:
+    sync_repo_mock.get_by_id.return_value = make_sync(SyncStatus.SUCCESS)
+
+    with pytest.raises(SyncNotResumableError):
+        await sync_svc.resume_synchronization_task(session_maker_mock, SYNC_ID)
+
+    sync_repo_mock.update_status.assert_not_awaited()
+
+
+async def test_resume_rejects_superseded_sync(
+    sync_svc: SyncSvc,
+    sync_repo_mock: AsyncMock,
+    session_maker_mock: ISessionMaker,
+) -> None:
+    sync_repo_mock.get_by_id.return_value = make_sync(SyncStatus.FAILED)
+    sync_repo_mock.has_newer.return_value = True
+
+    with pytest.raises(SyncNotResumableError):
+        await sync_svc.resume_synchronization_task(session_maker_mock, SYNC_ID)
+
+    sync_repo_mock.update_status.assert_not_awaited()
@@ -0,0 +1,41 @@
+import os
+import signal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app import worker
+from app.services.sync_svc import SyncSvc
+from app.settings import WorkerSettings
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_worker_keeps_polling_after_errors_until_stopped(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # выполненная синхронизация, ошибка БД и пустая очередь перед остановкой
+    outcomes: list[object] = [True, RuntimeError("DB is down"), False]
+    polls = len(outcomes)
+
+    async def run_next(_: object) -> bool:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if not outcomes:
+            os.kill(os.getpid(), signal.SIGTERM)
+        return bool(outcome)
+
+    svc = AsyncMock(spec=SyncSvc)
+    svc.run_next.side_effect = run_next
+    monkeypatch.setattr(worker, "sync_svc", lambda: svc)
+    monkeypatch.setattr(worker, "get_default_session_maker", MagicMock)
+    monkeypatch.setattr(
+        worker,
+        "worker_settings",
+        lambda: WorkerSettings(poll_interval_sec=0.01),
+    )
+
+    await worker.run_worker()
+
+    assert svc.run_next.await_count == polls
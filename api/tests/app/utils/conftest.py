@@ -0,0 +1,45 @@
+from uuid import uuid4
+
+import app.clients.lks.models as lks
+
+# преподаватель входит в ключ пары, поэтому его uuid в ЛКС постоянный
+TEACHER_ID = uuid4()
+
+
+def make_schedule(audience_name: str) -> lks.Schedule:
+    return lks.Schedule.model_validate(
+        {
+            "uuid": str(uuid4()),
+            "title": "ИУ7-51Б",
+            "schedule": [
+                {
+                    "groups": [],
+                    "audiences": [{"name": audience_name}],
+                    "teachers": [
+                        {
+                            "uuid": str(TEACHER_ID),
+                            "firstName": "Иван",
+                            "middleName": "Иванович",
+                            "lastName": "Иванов",
+                        },
+                    ],
+                    "discipline": {
+                        "abbr": "БД",
+                        "actType": "lecture",
+                        "fullName": "Базы данных",
+                        "shortName": "БД",
+                    },
+                    "day": 1,
+                    "week": "all",
+                    "startTime": "08:30",
+                    "endTime": "10:05",
+                },
+            ],
+        },
+    )
+
+
+def make_response(schedule: lks.Schedule) -> bytes:
+    return (
+        lks.ScheduleResponseBody(data=schedule).model_dump_json(by_alias=True).encode()
+    )
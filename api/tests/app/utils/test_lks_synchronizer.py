@@ -0,0 +1,127 @@
+from unittest.mock import ANY, AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.clients.lks.client import LksClient
+from app.domain.sync_stage import SyncStage
+from app.repos.audience_repo import AudienceRepo
+from app.repos.group_repo import GroupRepo
+from app.repos.sync_repo import SyncRepo
+from app.repos.sync_snapshot_repo import SyncSnapshotRepo
+from app.settings import SyncSettings
+from app.utils.group_schedule_writer import GroupScheduleWriter
+from app.utils.lks_rows import SyncedGroup
+from app.utils.lks_synchronizer import LksSynchronizer
+from app.utils.schedule_writer import ScheduleWriter
+from app.utils.structure_writer import StructureWriter
+from app.utils.sync_cache import KnownIds
+from app.utils.sync_reconciler import SyncReconciler
+from app.utils.sync_stats import SyncStats
+from tests.app.utils.conftest import make_response, make_schedule
+
+pytestmark = pytest.mark.asyncio
+
+SYNC_ID = 3
+
+SYNCED_GROUP = SyncedGroup(id=1, lks_id=uuid4(), abbr="ИУ7-51Б")
+NEW_GROUP = SyncedGroup(id=2, lks_id=uuid4(), abbr="ИУ7-52Б")
+
+
+def make_sessionmaker() -> MagicMock:
+    sessionmaker = MagicMock()
+    sessionmaker.return_value.__aenter__.return_value = MagicMock(spec=AsyncSession)
+    return sessionmaker
+
+
+@pytest.fixture(name="sync_repo_mock")
+def sync_repo_mock_fixture() -> AsyncMock:
+    return AsyncMock(spec=SyncRepo)
+
+
+@pytest.fixture(name="group_repo_mock")
+def group_repo_mock_fixture() -> AsyncMock:
+    group_repo_mock = AsyncMock(spec=GroupRepo)
+    group_repo_mock.get_schedule_synced_ids.return_value = {SYNCED_GROUP.id}
+    return group_repo_mock
+
+
+@pytest.fixture(name="schedule_writer_mock")
+def schedule_writer_mock_fixture() -> AsyncMock:
+    return AsyncMock(spec=ScheduleWriter)
+
+
+@pytest.fixture(name="synchronizer")
+def synchronizer_fixture(
+    sync_repo_mock: AsyncMock,
+    group_repo_mock: AsyncMock,
+    schedule_writer_mock: AsyncMock,
+) -> LksSynchronizer:
+    lks_client_mock = MagicMock(spec=LksClient)
+    lks_client_mock.get_schedule_raw.return_value = make_response(
+        make_schedule("501ю"),
+    )
+    structure_writer_mock = AsyncMock(spec=StructureWriter)
+    structure_writer_mock.write.return_value = [SYNCED_GROUP, NEW_GROUP]
+    group_writer_mock = AsyncMock(spec=GroupScheduleWriter)
+    group_writer_mock.preload_ids.return_value = KnownIds()
+
+    return LksSynchronizer(
+        lks_api_client=lks_client_mock,
+        sync_repository=sync_repo_mock,
+        group_repository=group_repo_mock,
+        audience_repository=AsyncMock(spec=AudienceRepo),
+        snapshot_repository=AsyncMock(spec=SyncSnapshotRepo),
+        structure=structure_writer_mock,
+        group_writer=group_writer_mock,
+        schedule=schedule_writer_mock,
+        reconciler=AsyncMock(spec=SyncReconciler),
+        settings=SyncSettings(),
+    )
+
+
+def written_groups(schedule_writer_mock: AsyncMock) -> list[SyncedGroup]:
+    return [
+        group
+        for call in schedule_writer_mock.write.await_args_list
+        for group, _, _ in call.args[2]
+    ]
+
+
+async def test_resume_skips_checkpointed_groups(
+    synchronizer: LksSynchronizer,
+    sync_repo_mock: AsyncMock,
+    group_repo_mock: AsyncMock,
+    schedule_writer_mock: AsyncMock,
+) -> None:
+    stats = SyncStats()
+
+    await synchronizer.synchronize(make_sessionmaker(), SYNC_ID, True, stats)
+
+    group_repo_mock.get_schedule_synced_ids.assert_awaited_once_with(ANY, SYNC_ID)
+    group_repo_mock.reset_unpublished_schedule_hashes.assert_not_awaited()
+    assert written_groups(schedule_writer_mock) == [NEW_GROUP]
+    # groups_done продолжает счёт, поэтому всего остаются все группы структуры
+    sync_repo_mock.update_stage.assert_any_await(
+        ANY,
+        SYNC_ID,
+        SyncStage.SCHEDULE,
+        groups_total=2,
+    )
+    assert stats.report()["groups"]["skipped"] == 1
+
+
+async def test_fresh_sync_rewrites_unpublished_schedules(
+    synchronizer: LksSynchronizer,
+    group_repo_mock: AsyncMock,
+    schedule_writer_mock: AsyncMock,
+) -> None:
+    await synchronizer.synchronize(make_sessionmaker(), SYNC_ID)
+
+    group_repo_mock.reset_unpublished_schedule_hashes.assert_awaited_once()
+    group_repo_mock.get_schedule_synced_ids.assert_not_awaited()
+    assert sorted(written_groups(schedule_writer_mock), key=lambda g: g.id) == [
+        SYNCED_GROUP,
+        NEW_GROUP,
+    ]
@@ -0,0 +1,94 @@
+from typing import Union
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.clients.lks.client import LksClient
+from app.settings import SyncSettings
+from app.utils.lks_rows import SyncedGroup, schedule_fingerprint
+from app.utils.schedule_pipeline import SchedulePipeline
+from app.utils.schedule_writer import GroupSchedule, ScheduleWriter
+from app.utils.sync_cache import KnownIds, SyncCache
+from app.utils.sync_stats import SyncStats
+from tests.app.utils.conftest import make_response, make_schedule
+
+pytestmark = pytest.mark.asyncio
+
+SYNC_ID = 4
+
+SCHEDULE = make_schedule("501ю")
+
+
+@pytest.fixture(name="lks_client_mock")
+def lks_client_mock_fixture() -> MagicMock:
+    lks_client_mock = MagicMock(spec=LksClient)
+    lks_client_mock.get_schedule_raw.return_value = make_response(SCHEDULE)
+    return lks_client_mock
+
+
+@pytest.fixture(name="writer_mock")
+def writer_mock_fixture() -> AsyncMock:
+    return AsyncMock(spec=ScheduleWriter)
+
+
+def written(writer_mock: AsyncMock) -> list[GroupSchedule]:
+    return [item for call in writer_mock.write.await_args_list for item in call.args[2]]
+
+
+async def test_unchanged_fingerprint_skips_rows(
+    lks_client_mock: MagicMock,
+    writer_mock: AsyncMock,
+) -> None:
+    group = SyncedGroup(id=1, lks_id=uuid4(), abbr="ИУ7-51Б")
+    fingerprint = schedule_fingerprint(SCHEDULE)
+    cache = SyncCache(known=KnownIds(schedule_hashes={group.id: fingerprint}))
+    stats = SyncStats()
+    pipeline = SchedulePipeline(
+        lks_client_mock,
+        writer_mock,
+        SyncSettings(),
+        cache,
+        stats,
+    )
+
+    await pipeline.run(MagicMock(), SYNC_ID, [group])
+
+    # писатель получает группу без строк и только продлевает её связи
+    assert written(writer_mock) == [(group, None, fingerprint)]
+    assert stats.report()["groups"] == {"unchanged": 1}
+
+
+async def test_failed_groups_are_counted_and_pipeline_completes(
+    lks_client_mock: MagicMock,
+    writer_mock: AsyncMock,
+) -> None:
+    unreachable = SyncedGroup(id=1, lks_id=uuid4(), abbr="ИУ7-51Б")
+    malformed = SyncedGroup(id=2, lks_id=uuid4(), abbr="ИУ7-52Б")
+    healthy = SyncedGroup(id=3, lks_id=uuid4(), abbr="ИУ7-53Б")
+    responses: dict[UUID, Union[bytes, Exception]] = {
+        unreachable.lks_id: RuntimeError("LKS is down"),
+        malformed.lks_id: b"not json",
+        healthy.lks_id: make_response(SCHEDULE),
+    }
+
+    async def get_schedule_raw(group_id: UUID) -> bytes:
+        response = responses[group_id]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    lks_client_mock.get_schedule_raw.side_effect = get_schedule_raw
+    stats = SyncStats()
+    pipeline = SchedulePipeline(
+        lks_client_mock,
+        writer_mock,
+        SyncSettings(),
+        SyncCache(),
+        stats,
+    )
+
+    await pipeline.run(MagicMock(), SYNC_ID, [unreachable, malformed, healthy])
+
+    assert [group for group, _, _ in written(writer_mock)] == [healthy]
+    assert stats.report()["groups"] == {"fetch_failed": 1, "parse_failed": 1}
@@ -0,0 +1,71 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app.domain.day_of_week import DayOfWeek
+from app.domain.week import Week
+from app.utils.lks_rows import (
+    audience_unique_field,
+    discipline_unique_field,
+    schedule_fingerprint,
+)
+from app.utils.schedule_rows import (
+    AUDIENCE_COLUMNS,
+    DISCIPLINE_COLUMNS,
+    TEACHER_COLUMNS,
+    parse_schedule_rows,
+    row_dict,
+)
+from tests.app.utils.conftest import TEACHER_ID, make_response, make_schedule
+
+
+def test_rows_match_model_rows() -> None:
+    schedule = make_schedule("501ю")
+    pair = schedule.data[0]
+
+    rows = parse_schedule_rows(make_response(schedule))
+
+    assert rows.fingerprint == schedule_fingerprint(schedule)
+    assert [row_dict(TEACHER_COLUMNS, t, 1) for t in rows.teachers] == [
+        {
+            "lks_id": TEACHER_ID,
+            "first_name": "Иван",
+            "middle_name": "Иванович",
+            "last_name": "Иванов",
+            "sync_id": 1,
+        },
+    ]
+    assert [row_dict(AUDIENCE_COLUMNS, a, 1) for a in rows.audiences] == [
+        {
+            "unique_field": audience_unique_field(pair.audiences[0]),
+            "lks_id": None,
+            "name": "501ю",
+            "building": None,
+            "sync_id": 1,
+        },
+    ]
+    assert [row_dict(DISCIPLINE_COLUMNS, d, 1) for d in rows.disciplines] == [
+        {
+            "unique_field": discipline_unique_field(pair.discipline),
+            "abbr": "БД",
+            "full_name": "Базы данных",
+            "short_name": "БД",
+            "act_type": "lecture",
+            "sync_id": 1,
+        },
+    ]
+    (pair_row,) = rows.pairs
+    assert (pair_row.day, pair_row.week) == (DayOfWeek.MONDAY, Week.ALL)
+    assert pair_row.teacher_keys == (pair.teachers[0].id,)
+    assert pair_row.audience_keys == (rows.audiences[0][0],)
+
+
+def test_rows_are_parsed_in_process_pool() -> None:
+    data = make_response(make_schedule("501ю"))
+
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        rows = executor.submit(parse_schedule_rows, data).result()
+
+    assert rows == parse_schedule_rows(data)
@@ -0,0 +1,282 @@
+from typing import Any
+from unittest.mock import ANY, AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.day_of_week import DayOfWeek
+from app.domain.week import Week
+from app.repos.audience_repo import AudienceRepo
+from app.repos.base_repo import UpsertedIds
+from app.repos.discipline_repo import DisciplineRepo
+from app.repos.group_repo import GroupRepo
+from app.repos.schedule_pair_repo import SchedulePairRepo
+from app.repos.schedule_stage_repo import ScheduleStageRepo
+from app.repos.sync_repo import SyncRepo
+from app.repos.teacher_repo import TeacherRepo
+from app.settings import SyncSettings
+from app.utils.group_schedule_writer import GroupScheduleWriter
+from app.utils.lks_rows import SyncedGroup
+from app.utils.reference_writer import ReferenceWriter
+from app.utils.schedule_rows import PairRow, ScheduleRows
+from app.utils.schedule_writer import ScheduleWriter
+from app.utils.sync_cache import KnownIds, SyncCache
+from app.utils.sync_stats import SyncStats
+from tests.app.utils.conftest import TEACHER_ID
+
+pytestmark = pytest.mark.asyncio
+
+SYNC_ID = 2
+
+
+def make_rows() -> ScheduleRows:
+    return ScheduleRows(
+        teachers=((TEACHER_ID, "Иван", "Иванович", "Иванов"),),
+        audiences=(("501ю", None, "501ю", None),),
+        disciplines=(("бд", "БД", "Базы данных", "БД", "lecture"),),
+        pairs=(
+            PairRow(
+                day=DayOfWeek.MONDAY,
+                week=Week.ALL,
+                start_time="08:30",
+                end_time="10:05",
+                discipline_key="бд",
+                teacher_keys=(TEACHER_ID,),
+                audience_keys=("501ю",),
+                discipline_abbr="БД",
+            ),
+        ),
+        fingerprint="hash",
+    )
+
+
+def insert_rows(key: str) -> Any:
+    async def upsert(
+        _session: AsyncSession,
+        rows: list[dict[str, Any]],
+        **_: Any,
+    ) -> UpsertedIds:
+        ids = UpsertedIds({row[key]: i for i, row in enumerate(rows, start=1)})
+        ids.inserted = len(rows)
+        return ids
+
+    return upsert
+
+
+def make_sessionmaker() -> MagicMock:
+    sessionmaker = MagicMock()
+    sessionmaker.return_value.__aenter__.return_value = MagicMock(spec=AsyncSession)
+    return sessionmaker
+
+
+@pytest.fixture(name="settings")
+def settings_fixture() -> SyncSettings:
+    return SyncSettings()
+
+
+@pytest.fixture(name="teacher_repo_mock")
+def teacher_repo_mock_fixture() -> AsyncMock:
+    teacher_repo_mock = AsyncMock(spec=TeacherRepo)
+    teacher_repo_mock.upsert_by_lks_id.side_effect = insert_rows("lks_id")
+    return teacher_repo_mock
+
+
+@pytest.fixture(name="schedule_stage_repo_mock")
+def schedule_stage_repo_mock_fixture() -> AsyncMock:
+    return AsyncMock(spec=ScheduleStageRepo)
+
+
+@pytest.fixture(name="audience_repo_mock")
+def audience_repo_mock_fixture() -> AsyncMock:
+    audience_repo_mock = AsyncMock(spec=AudienceRepo)
+    audience_repo_mock.upsert_by_unique_field.side_effect = insert_rows(
+        "unique_field",
+    )
+    return audience_repo_mock
+
+
+@pytest.fixture(name="schedule_pair_repo_mock")
+def schedule_pair_repo_mock_fixture() -> AsyncMock:
+    schedule_pair_repo_mock = AsyncMock(spec=SchedulePairRepo)
+    schedule_pair_repo_mock.upsert_by_unique_field.side_effect = insert_rows(
+        "unique_field",
+    )
+    return schedule_pair_repo_mock
+
+
+@pytest.fixture(name="group_repo_mock")
+def group_repo_mock_fixture() -> AsyncMock:
+    return AsyncMock(spec=GroupRepo)
+
+
+@pytest.fixture(name="writer")
+def writer_fixture(
+    settings: SyncSettings,
+    teacher_repo_mock: AsyncMock,
+    audience_repo_mock: AsyncMock,
+    schedule_pair_repo_mock: AsyncMock,
+    group_repo_mock: AsyncMock,
+    schedule_stage_repo_mock: AsyncMock,
+) -> ScheduleWriter:
+    discipline_repo_mock = AsyncMock(spec=DisciplineRepo)
+    discipline_repo_mock.upsert_by_unique_field.side_effect = insert_rows(
+        "unique_field",
+    )
+
+    group_writer = GroupScheduleWriter(
+        references=ReferenceWriter(
+            teacher_repository=teacher_repo_mock,
+            audience_repository=audience_repo_mock,
+            discipline_repository=discipline_repo_mock,
+        ),
+        schedule_pair_repository=schedule_pair_repo_mock,
+        group_repository=group_repo_mock,
+        settings=settings,
+    )
+    return ScheduleWriter(
+        group_writer=group_writer,
+        group_repository=group_repo_mock,
+        schedule_pair_repository=schedule_pair_repo_mock,
+        schedule_stage_repository=schedule_stage_repo_mock,
+        sync_repository=AsyncMock(spec=SyncRepo),
+        settings=settings,
+    )
+
+
+async def test_bulk_fallback_counts_rows_once(
+    writer: ScheduleWriter,
+    settings: SyncSettings,
+    schedule_stage_repo_mock: AsyncMock,
+) -> None:
+    settings.bulk_write = True
+    schedule_stage_repo_mock.merge.side_effect = RuntimeError("merge failed")
+    group = SyncedGroup(id=1, lks_id=uuid4(), abbr="ИУ7-51Б")
+    stats = SyncStats()
+
+    await writer.write(
+        make_sessionmaker(),
+        SYNC_ID,
+        [(group, make_rows(), "hash")],
+        SyncCache(),
+        stats,
+    )
+
+    report = stats.report()
+    schedule_stage_repo_mock.merge.assert_awaited_once()
+    for entity in ("teachers", "audiences", "disciplines", "schedule_pairs"):
+        assert report["rows"][entity] == {"inserted": 1, "updated": 0, "deleted": 0}
+    assert report["groups"] == {"written": 1}
+
+
+async def test_known_references_are_touched_not_inserted(
+    writer: ScheduleWriter,
+    teacher_repo_mock: AsyncMock,
+    audience_repo_mock: AsyncMock,
+) -> None:
+    teacher_id, audience_id = 7, 8
+    cache = SyncCache(
+        known=KnownIds(
+            teachers={TEACHER_ID: teacher_id},
+            audiences={"501ю": audience_id},
+        ),
+    )
+    group = SyncedGroup(id=1, lks_id=uuid4(), abbr="ИУ7-51Б")
+    stats = SyncStats()
+
+    await writer.write(
+        make_sessionmaker(),
+        SYNC_ID,
+        [(group, make_rows(), "hash")],
+        cache,
+        stats,
+    )
+
+    teacher_repo_mock.touch_many.assert_awaited_once_with(ANY, [teacher_id], SYNC_ID)
+    teacher_repo_mock.upsert_by_lks_id.assert_awaited_once_with(ANY, [])
+    audience_repo_mock.touch_many.assert_awaited_once_with(ANY, [audience_id], SYNC_ID)
+    audience_repo_mock.upsert_by_unique_field.assert_awaited_once_with(ANY, [])
+    report = stats.report()
+    for entity in ("teachers", "audiences"):
+        assert report["rows"][entity] == {"inserted": 0, "updated": 1, "deleted": 0}
+
+
+async def test_unchanged_schedule_carries_links_forward(
+    writer: ScheduleWriter,
+    teacher_repo_mock: AsyncMock,
+    schedule_pair_repo_mock: AsyncMock,
+    group_repo_mock: AsyncMock,
+) -> None:
+    unchanged = SyncedGroup(id=1, lks_id=uuid4(), abbr="ИУ7-51Б")
+    changed = SyncedGroup(id=2, lks_id=uuid4(), abbr="ИУ7-52Б")
+    stats = SyncStats()
+
+    await writer.write(
+        make_sessionmaker(),
+        SYNC_ID,
+        [(unchanged, None, "hash"), (changed, make_rows(), "hash")],
+        SyncCache(),
+        stats,
+    )
+
+    schedule_pair_repo_mock.carry_forward_links.assert_awaited_once_with(
+        ANY,
+        SYNC_ID,
+        [unchanged.id],
+    )
+    schedule_pair_repo_mock.delete_group_links.assert_awaited_once_with(
+        ANY,
+        changed.id,
+        SYNC_ID,
+    )
+    teacher_repo_mock.upsert_by_lks_id.assert_awaited_once()
+    group_repo_mock.set_schedule_hash.assert_awaited_once_with(ANY, changed.id, "hash")
+    group_repo_mock.mark_schedule_synced.assert_awaited_once_with(
+        ANY,
+        [unchanged.id, changed.id],
+        SYNC_ID,
+    )
+
+
+async def test_failed_pair_rolls_back_only_its_savepoint(
+    writer: ScheduleWriter,
+    schedule_pair_repo_mock: AsyncMock,
+    group_repo_mock: AsyncMock,
+) -> None:
+    rows = make_rows()
+    broken = rows.pairs[0]._replace(start_time="10:15", end_time="11:50")
+    rows = rows._replace(pairs=(*rows.pairs, broken))
+    insert = insert_rows("unique_field")
+
+    async def upsert(
+        session: AsyncSession,
+        pairs: list[dict[str, Any]],
+        **kwargs: Any,
+    ) -> UpsertedIds:
+        if pairs[0]["start_time"] == broken.start_time:
+            msg = "constraint violation"
+            raise RuntimeError(msg)
+        return await insert(session, pairs, **kwargs)
+
+    schedule_pair_repo_mock.upsert_by_unique_field.side_effect = upsert
+    group = SyncedGroup(id=1, lks_id=uuid4(), abbr="ИУ7-51Б")
+    stats = SyncStats()
+
+    await writer.write(
+        make_sessionmaker(),
+        SYNC_ID,
+        [(group, rows, "hash")],
+        SyncCache(),
+        stats,
+    )
+
+    schedule_pair_repo_mock.add_links.assert_awaited_once()
+    # группа записана, но хеш сброшен, чтобы её переписала следующая синхронизация
+    group_repo_mock.set_schedule_hash.assert_awaited_once_with(ANY, group.id, None)
+    report = stats.report()
+    assert report["rows"]["schedule_pairs"] == {
+        "inserted": 1,
+        "updated": 0,
+        "deleted": 0,
+    }
+    assert report["groups"] == {"written": 1}
@@ -0,0 +1,128 @@
+from uuid import UUID, uuid4
+
+import app.clients.lks.models as lks
+from app.domain.sync_diff import SyncEntity, diff_snapshots
+from app.utils.lks_rows import audience_unique_field
+from app.utils.sync_diff import build_target, keep_failed_groups
+from tests.app.utils.conftest import make_schedule
+
+
+def make_structure(group_ids: list[UUID]) -> lks.StructureNode:
+    return lks.StructureNode.model_validate(
+        {
+            "uuid": str(uuid4()),
+            "abbr": "МГТУ",
+            "children": [
+                {
+                    "uuid": str(uuid4()),
+                    "abbr": "ГУК",
+                    "children": [
+                        {
+                            "uuid": str(uuid4()),
+                            "abbr": "ИУ",
+                            "children": [
+                                {
+                                    "uuid": str(uuid4()),
+                                    "abbr": "ИУ7",
+                                    "children": [
+                                        {
+                                            "abbr": "ИУ7 (3 курс)",
+                                            "children": [
+                                                {
+                                                    "uuid": str(group_id),
+                                                    "abbr": f"ИУ7-5{i}Б",
+                                                    "semester": 5,
+                                                }
+                                                for i, group_id in enumerate(
+                                                    group_ids,
+                                                )
+                                            ],
+                                        },
+                                    ],
+                                },
+                            ],
+                        },
+                    ],
+                },
+            ],
+        },
+    )
+
+
+def test_diff_snapshots_splits_inserts_updates_deletes() -> None:
+    current = {SyncEntity.TEACHERS: {"a": ("old",), "b": ("same",), "c": ("gone",)}}
+    target = {SyncEntity.TEACHERS: {"a": ("new",), "b": ("same",), "d": ("added",)}}
+
+    diff = diff_snapshots(current, target)
+
+    assert diff[SyncEntity.TEACHERS].inserts == {"d"}
+    assert diff[SyncEntity.TEACHERS].updates == {"a"}
+    assert diff[SyncEntity.TEACHERS].deletes == {"c"}
+    assert not diff[SyncEntity.GROUPS].inserts
+
+
+def test_build_target_matches_itself_as_snapshot() -> None:
+    group_id = uuid4()
+    schedule = make_schedule("501ю")
+    audience_key = audience_unique_field(schedule.data[0].audiences[0])
+
+    target = build_target(
+        make_structure([group_id]),
+        {group_id: schedule},
+        {audience_key: 1},
+    )
+    diff = diff_snapshots(target, target)
+
+    assert len(target[SyncEntity.GROUPS]) == 1
+    assert len(target[SyncEntity.SCHEDULE_PAIR_GROUPS]) == 1
+    assert all(not (d.inserts or d.updates or d.deletes) for d in diff.values())
+
+
+def test_failed_groups_keep_current_schedule() -> None:
+    ok_group, failed_group = uuid4(), uuid4()
+    structure = make_structure([ok_group, failed_group])
+    current = build_target(
+        structure,
+        {ok_group: make_schedule("501ю"), failed_group: make_schedule("502ю")},
+        {},
+    )
+
+    target = build_target(structure, {ok_group: make_schedule("501ю")}, {})
+    keep_failed_groups(target, current, [failed_group])
+    diff = diff_snapshots(current, target)
+
+    for entity in (SyncEntity.SCHEDULE_PAIRS, SyncEntity.AUDIENCES):
+        assert not diff[entity].deletes
+    assert len(target[SyncEntity.SCHEDULE_PAIR_GROUPS]) == len(
+        current[SyncEntity.SCHEDULE_PAIR_GROUPS],
+    )
+
+
+def test_changed_discipline_makes_a_new_pair() -> None:
+    group_id = uuid4()
+    structure = make_structure([group_id])
+    schedule = make_schedule("501ю")
+    current = build_target(structure, {group_id: schedule}, {})
+
+    changed = schedule.model_copy(deep=True)
+    changed.data[0].discipline.full_name = "Компьютерные сети"
+    diff = diff_snapshots(current, build_target(structure, {group_id: changed}, {}))
+
+    # видимая читателям пара не меняется на месте, её заменяет новая
+    pairs = diff[SyncEntity.SCHEDULE_PAIRS]
+    assert len(pairs.inserts) == len(pairs.deletes) == 1
+    assert not pairs.updates
+
+
+def test_renamed_teacher_is_not_an_update() -> None:
+    group_id = uuid4()
+    structure = make_structure([group_id])
+    schedule = make_schedule("501ю")
+    current = build_target(structure, {group_id: schedule}, {})
+
+    renamed = schedule.model_copy(deep=True)
+    renamed.data[0].teachers[0].last_name = "Петров"
+    diff = diff_snapshots(current, build_target(structure, {group_id: renamed}, {}))
+
+    # синхронизация не переписывает имена известных преподавателей
+    assert not diff[SyncEntity.TEACHERS].updates
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.database import ISessionMaker
+from app.domain.sync_status import SyncStatus
+from app.models.course import Course
+from app.models.department import Department
+from app.models.faculty import Faculty
+from app.models.filial import Filial
+from app.models.group import Group
+from app.models.many_to_many import schedule_pair_group
+from app.models.schedule_pair import SchedulePair
+from app.models.synchronization import Synchronization
+from app.models.teacher import Teacher
+from app.models.university import University
+from app.repos.schedule_pair_repo import schedule_pair_repo
+from app.repos.sync_repo import sync_repo
+from app.settings import SyncSettings
+from app.utils.sync_reconciler import SyncReconciler, sync_reconciler
+from app.utils.sync_stats import SyncStats
+from tests.app.repos.conftest import add_pair
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_garbage_collection_keeps_schedule_of_failed_group(
+    db_session_maker_test: ISessionMaker,
+    db_session_test: AsyncSession,
+    get_or_create_group: Group,
+    get_or_create_teacher: Teacher,
+) -> None:
+    repository = schedule_pair_repo()
+    old_sync_id = get_or_create_group.sync_id
+    live_pair = await add_pair(db_session_test, "live", old_sync_id)
+    await add_pair(db_session_test, "dropped", old_sync_id)
+    await repository.add_links(
+        db_session_test,
+        live_pair.id,
+        group_ids=[get_or_create_group.id],
+        teacher_ids=[get_or_create_teacher.id],
+        audience_ids=[],
+        sync_id=old_sync_id,
+    )
+    new_sync = await sync_repo().add(
+        db_session_test,
+        Synchronization(
+            created_at=datetime.now(tz=timezone.utc),
+            status=SyncStatus.IN_PROGRESS,
+        ),
+    )
+    # структура записана заново, а расписание группы скачать не удалось
+    for model in (University, Filial, Faculty, Department, Course, Group):
+        await db_session_test.execute(update(model).values(sync_id=new_sync.id))
+    await db_session_test.commit()
+    reconciler = SyncReconciler(
+        schedule_pair_repository=repository,
+        sync_repository=sync_repo(),
+        stale_repositories=sync_reconciler().stale_repositories,
+        settings=SyncSettings(collect_garbage=True),
+    )
+    stats = SyncStats()
+
+    await reconciler.reconcile(db_session_maker_test, new_sync.id, stats)
+
+    db_session_test.expunge_all()
+    pair_ids = await db_session_test.scalars(select(SchedulePair.id))
+    assert list(pair_ids) == [live_pair.id]
+    links = await db_session_test.execute(
+        select(schedule_pair_group.c.group_id, schedule_pair_group.c.sync_id),
+    )
+    assert list(links.tuples()) == [(get_or_create_group.id, new_sync.id)]
+    assert await db_session_test.get(Teacher, get_or_create_teacher.id) is not None
+    assert stats.report()["rows"]["schedule_pairs"]["deleted"] == 1
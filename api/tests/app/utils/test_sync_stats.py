@@ -0,0 +1,61 @@
+from app.domain.sync_diff import SyncEntity
+from app.repos.base_repo import UpsertedIds
+from app.utils.sync_stats import SyncStats
+
+
+def test_report_counts_rows_per_entity() -> None:
+    stats = SyncStats()
+    ids = UpsertedIds({"a": 1, "b": 2, "c": 3})
+    ids.inserted = 1
+
+    stats.add_upserted(SyncEntity.TEACHERS, ids)
+    stats.add_updated(SyncEntity.TEACHERS, 2)
+    stats.add_deleted(SyncEntity.GROUPS, 5)
+    report = stats.report()
+
+    assert report["rows"]["teachers"] == {"inserted": 1, "updated": 4, "deleted": 0}
+    assert report["rows"]["groups"] == {"inserted": 0, "updated": 0, "deleted": 5}
+
+
+def test_report_latency_percentiles() -> None:
+    stats = SyncStats()
+    for latency in range(1, 101):
+        stats.add_fetch_latency(latency / 100)
+
+    latency_report = stats.report()["fetch_latency_sec"]
+
+    assert latency_report == {"p50": 0.5, "p90": 0.9, "p99": 0.99, "max": 1.0}
+
+
+def test_progress_summarizes_groups_and_rows() -> None:
+    stats = SyncStats()
+    ids = UpsertedIds({"a": 1, "b": 2})
+    ids.inserted = 1
+    written = 3
+    stats.add_groups("written", written)
+    stats.add_groups("unchanged")
+    stats.add_groups("skipped", 10)
+    stats.add_upserted(SyncEntity.TEACHERS, ids)
+
+    assert stats.groups_processed() == written + 1
+    assert stats.progress() == (
+        "groups: skipped 10, unchanged 1, written 3; rows: teachers +1/~1"
+    )
+
+
+def test_child_counts_reach_parent_only_on_commit() -> None:
+    stats = SyncStats()
+    ids = UpsertedIds({"a": 1})
+    ids.inserted = 1
+    committed = stats.child()
+    committed.add_upserted(SyncEntity.TEACHERS, ids)
+    committed.add_groups("written")
+    rolled_back = stats.child()
+    rolled_back.add_upserted(SyncEntity.TEACHERS, ids)
+
+    assert not stats.rows
+    committed.commit()
+
+    assert stats.report()["rows"]["teachers"]["inserted"] == 1
+    assert stats.groups == {"written": 1}
+    assert not committed.rows
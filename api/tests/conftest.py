@@ -74,6 +74,7 @@ async def get_or_create_sync_fixture(db_session_test: AsyncSession) -> Synchroni
             finished_at=datetime.now(tz=timezone.utc),
             comment="Test",
             status="success",
+            published_at=datetime.now(tz=timezone.utc),
         )
         await repo.add(db_session_test, sync)
         await db_session_test.commit()